@@ -0,0 +1,30 @@
+"""Added indexes on the trivia_id columns of trivia options, categories and countries
+
+Revision ID: c3d5e7f9a1b2
+Revises: 8e9a39773efc
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d5e7f9a1b2'
+down_revision: Union[str, None] = '8e9a39773efc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_trivia_options_trivia_id'), 'trivia_options', ['trivia_id'], unique=False)
+    op.create_index(op.f('ix_categories_trivias_trivia_id'), 'categories_trivias', ['trivia_id'], unique=False)
+    op.create_index(op.f('ix_countries_trivias_trivia_id'), 'countries_trivias', ['trivia_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_countries_trivias_trivia_id'), table_name='countries_trivias')
+    op.drop_index(op.f('ix_categories_trivias_trivia_id'), table_name='categories_trivias')
+    op.drop_index(op.f('ix_trivia_options_trivia_id'), table_name='trivia_options')
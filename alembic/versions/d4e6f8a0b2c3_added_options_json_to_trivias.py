@@ -0,0 +1,85 @@
+"""Added options_json to trivias and backfilled it from trivia_options
+
+Revision ID: d4e6f8a0b2c3
+Revises: c3d5e7f9a1b2
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e6f8a0b2c3'
+down_revision: Union[str, None] = 'c3d5e7f9a1b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+json_type = sa.JSON(none_as_null=True).with_variant(
+    postgresql.JSONB(none_as_null=True), "postgresql"
+)
+
+trivias = sa.table(
+    "trivias", sa.column("id", sa.String), sa.column("options_json", json_type)
+)
+trivia_options = sa.table(
+    "trivia_options",
+    sa.column("trivia_id", sa.String),
+    sa.column("content", sa.Text),
+    sa.column("is_correct", sa.Boolean),
+    sa.column("created_at", sa.DateTime),
+)
+
+
+def backfill() -> None:
+    """Fills options_json of every trivia, BATCH_SIZE trivias at a time in id order"""
+    conn = op.get_bind()
+    last_id = ""
+
+    while True:
+        ids = conn.execute(
+            sa.select(trivias.c.id)
+            .where(trivias.c.id > last_id, trivias.c.options_json.is_(None))
+            .order_by(trivias.c.id)
+            .limit(BATCH_SIZE)
+        ).scalars().all()
+        if not ids:
+            break
+
+        options = {id: {"correct_option": "", "incorrect_options": []} for id in ids}
+        rows = conn.execute(
+            sa.select(
+                trivia_options.c.trivia_id,
+                trivia_options.c.content,
+                trivia_options.c.is_correct,
+            )
+            .where(trivia_options.c.trivia_id.in_(ids))
+            .order_by(trivia_options.c.created_at)
+        )
+        for trivia_id, content, is_correct in rows:
+            if is_correct:
+                options[trivia_id]["correct_option"] = content
+            else:
+                options[trivia_id]["incorrect_options"].append(content)
+
+        conn.execute(
+            trivias.update()
+            .where(trivias.c.id == sa.bindparam("trivia_id"))
+            .values(options_json=sa.bindparam("value")),
+            [{"trivia_id": id, "value": value} for id, value in options.items()],
+        )
+        last_id = ids[-1]
+
+
+def upgrade() -> None:
+    op.add_column('trivias', sa.Column('options_json', json_type, nullable=True))
+    backfill()
+
+
+def downgrade() -> None:
+    op.drop_column('trivias', 'options_json')
@@ -0,0 +1,73 @@
+"""Replaced the categories_trivias and categories_submissions join tables with
+category_id foreign keys on trivias and submissions
+
+Revision ID: e5f7a9b1c3d4
+Revises: d4e6f8a0b2c3
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f7a9b1c3d4'
+down_revision: Union[str, None] = 'd4e6f8a0b2c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, join table, join table column referencing the table)
+CATEGORIZED = (
+    ('trivias', 'categories_trivias', 'trivia_id'),
+    ('submissions', 'categories_submissions', 'submission_id'),
+)
+
+
+def upgrade() -> None:
+    for table_name, join_table_name, parent_column in CATEGORIZED:
+        op.add_column(table_name, sa.Column('category_id', sa.Integer(), nullable=True))
+        op.create_foreign_key(
+            f'{table_name}_category_id_fkey', table_name, 'categories',
+            ['category_id'], ['id'],
+        )
+
+        # Every question had a single category, so any join row will do
+        table = sa.table(table_name, sa.column('id'), sa.column('category_id'))
+        join_table = sa.table(
+            join_table_name, sa.column(parent_column), sa.column('category_id')
+        )
+        op.execute(
+            table.update().values(
+                category_id=sa.select(sa.func.min(join_table.c.category_id))
+                .where(join_table.c[parent_column] == table.c.id)
+                .scalar_subquery()
+            )
+        )
+
+        op.create_index(op.f(f'ix_{table_name}_category_id'), table_name, ['category_id'], unique=False)
+        op.drop_table(join_table_name)
+
+
+def downgrade() -> None:
+    for table_name, join_table_name, parent_column in CATEGORIZED:
+        op.create_table(
+            join_table_name,
+            sa.Column('category_id', sa.Integer(), nullable=False),
+            sa.Column(parent_column, sa.String(), nullable=False),
+            sa.ForeignKeyConstraint(['category_id'], ['categories.id']),
+            sa.ForeignKeyConstraint([parent_column], [f'{table_name}.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('category_id', parent_column),
+        )
+        if table_name == 'trivias':
+            op.create_index(op.f('ix_categories_trivias_trivia_id'), join_table_name, [parent_column], unique=False)
+
+        op.execute(
+            f'INSERT INTO {join_table_name} (category_id, {parent_column}) '
+            f'SELECT category_id, id FROM {table_name} WHERE category_id IS NOT NULL'
+        )
+
+        op.drop_index(op.f(f'ix_{table_name}_category_id'), table_name=table_name)
+        op.drop_constraint(f'{table_name}_category_id_fkey', table_name, type_='foreignkey')
+        op.drop_column(table_name, 'category_id')
@@ -0,0 +1,103 @@
+"""Converted the ids of moderators, submissions, trivias, their options and the
+columns referencing them from text to native UUIDs
+
+On PostgreSQL the columns become UUID. Other databases keep their declared
+column types and have the values rewritten as 16 byte blobs, which is what
+UUIDString stores there.
+
+Revision ID: f6a8b0c2d4e5
+Revises: e5f7a9b1c3d4
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a8b0c2d4e5'
+down_revision: Union[str, None] = 'e5f7a9b1c3d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRIMARY_KEY_TABLES = (
+    'moderators', 'submissions', 'submission_options', 'trivias', 'trivia_options'
+)
+
+# (table, column, referred table, ondelete)
+FOREIGN_KEYS = (
+    ('mod_country_preferences', 'moderator_id', 'moderators', 'CASCADE'),
+    ('submissions', 'moderator_id', 'moderators', None),
+    ('submission_options', 'submission_id', 'submissions', 'CASCADE'),
+    ('countries_submissions', 'submission_id', 'submissions', 'CASCADE'),
+    ('trivias', 'submission_id', 'submissions', None),
+    ('trivia_options', 'trivia_id', 'trivias', 'CASCADE'),
+    ('countries_trivias', 'trivia_id', 'trivias', 'CASCADE'),
+)
+
+COLUMNS = [(table, 'id') for table in PRIMARY_KEY_TABLES] + [
+    (table, column) for table, column, _, _ in FOREIGN_KEYS
+]
+
+
+def convert_postgresql(type_: sa.types.TypeEngine, cast: str) -> None:
+    """Changes the type of every id column, dropping the foreign keys meanwhile
+    as both sides of a foreign key must have the same type"""
+    for table, column, _, _ in FOREIGN_KEYS:
+        op.drop_constraint(f'{table}_{column}_fkey', table, type_='foreignkey')
+
+    for table, column in COLUMNS:
+        op.alter_column(
+            table, column, type_=type_, postgresql_using=f'{column}::{cast}'
+        )
+
+    for table, column, referred_table, ondelete in FOREIGN_KEYS:
+        op.create_foreign_key(
+            f'{table}_{column}_fkey', table, referred_table,
+            [column], ['id'], ondelete=ondelete,
+        )
+
+
+def rewrite_values(convert) -> None:
+    """Rewrites every id with `convert`, registered as a SQL function on the
+    underlying DB-API connection (sqlite3 supports create_function).
+
+    Parent and child ids are rewritten one table at a time, so foreign keys are
+    broken until the last UPDATE. Their enforcement is turned off meanwhile:
+    foreign_keys=OFF only applies outside a transaction, defer_foreign_keys=ON
+    postpones the checks to the commit inside one
+    """
+    bind = op.get_bind()
+    bind.connection.driver_connection.create_function(
+        'convert_uuid', 1, convert, deterministic=True
+    )
+    foreign_keys = bind.exec_driver_sql('PRAGMA foreign_keys').scalar()
+    op.execute('PRAGMA foreign_keys=OFF')
+    op.execute('PRAGMA defer_foreign_keys=ON')
+
+    for table, column in COLUMNS:
+        op.execute(
+            f'UPDATE {table} SET {column} = convert_uuid({column}) '
+            f'WHERE {column} IS NOT NULL'
+        )
+
+    op.execute('PRAGMA defer_foreign_keys=OFF')
+    op.execute(f'PRAGMA foreign_keys={"ON" if foreign_keys else "OFF"}')
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        convert_postgresql(postgresql.UUID(as_uuid=False), 'uuid')
+    else:
+        rewrite_values(lambda value: uuid.UUID(value).bytes)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        convert_postgresql(sa.String(), 'text')
+    else:
+        rewrite_values(lambda value: str(uuid.UUID(bytes=value)))
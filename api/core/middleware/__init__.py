@@ -0,0 +1,6 @@
+from api.core.middleware.compression import CompressionMiddleware
+from api.core.middleware.cors import CredentialedOriginMiddleware
+from api.core.middleware.idempotency import IdempotencyMiddleware
+from api.core.middleware.metrics import PrometheusMiddleware
+from api.core.middleware.profiling import ProfilingMiddleware
+from api.core.middleware.timing import ServerTimingMiddleware
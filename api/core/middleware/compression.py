@@ -0,0 +1,131 @@
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional. Only gzip is offered without it
+    brotli = None
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware which compresses response bodies with brotli or gzip,
+    depending on the client's Accept-Encoding header.
+
+    Only complete responses are compressed. Responses smaller than `minimum_size`,
+    streamed responses (more than one body message), responses which already
+    have a Content-Encoding and non textual content types are sent untouched.
+    """
+
+    COMPRESSIBLE_TYPES = ("text/", "application/json", "application/xml")
+    EXCLUDED_TYPES = ("text/event-stream",)
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1000,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.choose_encoding(
+            Headers(scope=scope).get("accept-encoding", "")
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            # First body message. Decide whether the response is compressed
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start_message["headers"])
+
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not self.is_compressible(headers.get("content-type", ""))
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = self.compress(body, encoding)
+
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def choose_encoding(accept_encoding: str) -> str | None:
+        """Picks the encoding the client ranks highest among those the server
+        supports. The server's preference of brotli over gzip only breaks ties
+
+        Args:
+            accept_encoding (str): Value of the Accept-Encoding request header
+
+        Returns:
+            str | None: 'br', 'gzip' or None if neither is acceptable
+        """
+        accepted: dict[str, float] = {}
+
+        for item in accept_encoding.lower().split(","):
+            coding, _, params = item.strip().partition(";")
+            quality = 1.0
+            if params.strip().startswith("q="):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+            if coding:
+                accepted[coding] = quality
+
+        default = accepted.get("*", 0.0)
+        supported = ("br", "gzip") if brotli is not None else ("gzip",)
+
+        # max keeps the first of equally ranked codings, i.e. the server's pick
+        best = max(supported, key=lambda coding: accepted.get(coding, default))
+        return best if accepted.get(best, default) > 0 else None
+
+    def is_compressible(self, content_type: str) -> bool:
+        """Checks if a response of a given content type is worth compressing"""
+        content_type = content_type.lower()
+
+        if content_type.startswith(self.EXCLUDED_TYPES):
+            return False
+        return content_type.startswith(self.COMPRESSIBLE_TYPES)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        """Compresses the body with the given encoding"""
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
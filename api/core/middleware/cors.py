@@ -0,0 +1,32 @@
+from typing import Iterable
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class CredentialedOriginMiddleware:
+    """Pure ASGI middleware which pins the Access-Control-Allow-Origin header
+    of responses on a fixed set of paths to a single origin.
+
+    Browsers reject credentialed responses (e.g. ones setting the session cookie)
+    with a wildcard origin, so the auth routes must name the frontend explicitly.
+    Requests to any other path are passed through without being wrapped.
+    """
+
+    def __init__(self, app: ASGIApp, paths: Iterable[str], allow_origin: str) -> None:
+        self.app = app
+        self.paths = frozenset(paths)
+        self.allow_origin = allow_origin
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["Access-Control-Allow-Origin"] = self.allow_origin
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
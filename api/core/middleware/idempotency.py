@@ -0,0 +1,184 @@
+import hashlib
+import re
+from typing import Any, Callable, Iterable
+
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.db.database import app_session
+from api.db.types import UUID_PATTERN
+from api.utils.idempotency_store import IdempotencyStore, StoredResponse
+from api.utils.metrics import idempotency_requests_total
+
+
+class IdempotencyMiddleware:
+    """Pure ASGI middleware which honours the Idempotency-Key header of POST
+    requests on a fixed set of paths.
+
+    The successful (2xx) response to the first request made with a key is
+    stored, and repeats of that request get it back, with an
+    `Idempotent-Replayed: true` header, without reaching the route. Keys must be
+    UUIDs and are scoped by path and caller: the Authorization header, or the
+    client address for anonymous requests. A repeat while the first request
+    is still being handled gets a 409, and reusing a key with another body a
+    422. Failed responses aren't stored, so the request can be retried with the
+    same key. Requests without the header are passed through untouched.
+
+    The store runs on sessions from the app's get_db dependency, overrides included.
+    """
+
+    REQUEST_HEADER = "idempotency-key"
+
+    def __init__(
+        self, app: ASGIApp, paths: Iterable[str], store: IdempotencyStore
+    ) -> None:
+        self.app = app
+        self.paths = frozenset(paths)
+        self.store = store
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(self.REQUEST_HEADER)
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not re.match(UUID_PATTERN, idempotency_key):
+            await self.error(400, "Idempotency-Key must be a UUID")(
+                scope, receive, send
+            )
+            return
+
+        body = await self.read_body(receive)
+        fingerprint = hashlib.sha256(body).hexdigest()
+        client = scope.get("client")
+        key = self.scoped_key(
+            scope["path"],
+            headers.get("authorization", ""),
+            client[0] if client else "",
+            idempotency_key,
+        )
+        outcome, stored = await self.run_store(
+            scope, self.store.reserve, key, fingerprint
+        )
+        idempotency_requests_total.inc(result=outcome)
+
+        if outcome == IdempotencyStore.REPLAY:
+            await self.replay(stored, send)
+            return
+        if outcome == IdempotencyStore.IN_FLIGHT:
+            await self.error(
+                409, "A request with this Idempotency-Key is still being processed"
+            )(scope, receive, send)
+            return
+        if outcome == IdempotencyStore.MISMATCH:
+            await self.error(
+                422, "This Idempotency-Key was used with a different request body"
+            )(scope, receive, send)
+            return
+
+        body_sent = False
+
+        async def receive_wrapper() -> Message:
+            nonlocal body_sent
+
+            # The body was consumed to fingerprint it. Hand it to the app once
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status_code: int | None = None
+        response_headers: list[tuple[bytes, bytes]] = []
+        chunks: list[bytes] = []
+        complete = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_headers, complete
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Copied before outer middleware (e.g. compression) edits them
+                response_headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                complete = not message.get("more_body", False)
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            if complete and 200 <= status_code < 300:
+                await self.run_store(
+                    scope,
+                    self.store.complete,
+                    key,
+                    StoredResponse(
+                        fingerprint=fingerprint,
+                        status=status_code,
+                        headers=response_headers,
+                        body=b"".join(chunks),
+                    ),
+                )
+            else:
+                await self.run_store(scope, self.store.release, key)
+
+    @staticmethod
+    async def run_store(scope: Scope, method: Callable, *args) -> Any:
+        """Runs a store method in the threadpool, on a session from the app's get_db"""
+
+        def call() -> Any:
+            with app_session(scope.get("app")) as db:
+                return method(db, *args)
+
+        return await run_in_threadpool(call)
+
+    @staticmethod
+    async def read_body(receive: Receive) -> bytes:
+        """Reads the whole request body"""
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+    @staticmethod
+    def scoped_key(
+        path: str, authorization: str, client_host: str, idempotency_key: str
+    ) -> str:
+        """Scopes a key to the route and caller, so clients can't read each
+        other's responses by reusing a key. Anonymous callers are told apart by
+        their address. Keys are compared case insensitively, like UUIDs"""
+        caller = f"auth:{authorization}" if authorization else f"client:{client_host}"
+        caller = hashlib.sha256(caller.encode()).hexdigest()
+        return f"{path}:{caller}:{idempotency_key.lower()}"
+
+    @staticmethod
+    async def replay(stored: StoredResponse, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": stored.status,
+                "headers": [*stored.headers, (b"idempotent-replayed", b"true")],
+            }
+        )
+        await send({"type": "http.response.body", "body": stored.body})
+
+    @staticmethod
+    def error(status_code: int, message: str) -> JSONResponse:
+        return JSONResponse(
+            status_code=status_code,
+            content={"success": False, "status_code": status_code, "message": message},
+        )
@@ -0,0 +1,57 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.utils.metrics import (
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    http_requests_total,
+)
+
+
+class PrometheusMiddleware:
+    """Pure ASGI middleware which records request counts, latencies and the
+    number of in-flight requests.
+
+    Requests are labelled with the template of the route that handled them
+    (e.g. /api/v1/assigned-submissions/{id}) rather than the raw path, which keeps
+    the number of label values bounded. Unmatched paths share one label.
+    """
+
+    UNMATCHED_ROUTE = "<unmatched>"
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            route_template = getattr(route, "path", self.UNMATCHED_ROUTE)
+            method = scope["method"]
+
+            http_request_duration_seconds.observe(
+                time.perf_counter() - start, method=method, route=route_template
+            )
+            http_requests_total.inc(
+                method=method, route=route_template, status=status_code
+            )
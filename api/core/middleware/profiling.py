@@ -0,0 +1,192 @@
+import os
+import time
+import uuid
+
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.db.database import app_session
+from api.utils.logger import logger
+from api.utils.profiler import ProfileRateLimiter, SamplingProfiler
+from api.v1.services.moderator import mod_service
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware which profiles requests on demand.
+
+    A request sent by an admin with an `X-Profile` header is run under a
+    sampling profiler. The call tree, time by layer (routes, services, models,
+    pydantic, database) and the raw stacks are written to `profile_dir`, and the
+    response carries the profile's id in an `X-Profile-Id` header.
+
+    Only one request is profiled at a time, at most once every `min_interval`
+    seconds across all admins. The limit is per worker process: with N workers,
+    up to N requests may be profiled every `min_interval` seconds. The outcome
+    is reported in `X-Profile-Status`.
+    """
+
+    REQUEST_HEADER = "x-profile"
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        profile_dir: str,
+        min_interval: float,
+        sample_interval: float,
+    ) -> None:
+        self.app = app
+        self.profile_dir = profile_dir
+        self.sample_interval = sample_interval
+        self.rate_limiter = ProfileRateLimiter(min_interval)
+        self._in_flight = 0
+        self._max_concurrency = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Requests in flight are tracked so a profile can say whether its
+        # samples may include other requests
+        self._in_flight += 1
+        self._max_concurrency = max(self._max_concurrency, self._in_flight)
+        try:
+            headers = Headers(scope=scope)
+            if self.REQUEST_HEADER not in headers:
+                await self.app(scope, receive, send)
+            else:
+                await self.profile(scope, receive, send, headers)
+        finally:
+            self._in_flight -= 1
+
+    async def profile(
+        self, scope: Scope, receive: Receive, send: Send, headers: Headers
+    ) -> None:
+        # The token is checked and the slot reserved before the admin is
+        # looked up, so rejected and rate limited requests don't hit the database
+        credentials = self.bearer_credentials(headers)
+        if credentials is None:
+            await self.app(scope, receive, self.with_headers(send, status="forbidden"))
+            return
+
+        if not self.rate_limiter.acquire():
+            await self.app(
+                scope, receive, self.with_headers(send, status="rate-limited")
+            )
+            return
+
+        if not await run_in_threadpool(self.is_admin, scope, credentials):
+            self.rate_limiter.cancel()
+            await self.app(scope, receive, self.with_headers(send, status="forbidden"))
+            return
+
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        status_code = 500
+        send_with_headers = self.with_headers(
+            send, status="captured", profile_id=profile_id
+        )
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send_with_headers(message)
+
+        profiler = SamplingProfiler(self.sample_interval)
+        self._max_concurrency = self._in_flight
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            self.rate_limiter.release()
+
+            report = self.build_report(
+                profile_id, scope, status_code, profiler, self._max_concurrency
+            )
+            await run_in_threadpool(self.store, profile_id, report, profiler.folded())
+            logger.info(
+                f"Profiled {scope['method']} {scope['path']} as {profile_id} "
+                f"({sum(profiler.samples.values())} samples)"
+            )
+
+    @staticmethod
+    def bearer_credentials(headers: Headers) -> HTTPAuthorizationCredentials | None:
+        """Returns the request's bearer credentials, None if the token is
+        missing or invalid. Only decodes the token"""
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+
+        try:
+            mod_service.verify_access_token(token, HTTPException(status_code=401))
+        except HTTPException:
+            return None
+        return HTTPAuthorizationCredentials(scheme=scheme, credentials=token)
+
+    @staticmethod
+    def is_admin(scope: Scope, credentials: HTTPAuthorizationCredentials) -> bool:
+        """Checks the credentials with get_current_admin, the check admin
+        routes depend on"""
+        with app_session(scope.get("app")) as db:
+            try:
+                mod_service.get_current_admin(credentials=credentials, db=db)
+            except HTTPException:
+                return False
+            return True
+
+    @staticmethod
+    def with_headers(send: Send, status: str, profile_id: str | None = None) -> Send:
+        """Wraps `send` to add the profiling headers to the response"""
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-Profile-Status"] = status
+                if profile_id is not None:
+                    headers["X-Profile-Id"] = profile_id
+            await send(message)
+
+        return send_wrapper
+
+    @staticmethod
+    def build_report(
+        profile_id: str,
+        scope: Scope,
+        status_code: int,
+        profiler: SamplingProfiler,
+        max_concurrency: int,
+    ) -> str:
+        total = sum(profiler.samples.values())
+        lines = [
+            f"Profile {profile_id}",
+            f"{scope['method']} {scope['path']} -> {status_code}",
+            f"Duration: {profiler.duration * 1000:.1f} ms, {total} samples "
+            f"every {profiler.interval * 1000:g} ms",
+        ]
+        if max_concurrency > 1:
+            lines.append(
+                f"Up to {max_concurrency} requests were in flight, "
+                "samples may include the others"
+            )
+
+        lines += ["", "Time by layer:"]
+        for layer, count in profiler.layer_breakdown().items():
+            lines.append(f"  {layer:<10} {count * 100 / total:5.1f}%")
+
+        lines += ["", "Call tree (% of samples):"]
+        lines += [f"  {line}" for line in profiler.call_tree()]
+        return "\n".join(lines) + "\n"
+
+    def store(self, profile_id: str, report: str, folded: str) -> None:
+        """Writes the report and the collapsed stacks to the profile directory"""
+        os.makedirs(self.profile_dir, exist_ok=True)
+
+        with open(os.path.join(self.profile_dir, f"{profile_id}.txt"), "w") as f:
+            f.write(report)
+        with open(os.path.join(self.profile_dir, f"{profile_id}.folded"), "w") as f:
+            f.write(folded)
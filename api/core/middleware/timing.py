@@ -0,0 +1,60 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.utils.logger import logger
+from api.utils.request_timing import start_request_timings, end_request_timings
+
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware which times every request.
+
+    The total time, time spent running SQL statements, number of statements and
+    time spent serializing the response are sent to the client in a
+    Server-Timing header and written to the log once the request completes.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = start_request_timings()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.server_timing(timings.elapsed()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end_request_timings(token)
+
+            total_ms = round(timings.elapsed() * 1000, 2)
+            db_ms = round(timings.db_time * 1000, 2)
+            serialize_ms = round(timings.serialize_time * 1000, 2)
+
+            logger.info(
+                f"Request timing: method={scope['method']} path={scope['path']} "
+                f"status={status_code} total_ms={total_ms} db_ms={db_ms} "
+                f"db_queries={timings.db_queries} serialize_ms={serialize_ms}",
+                extra={
+                    "request_timing": {
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status_code,
+                        "total_ms": total_ms,
+                        "db_ms": db_ms,
+                        "db_queries": timings.db_queries,
+                        "serialize_ms": serialize_ms,
+                    }
+                },
+            )
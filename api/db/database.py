@@ -1,8 +1,12 @@
 """ The database module
 """
 
+import inspect
+import sqlite3
+from contextlib import contextmanager
+
 from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from api.utils.settings import settings, BASE_DIR
 
 
@@ -33,7 +37,18 @@ def get_db_engine(test_mode: bool = False):
     return create_engine(DATABASE_URL)
 
 
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite only enforces foreign keys, ON DELETE CASCADE included, when
+    enabled on each connection. Registered on the app's engine only, so other
+    engines in the process (e.g. Alembic's) keep SQLite's default"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
 engine = get_db_engine()
+event.listen(engine, "connect", enable_sqlite_foreign_keys)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 db_session = scoped_session(SessionLocal)
@@ -51,3 +66,24 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+@contextmanager
+def app_session(app=None):
+    """Opens a session from get_db, or from its override on the given app, for
+    code which runs outside of a route, like middleware and background tasks
+
+    Args:
+        app (FastAPI | None, optional): The app whose dependency_overrides are
+        honoured. Defaults to None.
+    """
+    dependency = getattr(app, "dependency_overrides", {}).get(get_db, get_db)
+    sessions = dependency()
+    if not inspect.isgenerator(sessions):
+        yield sessions
+        return
+
+    try:
+        yield next(sessions)
+    finally:
+        sessions.close()
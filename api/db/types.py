@@ -0,0 +1,80 @@
+""" Column types shared by the models
+"""
+
+import uuid
+
+from sqlalchemy import LargeBinary, String
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import TypeDecorator
+
+# Canonical 8-4-4-4-12 form, for validating ids given as query parameters
+UUID_PATTERN = r"^[0-9a-fA-F]{8}-([0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}$"
+
+
+def is_uuid(value) -> bool:
+    """Checks whether a value can be stored in a UUIDString column"""
+    try:
+        uuid.UUID(str(value))
+    except ValueError:
+        return False
+    return True
+
+
+class UUIDString(TypeDecorator):
+    """A UUID handled as its canonical string in Python, so the API keeps its
+    string ids, but stored natively: as UUID on PostgreSQL and as 16 bytes on
+    other databases instead of 36 characters of text.
+
+    Binding a value which isn't a UUID raises a StatementError, check untrusted
+    ids with is_uuid first.
+    """
+
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=False))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if dialect.name == "postgresql":
+            return str(uuid.UUID(str(value)))
+        return uuid.UUID(str(value)).bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if dialect.name == "postgresql":
+            return str(value)
+        # Same as str(uuid.UUID(bytes=value)), without building a UUID per row
+        h = value.hex()
+        return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+class uuid_text(FunctionElement):
+    """The text form of a UUIDString column, for SQL string functions such as
+    aggregate_strings. Canonical on PostgreSQL and 32 hex digits elsewhere,
+    read back with to_uuid_string"""
+
+    type = String()
+    inherit_cache = True
+
+
+@compiles(uuid_text)
+def _compile_uuid_text(element, compiler, **kw):
+    return "lower(hex(%s))" % compiler.process(element.clauses, **kw)
+
+
+@compiles(uuid_text, "postgresql")
+def _compile_uuid_text_postgresql(element, compiler, **kw):
+    return "CAST(%s AS TEXT)" % compiler.process(element.clauses, **kw)
+
+
+def to_uuid_string(value: str) -> str:
+    """Converts the output of uuid_text to the canonical string of the UUID"""
+    return str(uuid.UUID(value))
@@ -0,0 +1,218 @@
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from api.utils.metrics import cache_requests_total
+from api.utils.settings import settings
+from api.utils.sql_queries import (
+    query_for_trivia_availability,
+    query_for_trivia_totals,
+)
+
+
+class AvailabilityMatrix:
+    """In-process cache of the number of trivias available per
+    (category, difficulty) pair, broken down by country. Trivias without a
+    category are left out, as they are never served as questions.
+
+    Each cell holds:
+        * total- the number of trivias in the cell
+        * without_country- trivias not tied to any country. These are served
+        for every country filter
+        * countries- a mapping of country name to the number of trivias tied to it
+
+    The matrix is loaded from the database on first use and reloaded once it is
+    older than `ttl` seconds. Trivia writes handled by this process update it
+    in place so it stays accurate in between reloads. Writes of other processes
+    are only seen after a reload, which a request the matrix can't satisfy may
+    trigger early, at most once every `miss_reload_interval` seconds.
+    """
+
+    def __init__(self, ttl: int, miss_reload_interval: float = 5):
+        self.ttl = ttl
+        self.miss_reload_interval = miss_reload_interval
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._cells: dict[tuple[str, str], dict] | None = None
+        self._loaded_at = 0.0
+
+    @staticmethod
+    def _empty_cell() -> dict:
+        return {"total": 0, "without_country": 0, "countries": {}}
+
+    def is_fresh(self) -> bool:
+        """Checks if the matrix is loaded and within its ttl"""
+        return (
+            self._cells is not None
+            and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+    def _ensure_fresh(self, db: Session) -> None:
+        """Reloads the matrix if it is stale, recording the lookup as a cache hit or miss"""
+        if self.is_fresh():
+            cache_requests_total.inc(cache="availability_matrix", result="hit")
+            return
+
+        cache_requests_total.inc(cache="availability_matrix", result="miss")
+        self.refresh(db)
+
+    def refresh(self, db: Session) -> None:
+        """Rebuilds the whole matrix from the database
+
+        Args:
+            db (Session): The database session
+        """
+        cells: dict[tuple[str, str], dict] = {}
+
+        for category, difficulty, total in db.execute(query_for_trivia_totals()).all():
+            key = (category, getattr(difficulty, "value", difficulty))
+            cells.setdefault(key, self._empty_cell())["total"] = total
+
+        for category, difficulty, country, count in db.execute(
+            query_for_trivia_availability()
+        ).all():
+            cell = cells.setdefault(
+                (category, getattr(difficulty, "value", difficulty)),
+                self._empty_cell(),
+            )
+            if country is None:
+                cell["without_country"] = count
+            else:
+                cell["countries"][country] = count
+
+        with self._lock:
+            self._cells = cells
+            self._loaded_at = time.monotonic()
+
+    def refresh_on_miss(self, db: Session) -> bool:
+        """Reloads the matrix after it reported too few trivias for a request,
+        unless it was loaded less than `miss_reload_interval` seconds ago or
+        another thread is already reloading it. Requests which can't be satisfied
+        thus run the reload queries at most once per interval
+
+        Args:
+            db (Session): The database session
+
+        Returns:
+            bool: True if the matrix was reloaded
+        """
+        if time.monotonic() - self._loaded_at < self.miss_reload_interval:
+            return False
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+
+        try:
+            # Reloaded by another thread in between
+            if time.monotonic() - self._loaded_at < self.miss_reload_interval:
+                return False
+            self.refresh(db)
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def invalidate(self) -> None:
+        """Forces a reload of the matrix on its next use"""
+        with self._lock:
+            self._cells = None
+
+    def snapshot(self, db: Session) -> list[dict]:
+        """Returns the matrix as a list of cells, reloading it first if stale
+
+        Args:
+            db (Session): The database session
+
+        Returns:
+            list[dict]: A list of cells, each with its category and difficulty
+        """
+        self._ensure_fresh(db)
+
+        with self._lock:
+            return [
+                {
+                    "category": category,
+                    "difficulty": difficulty,
+                    "total": cell["total"],
+                    "without_country": cell["without_country"],
+                    "countries": dict(cell["countries"]),
+                }
+                for (category, difficulty), cell in sorted(self._cells.items())
+            ]
+
+    def count(
+        self,
+        db: Session,
+        category: str | None = None,
+        country: str | None = None,
+        difficulty: str | None = None,
+    ) -> int:
+        """Counts trivias that match the given filters. A None filter matches everything.
+        This mirrors the filtering done by `query_for_question_retrieval`
+
+        Args:
+            db (Session): The database session. Only used if the matrix needs a reload
+            category (str | None, optional): Category name. Defaults to None.
+            country (str | None, optional): Country name. Defaults to None.
+            difficulty (str | None, optional): Difficulty value. Defaults to None.
+
+        Returns:
+            int: The number of matching trivias
+        """
+        self._ensure_fresh(db)
+
+        total = 0
+        with self._lock:
+            for (c_category, c_difficulty), cell in self._cells.items():
+                if category is not None and c_category != category:
+                    continue
+                if difficulty is not None and c_difficulty != difficulty:
+                    continue
+
+                if country is None:
+                    total += cell["total"]
+                else:
+                    total += cell["without_country"] + cell["countries"].get(
+                        country, 0
+                    )
+        return total
+
+    def _apply(
+        self, category: str | None, difficulty: str, countries: list[str], step: int
+    ) -> None:
+        # Trivias without a category aren't served, so aren't counted
+        if category is None:
+            return
+
+        with self._lock:
+            # Nothing to update until the matrix is first loaded
+            if self._cells is None:
+                return
+
+            cell = self._cells.setdefault((category, difficulty), self._empty_cell())
+            cell["total"] = max(cell["total"] + step, 0)
+
+            if not countries:
+                cell["without_country"] = max(cell["without_country"] + step, 0)
+
+            for country in countries:
+                cell["countries"][country] = max(
+                    cell["countries"].get(country, 0) + step, 0
+                )
+
+    def record_added(
+        self, category: str | None, difficulty: str, countries: list[str]
+    ) -> None:
+        """Adds a newly created trivia to the matrix"""
+        self._apply(category, difficulty, countries, 1)
+
+    def record_removed(
+        self, category: str | None, difficulty: str, countries: list[str]
+    ) -> None:
+        """Removes a deleted trivia from the matrix"""
+        self._apply(category, difficulty, countries, -1)
+
+
+availability_matrix = AvailabilityMatrix(
+    ttl=settings.AVAILABILITY_CACHE_TTL,
+    miss_reload_interval=settings.AVAILABILITY_MISS_RELOAD_INTERVAL,
+)
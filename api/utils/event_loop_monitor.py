@@ -0,0 +1,126 @@
+import asyncio
+import math
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import suppress
+
+from api.utils.logger import logger
+from api.utils.metrics import Counter, Gauge, Histogram
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LAG_QUANTILES = (0.5, 0.95, 0.99)
+
+event_loop_lag_seconds = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between when an event loop heartbeat was due and when it ran",
+    buckets=LAG_BUCKETS,
+)
+event_loop_lag_quantile_seconds = Gauge(
+    "event_loop_lag_quantile_seconds",
+    "Event loop lag quantiles over the recent heartbeats of each worker process",
+    ["quantile", "pid"],
+)
+event_loop_blocks_total = Counter(
+    "event_loop_blocks_total",
+    "Times the event loop was blocked for longer than the threshold",
+)
+
+
+class EventLoopMonitor:
+    """Detects code which blocks the event loop.
+
+    A heartbeat task sleeps for `interval` seconds at a time and records how
+    late it wakes up as the loop's lag. A watchdog thread checks the time of the
+    last heartbeat, and when the loop has been stuck for longer than `threshold`
+    seconds it logs the stack of the loop's thread, which shows the coroutine
+    holding it (e.g. a route making a synchronous DB or bcrypt call).
+    """
+
+    def __init__(self, threshold: float, interval: float, window: int = 1000):
+        self.threshold = threshold
+        self.interval = interval
+        self._lags: deque[float] = deque(maxlen=window)
+        self._pid = str(os.getpid())
+        self._last_beat = time.monotonic()
+        self._reported_beat: float | None = None
+        self._stop = threading.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._thread = threading.Thread(
+            target=self._watch, name="event-loop-watchdog", daemon=True
+        )
+
+    def start(self) -> None:
+        """Starts monitoring the running event loop. Must be called from it"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = self._loop.create_task(
+            self._heartbeat(), name="event-loop-heartbeat"
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        self._thread.join()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            due = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+
+            self._last_beat = time.monotonic()
+            self.record_lag(max(self._last_beat - due, 0.0))
+
+    def record_lag(self, lag: float) -> None:
+        """Records one lag measurement and updates the quantile gauges"""
+        event_loop_lag_seconds.observe(lag)
+        self._lags.append(lag)
+
+        for quantile, value in self.quantiles().items():
+            event_loop_lag_quantile_seconds.set(
+                value, quantile=quantile, pid=self._pid
+            )
+
+    def quantiles(self) -> dict[float, float]:
+        """Returns the lag quantiles (nearest rank) over the recent heartbeats"""
+        lags = sorted(self._lags)
+        if not lags:
+            return {}
+        return {q: lags[math.ceil(q * len(lags)) - 1] for q in LAG_QUANTILES}
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            last_beat = self._last_beat
+            blocked_for = time.monotonic() - last_beat - self.interval
+
+            # Each block is reported once, however long it lasts
+            if blocked_for < self.threshold or last_beat == self._reported_beat:
+                continue
+            self._reported_beat = last_beat
+            self.report_block(blocked_for)
+
+    def report_block(self, blocked_for: float) -> None:
+        """Logs the stack of the event loop's thread while it is blocked"""
+        event_loop_blocks_total.inc()
+
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame else "<unavailable>\n"
+        task = asyncio.current_task(self._loop)
+        task_name = task.get_name() if task is not None else None
+        blocked_ms = round(blocked_for * 1000, 2)
+
+        logger.warning(
+            f"Event loop blocked for at least {blocked_ms} ms "
+            f"in task {task_name}:\n{stack}",
+            extra={"event_loop_block": {"blocked_ms": blocked_ms, "task": task_name}},
+        )
@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from api.db.database import app_session
+from api.utils.logger import logger
+from api.v1.models.idempotency_key import IdempotencyKey
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """A response kept for replay, with the fingerprint of the request body
+    which produced it"""
+
+    fingerprint: str
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+
+class IdempotencyStore:
+    """Store of the responses to requests made with an idempotency key, in the
+    idempotency_keys table so every worker process shares it. Every method runs
+    on, and commits, the session it is given.
+
+    A key is reserved by inserting its row when its first request starts, the
+    primary key making sure a single worker gets it, and the response is written
+    to that row once handled. Responses are kept for `ttl` seconds. A reservation
+    older than `lock_timeout` seconds is taken to be abandoned (e.g. its worker
+    died) and can be taken over. Expired rows are ignored on lookup and deleted
+    by `purge_expired`.
+    """
+
+    NEW = "new"
+    REPLAY = "replay"
+    IN_FLIGHT = "in_flight"
+    MISMATCH = "mismatch"
+
+    def __init__(self, ttl: float, lock_timeout: float = 60):
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+
+    @staticmethod
+    def _row_key(key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    def _expired(self, now: datetime):
+        """Filter matching the rows whose response or reservation has expired"""
+        return or_(
+            IdempotencyKey.created_at < now - timedelta(seconds=self.ttl),
+            IdempotencyKey.status_code.is_(None)
+            & (IdempotencyKey.created_at < now - timedelta(seconds=self.lock_timeout)),
+        )
+
+    def reserve(
+        self, db: Session, key: str, fingerprint: str
+    ) -> tuple[str, StoredResponse | None]:
+        """Looks a key up and reserves it if it is unknown
+
+        Args:
+            db (Session): The database session
+            key (str): The idempotency key, scoped by the caller
+            fingerprint (str): Fingerprint of the request body
+
+        Returns:
+            tuple: The outcome, one of NEW (the key is now reserved), REPLAY,
+            IN_FLIGHT or MISMATCH (the key was used with another body), and the
+            stored response for REPLAY
+        """
+        row_key = self._row_key(key)
+        now = self._now()
+
+        db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.key == row_key, self._expired(now)
+            )
+        )
+        try:
+            db.execute(
+                insert(IdempotencyKey).values(
+                    key=row_key, fingerprint=fingerprint, created_at=now
+                )
+            )
+            db.commit()
+            return self.NEW, None
+        except IntegrityError:
+            db.rollback()
+
+        row = db.execute(
+            select(
+                IdempotencyKey.fingerprint,
+                IdempotencyKey.status_code,
+                IdempotencyKey.headers,
+                IdempotencyKey.body,
+            ).where(IdempotencyKey.key == row_key)
+        ).one_or_none()
+        db.commit()
+
+        if row is None:
+            # Released by its worker in between. Let the client retry
+            return self.IN_FLIGHT, None
+        if row.fingerprint != fingerprint:
+            return self.MISMATCH, None
+        if row.status_code is None:
+            return self.IN_FLIGHT, None
+
+        return self.REPLAY, StoredResponse(
+            fingerprint=row.fingerprint,
+            status=row.status_code,
+            headers=[(n.encode("latin-1"), v.encode("latin-1")) for n, v in row.headers],
+            body=row.body,
+        )
+
+    def complete(self, db: Session, key: str, response: StoredResponse) -> None:
+        """Stores the response to a reserved key"""
+        db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == self._row_key(key))
+            .values(
+                status_code=response.status,
+                headers=[
+                    [n.decode("latin-1"), v.decode("latin-1")]
+                    for n, v in response.headers
+                ],
+                body=response.body,
+                created_at=self._now(),
+            )
+        )
+        db.commit()
+
+    def release(self, db: Session, key: str) -> None:
+        """Releases a reserved key without storing anything, so it can be retried"""
+        db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.key == self._row_key(key),
+                IdempotencyKey.status_code.is_(None),
+            )
+        )
+        db.commit()
+
+    def purge_expired(self, db: Session) -> int:
+        """Deletes the expired responses and abandoned reservations
+
+        Returns:
+            int: The number of rows deleted
+        """
+        result = db.execute(delete(IdempotencyKey).where(self._expired(self._now())))
+        db.commit()
+        return result.rowcount
+
+
+class IdempotencyPurger:
+    """Background task which deletes the expired rows of an IdempotencyStore
+    every `interval` seconds, on sessions from the app's get_db"""
+
+    def __init__(self, store: IdempotencyStore, app, interval: float):
+        self.store = store
+        self.app = app
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Starts purging. Must be called from the running event loop"""
+        self._task = asyncio.get_running_loop().create_task(
+            self._run(), name="idempotency-purger"
+        )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+
+    def purge(self) -> int:
+        with app_session(self.app) as db:
+            return self.store.purge_expired(db)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                deleted = await run_in_threadpool(self.purge)
+                if deleted:
+                    logger.info(f"Purged {deleted} expired idempotency keys")
+            except Exception as e:
+                logger.exception(e)
+            await asyncio.sleep(self.interval)
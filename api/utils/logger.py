@@ -1,11 +1,138 @@
+import atexit
+import copy
+import json
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
 
+from api.utils.metrics import Counter
+from api.utils.settings import settings
 
-# Configure the logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler("logfile.log"), logging.StreamHandler()],
+log_records_dropped_total = Counter(
+    "log_records_dropped_total",
+    "Log records dropped because the logging queue was full, by level",
+    ["level"],
 )
 
-logger = logging.getLogger(__name__)
\ No newline at end of file
+# Attributes set on every LogRecord. Anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(
+    vars(logging.LogRecord("", logging.INFO, "", 0, "", None, None))
+) | {"message", "asctime"}
+
+
+# Formats the tracebacks of queued records, which can't carry exc_info across threads
+_exception_formatter = logging.Formatter()
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats records as JSON lines, including any fields passed through `extra`"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "logger": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        entry.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES
+        )
+        # Records passed through a DroppingQueueHandler carry the traceback
+        # already formatted in exc_text
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler for a bounded queue. When the queue is full, records are
+    dropped and counted instead of blocking the caller"""
+
+    listener: QueueListener | None = None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merges the arguments into the message like QueueHandler.prepare, but
+        keeps the traceback apart in exc_text instead of folding it into the
+        message, so formatters can still tell them apart"""
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped_total.inc(level=record.levelname)
+
+
+class LogQueueListener(QueueListener):
+    """QueueListener which waits for room in a full queue when stopping,
+    so records queued before shutdown are still written"""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            super().stop()
+
+
+_listeners: list[QueueListener] = []
+
+
+def create_queue_handler(
+    *handlers: logging.Handler, max_size: int = settings.LOG_QUEUE_SIZE
+) -> DroppingQueueHandler:
+    """Creates a handler which passes records to the given handlers on a
+    background thread, so the logging call never waits on disk or console IO
+
+    Args:
+        *handlers (logging.Handler): The handlers that write the records
+        max_size (int, optional): Number of records buffered before new ones
+        are dropped. Defaults to LOG_QUEUE_SIZE.
+
+    Returns:
+        DroppingQueueHandler: The handler to attach to loggers
+    """
+    log_queue = queue.Queue(maxsize=max_size)
+    listener = LogQueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.listener = listener
+    return queue_handler
+
+
+@atexit.register
+def stop_queue_listeners() -> None:
+    """Writes out the records still queued and stops the listener threads"""
+    while _listeners:
+        _listeners.pop().stop()
+
+
+# Every worker appends to the same file, so it is rotated externally (e.g. by
+# logrotate). Each worker reopens the file once it has been moved
+file_handler = WatchedFileHandler(settings.LOG_FILE, delay=True)
+file_handler.setFormatter(JSONFormatter())
+
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(
+    logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+)
+
+# Configure the logging
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+root_logger.addHandler(create_queue_handler(file_handler, stream_handler))
+
+logger = logging.getLogger(__name__)
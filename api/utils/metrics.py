@@ -0,0 +1,376 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+When METRICS_MULTIPROC_DIR is set, every worker process periodically writes a
+snapshot of its metrics to that directory and a scrape merges the snapshots of
+all workers, so `/metrics` reports the same totals whichever worker serves it.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Callable, Iterable
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0
+)
+
+
+class MetricsRegistry:
+    """Collection of all metrics exposed by the application"""
+
+    def __init__(self):
+        self._metrics: dict[str, "Metric"] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: "Metric") -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def snapshot(self) -> dict[str, dict]:
+        """Returns the current value of every metric in a JSON serializable form"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def write_snapshot(self, directory: str) -> None:
+        """Atomically writes this process' snapshot to the given directory"""
+        path = os.path.join(directory, f"metrics_{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+
+        with open(tmp_path, "w") as f:
+            json.dump({"pid": os.getpid(), "metrics": self.snapshot()}, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def merge_snapshots(directory: str) -> dict[str, dict]:
+        """Merges the snapshots of every process found in the given directory.
+        Counters and histograms are summed over all processes, dead ones included.
+        Gauges are only summed over processes which are still running.
+
+        Args:
+            directory (str): The directory snapshots are written to
+
+        Returns:
+            dict: A single snapshot in the same form as `MetricsRegistry.snapshot`
+        """
+        merged: dict[str, dict] = {}
+
+        for filename in sorted(os.listdir(directory)):
+            if not (filename.startswith("metrics_") and filename.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(directory, filename)) as f:
+                    process_snapshot = json.load(f)
+            except (OSError, ValueError):
+                # Snapshot removed or being replaced. Skip it for this scrape
+                continue
+
+            alive = _process_is_alive(process_snapshot["pid"])
+
+            for name, metric in process_snapshot["metrics"].items():
+                if metric["type"] == "gauge" and not alive:
+                    continue
+
+                target = merged.setdefault(name, {**metric, "samples": {}})
+                for key, value in metric["samples"].items():
+                    if key not in target["samples"]:
+                        target["samples"][key] = value
+                    elif metric["type"] == "histogram":
+                        existing = target["samples"][key]
+                        target["samples"][key] = {
+                            "buckets": [
+                                a + b for a, b in zip(existing["buckets"], value["buckets"])
+                            ],
+                            "sum": existing["sum"] + value["sum"],
+                            "count": existing["count"] + value["count"],
+                        }
+                    else:
+                        target["samples"][key] += value
+
+        return merged
+
+    @staticmethod
+    def render(snapshot: dict[str, dict]) -> str:
+        """Renders a snapshot in the Prometheus text exposition format"""
+        lines = []
+
+        for name, metric in sorted(snapshot.items()):
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+
+            for key, value in sorted(metric["samples"].items()):
+                labels = list(zip(metric["labelnames"], json.loads(key)))
+
+                if metric["type"] != "histogram":
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+
+                for bound, count in zip(metric["buckets"], value["buckets"]):
+                    bucket_labels = labels + [("le", _format_value(bound))]
+                    lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {count}")
+                inf_labels = labels + [("le", "+Inf")]
+                lines.append(f"{name}_bucket{_format_labels(inf_labels)} {value['count']}")
+                lines.append(
+                    f"{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}"
+                )
+                lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def generate_latest(self, multiproc_dir: str | None = None) -> str:
+        """Returns the metrics of this process, or of all processes when a
+        multiprocess directory is given, in the Prometheus text format"""
+        if not multiproc_dir:
+            return self.render(self.snapshot())
+
+        self.write_snapshot(multiproc_dir)
+        return self.render(self.merge_snapshots(multiproc_dir))
+
+
+class Metric:
+    """Base class for all metric types"""
+
+    type = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        registry: MetricsRegistry | None = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[str, Any] = {}
+
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels: dict[str, Any]) -> str:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return json.dumps([str(labels[label]) for label in self.labelnames])
+
+    def samples(self) -> dict[str, Any]:
+        with self._lock:
+            return {key: _copy(value) for key, value in self._values.items()}
+
+    def snapshot(self) -> dict:
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": self.samples(),
+        }
+
+
+class Counter(Metric):
+    """A value which only goes up"""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """A value which can go up and down. If `function` is given, the value is
+    read from it whenever the metric is collected"""
+
+    type = "gauge"
+
+    def __init__(self, *args, function: Callable[[], float] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._function = function
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> dict[str, Any]:
+        if self._function is not None:
+            return {self._key({}): float(self._function())}
+        return super().samples()
+
+
+class Histogram(Metric):
+    """Counts observed values in cumulative buckets"""
+
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Iterable[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {
+                    "buckets": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def snapshot(self) -> dict:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+
+class SnapshotWriter:
+    """Background thread which periodically writes the registry's snapshot
+    to the multiprocess directory"""
+
+    def __init__(self, registry: MetricsRegistry, directory: str, interval: float):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-snapshot-writer", daemon=True
+        )
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.registry.write_snapshot(self.directory)
+
+    def start(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        # Written right away so other workers starting up see this one is alive
+        self.registry.write_snapshot(self.directory)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.registry.write_snapshot(self.directory)
+
+
+def clear_multiproc_dir(directory: str) -> bool:
+    """Removes the snapshots left by a previous run of the application. Nothing
+    is removed while a live process still writes to the directory, as the
+    snapshots then belong to the current run, e.g. to sibling workers
+
+    Returns:
+        bool: True if the directory was cleared
+    """
+    os.makedirs(directory, exist_ok=True)
+    filenames = [f for f in os.listdir(directory) if f.startswith("metrics_")]
+
+    for filename in filenames:
+        pid = filename.removeprefix("metrics_").split(".")[0]
+        if pid.isdigit() and _process_is_alive(int(pid)):
+            return False
+
+    for filename in filenames:
+        try:
+            os.remove(os.path.join(directory, filename))
+        except FileNotFoundError:
+            # Removed by another worker starting up at the same time
+            pass
+    return True
+
+
+def register_db_pool_metrics(engine, registry: MetricsRegistry | None = None) -> None:
+    """Exposes the state of an engine's connection pool as gauges"""
+    pool = engine.pool
+
+    for name, documentation, attr in (
+        ("db_pool_size", "Number of connections the pool keeps open", "size"),
+        ("db_pool_checked_out", "Connections currently checked out", "checkedout"),
+        ("db_pool_overflow", "Connections opened beyond the pool size", "overflow"),
+    ):
+        method = getattr(pool, attr, None)
+        if method is not None:
+            Gauge(name, documentation, function=method, registry=registry)
+
+
+def _process_is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _copy(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            "buckets": list(value["buckets"]),
+            "sum": value["sum"],
+            "count": value["count"],
+        }
+    return value
+
+
+def _format_value(value: float) -> str:
+    if float(value).is_integer():
+        return f"{float(value):.1f}"
+    return repr(float(value))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: list[tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    pairs = (f'{name}="{_escape_label_value(str(value))}"' for name, value in labels)
+    return "{" + ",".join(pairs) + "}"
+
+
+REGISTRY = MetricsRegistry()
+
+http_requests_total = Counter(
+    "http_requests_total",
+    "Total HTTP requests by method, route template and status code",
+    ["method", "route", "status"],
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency in seconds by method and route template",
+    ["method", "route"],
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled"
+)
+cache_requests_total = Counter(
+    "cache_requests_total",
+    "Lookups of in-process caches by cache name and result (hit or miss)",
+    ["cache", "result"],
+)
+idempotency_requests_total = Counter(
+    "idempotency_requests_total",
+    "Requests made with an Idempotency-Key by result (new, replay, in_flight or mismatch)",
+    ["result"],
+)
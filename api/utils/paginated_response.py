@@ -1,4 +1,5 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import ColumnElement, Select
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 from api.db.database import Base
@@ -12,16 +13,23 @@ def paginated_response(
     skip: int,
     limit: int,
     filters: Optional[Dict[str, Any]] = None,
+    options: tuple = (),
+    conditions: Iterable[ColumnElement] = (),
+    order_by: tuple = (),
 ) -> dict[str]:
     """
     Custom response for pagination.\n
-    This takes in four arguments:
+    This takes in the following arguments:
         * db- this is the database session
         * model- this is the database table model eg Product, Organisation```
         * limit- this is the number of items to fetch per page, this would be a query parameter
         * skip- this is the number of items to skip before fetching the next page of data. This would also
         be a query parameter
         * filters- this is an optional dictionary of filters to apply to the query
+        * options- optional loader options (e.g. selectinload) applied to the page query
+        * conditions- optional SQLAlchemy expressions for filters that aren't a plain
+        column equality, e.g. ranges or EXISTS on a relationship
+        * order_by- optional columns to order by. Defaults to newest first
 
     Example use:
         **Without filter**
@@ -46,7 +54,7 @@ def paginated_response(
         ```
     """
 
-    query = db.query(model)
+    query = db.query(model).filter(*conditions)
 
     if filters:
         # Apply filters
@@ -61,7 +69,13 @@ def paginated_response(
                     query = query.filter(column == value)
 
     total = query.count()
-    results = query.order_by(model.created_at.desc()).offset(skip).limit(limit).all()
+    results = (
+        query.options(*options)
+        .order_by(*(order_by or (model.created_at.desc(),)))
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
 
     # items = jsonable_encoder(results)
     try:
@@ -77,3 +91,67 @@ def paginated_response(
         "results": results,
     }
     return paginated_data
+
+
+def keyset_paginated_response(
+    db: Session,
+    model,
+    limit: int,
+    cursor: Optional[str] = None,
+    filters: Iterable[ColumnElement] = (),
+    options: tuple = (),
+    statement: Optional[Select] = None,
+) -> dict[str]:
+    """
+    Keyset (cursor) pagination, newest first.\n
+    Rows are ordered by their uuid7 id, which sorts in creation order, and a page
+    starts right after the id given as cursor instead of skipping rows with OFFSET.
+    Every page therefore costs the same, however deep it is, and rows added while
+    browsing don't shift the following pages.
+    This takes in the following arguments:
+        * db- this is the database session
+        * model- this is the database table model eg Trivia
+        * limit- this is the number of items to fetch per page
+        * cursor- the next_cursor returned with the previous page, None for the first page
+        * filters- optional SQLAlchemy expressions the rows must match
+        * options- optional loader options (e.g. selectinload) applied to the page query
+        * statement- optional select of columns from the model's table. When given, the
+        results are its rows instead of model instances and options are ignored
+
+    Example use:
+        ``` python
+        return keyset_paginated_response(
+            db=db,
+            model=Trivia,
+            limit=limit,
+            cursor=cursor,
+            filters=[Trivia.difficulty == "easy"],
+        )
+        ```
+    """
+
+    if cursor is not None:
+        filters = [*filters, model.id < cursor]
+
+    # One extra row tells whether there is a next page without counting
+    if statement is not None:
+        results = db.execute(
+            statement.where(*filters).order_by(model.id.desc()).limit(limit + 1)
+        ).all()
+    else:
+        results = (
+            db.query(model)
+            .filter(*filters)
+            .options(*options)
+            .order_by(model.id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+    has_next_page = len(results) > limit
+    results = results[:limit]
+
+    return {
+        "limit": limit,
+        "next_cursor": results[-1].id if has_next_page else None,
+        "results": results,
+    }
@@ -0,0 +1,189 @@
+import sys
+import threading
+import time
+from collections import Counter
+
+# Frames from these modules are always kept in a sampled stack
+APP_MODULE_PREFIXES = ("api.", "main")
+
+# Only the entry frame into each of these libraries is kept, so a sample shows
+# e.g. `sqlalchemy.orm.query:Query.all` instead of the ORM's internals
+LIBRARY_PACKAGES = ("pydantic", "pydantic_core", "sqlalchemy", "psycopg2", "passlib", "jwt")
+
+# Layers time is attributed to, checked from the innermost frame outwards
+LAYERS = (
+    ("pydantic", ("pydantic", "pydantic_core")),
+    ("database", ("sqlalchemy", "psycopg2")),
+    ("models", ("api.v1.models",)),
+    ("services", ("api.v1.services",)),
+    ("routes", ("api.v1.routes",)),
+    ("utils", ("api.utils", "api.core")),
+)
+
+
+class SamplingProfiler:
+    """Statistical profiler which periodically samples the stacks of every thread.
+
+    Sync routes and dependencies run on a threadpool rather than on the thread
+    which receives the request, so the stacks of all threads are sampled. Only
+    stacks that pass through application code are kept, which leaves out idle
+    threads and the event loop waiting for IO.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = sample_stack(frame)
+                if stack:
+                    self.samples[stack] += 1
+
+    def start(self) -> None:
+        self._started_at = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started_at
+
+    def folded(self) -> str:
+        """Returns the samples in the collapsed stack format read by flamegraph
+        tools (one `frame;frame;frame count` line per distinct stack)"""
+        return "".join(
+            f"{';'.join(stack)} {count}\n"
+            for stack, count in sorted(self.samples.items())
+        )
+
+    def layer_breakdown(self) -> dict[str, int]:
+        """Counts samples by the innermost application layer they were in"""
+        layers: Counter[str] = Counter()
+        for stack, count in self.samples.items():
+            layers[_layer_of(stack)] += count
+        return dict(layers.most_common())
+
+    def call_tree(self, min_percent: float = 1.0) -> list[str]:
+        """Renders the samples as an indented call tree. Each line shows the
+        percentage of samples spent in that frame, including its callees
+
+        Args:
+            min_percent (float, optional): Frames below this percentage are left out
+
+        Returns:
+            list[str]: The lines of the tree
+        """
+        total = sum(self.samples.values())
+        if not total:
+            return []
+
+        tree: dict = {}
+        for stack, count in self.samples.items():
+            node = tree
+            for frame in stack:
+                child = node.setdefault(frame, {"count": 0, "children": {}})
+                child["count"] += count
+                node = child["children"]
+
+        lines = []
+
+        def render(node: dict, depth: int) -> None:
+            for frame, child in sorted(
+                node.items(), key=lambda item: item[1]["count"], reverse=True
+            ):
+                percent = child["count"] * 100 / total
+                if percent < min_percent:
+                    continue
+                lines.append(f"{'  ' * depth}{percent:5.1f}% {frame}")
+                render(child["children"], depth + 1)
+
+        render(tree, 0)
+        return lines
+
+
+class ProfileRateLimiter:
+    """Allows a single profile at a time, at most once every `min_interval` seconds.
+
+    The state lives in process memory, so the limit applies to each worker
+    process separately.
+    """
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._active = False
+        self._last_started = float("-inf")
+        self._previous_started = float("-inf")
+
+    def acquire(self) -> bool:
+        """Checks if a profile may start now and, if so, reserves the slot"""
+        with self._lock:
+            now = time.monotonic()
+            if self._active or now - self._last_started < self.min_interval:
+                return False
+            self._active = True
+            self._previous_started = self._last_started
+            self._last_started = now
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._active = False
+
+    def cancel(self) -> None:
+        """Releases a slot which wasn't used, without counting it towards the interval"""
+        with self._lock:
+            self._active = False
+            self._last_started = self._previous_started
+
+
+def sample_stack(frame) -> tuple[str, ...] | None:
+    """Converts a thread's current frame into a stack of 'module:function' labels,
+    outermost first, keeping application frames and library entry frames only
+
+    Returns:
+        tuple | None: The stack, None if it doesn't pass through application code
+    """
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+
+    stack = []
+    in_app = False
+    previous_package = None
+
+    for frame in reversed(frames):
+        module = frame.f_globals.get("__name__", "")
+        label = f"{module}:{frame.f_code.co_qualname}"
+        package = module.split(".")[0]
+
+        if module.startswith(APP_MODULE_PREFIXES):
+            stack.append(label)
+            in_app = True
+            previous_package = None
+        elif package in LIBRARY_PACKAGES and package != previous_package:
+            stack.append(label)
+            previous_package = package
+
+    return tuple(stack) if in_app else None
+
+
+def _layer_of(stack: tuple[str, ...]) -> str:
+    for frame in reversed(stack):
+        module = frame.split(":")[0]
+        for layer, prefixes in LAYERS:
+            if module.startswith(prefixes):
+                return layer
+    return "other"
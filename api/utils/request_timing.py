@@ -0,0 +1,75 @@
+import time
+from contextvars import ContextVar, Token
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class RequestTimings:
+    """Holds the time spent on the different phases of a single request"""
+
+    __slots__ = ("start", "db_time", "db_queries", "serialize_time")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_time = 0.0
+        self.db_queries = 0
+        self.serialize_time = 0.0
+
+    def elapsed(self) -> float:
+        """Seconds since the request started"""
+        return time.perf_counter() - self.start
+
+    def server_timing(self, total: float) -> str:
+        """Formats the timings as a Server-Timing header value (durations in ms)"""
+        return (
+            f"total;dur={total * 1000:.2f}, "
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.db_queries} queries", '
+            f"serialize;dur={self.serialize_time * 1000:.2f}"
+        )
+
+
+_request_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def start_request_timings() -> tuple[RequestTimings, Token]:
+    """Starts timing a request in the current context.
+    The returned token should be passed to `end_request_timings`"""
+    timings = RequestTimings()
+    return timings, _request_timings.set(timings)
+
+
+def end_request_timings(token: Token) -> None:
+    """Stops timing the request started with the given token"""
+    _request_timings.reset(token)
+
+
+def current_request_timings() -> RequestTimings | None:
+    """Returns the timings of the request being handled, if any"""
+    return _request_timings.get()
+
+
+def register_db_timing(engine: Engine) -> None:
+    """Registers engine events which add the duration of every statement executed
+    during a request to that request's timings
+
+    Args:
+        engine (Engine): The SQLAlchemy engine to instrument
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        context._request_timing_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        timings = _request_timings.get()
+        if timings is None:
+            return
+
+        timings.db_time += time.perf_counter() - context._request_timing_start
+        timings.db_queries += 1
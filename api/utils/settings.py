@@ -24,5 +24,94 @@ class Settings(BaseSettings):
     DB_TYPE: str = config("DB_TYPE")
     DB_URL: str = config("DB_URL")
 
+    # Seconds before the cached question availability matrix is reloaded
+    AVAILABILITY_CACHE_TTL: int = config(
+        "AVAILABILITY_CACHE_TTL", default=300, cast=int
+    )
+    # Minimum seconds between reloads triggered by requests it can't satisfy
+    AVAILABILITY_MISS_RELOAD_INTERVAL: float = config(
+        "AVAILABILITY_MISS_RELOAD_INTERVAL", default=5.0, cast=float
+    )
+
+    # Response compression
+    COMPRESSION_ENABLED: bool = config("COMPRESSION_ENABLED", default=True, cast=bool)
+    COMPRESSION_MINIMUM_SIZE: int = config(
+        "COMPRESSION_MINIMUM_SIZE", default=1000, cast=int
+    )
+    COMPRESSION_GZIP_LEVEL: int = config("COMPRESSION_GZIP_LEVEL", default=6, cast=int)
+    COMPRESSION_BROTLI_QUALITY: int = config(
+        "COMPRESSION_BROTLI_QUALITY", default=4, cast=int
+    )
+
+    # Responses stored for replay to POST requests made with an Idempotency-Key,
+    # in the idempotency_keys table. Keys reserved for longer than the lock
+    # timeout are taken to belong to a request which died
+    IDEMPOTENCY_ENABLED: bool = config("IDEMPOTENCY_ENABLED", default=True, cast=bool)
+    IDEMPOTENCY_KEY_TTL: int = config("IDEMPOTENCY_KEY_TTL", default=86400, cast=int)
+    IDEMPOTENCY_LOCK_TIMEOUT: int = config(
+        "IDEMPOTENCY_LOCK_TIMEOUT", default=60, cast=int
+    )
+    # Seconds between two deletions of the expired idempotency keys
+    IDEMPOTENCY_PURGE_INTERVAL: int = config(
+        "IDEMPOTENCY_PURGE_INTERVAL", default=3600, cast=int
+    )
+
+    # Logging. Records are written by a background thread through a bounded queue.
+    # LOG_FILE is shared by all workers and must be rotated externally
+    LOG_FILE: str = config("LOG_FILE", default="logfile.log")
+    LOG_QUEUE_SIZE: int = config("LOG_QUEUE_SIZE", default=10000, cast=int)
+
+    # Per request Server-Timing header and timing logs
+    SERVER_TIMING_ENABLED: bool = config(
+        "SERVER_TIMING_ENABLED", default=True, cast=bool
+    )
+
+    # Prometheus metrics. Set METRICS_MULTIPROC_DIR when running multiple workers
+    METRICS_ENABLED: bool = config("METRICS_ENABLED", default=True, cast=bool)
+    METRICS_MULTIPROC_DIR: str = config("METRICS_MULTIPROC_DIR", default="")
+    METRICS_FLUSH_INTERVAL: float = config(
+        "METRICS_FLUSH_INTERVAL", default=5.0, cast=float
+    )
+    # Comma separated client addresses allowed to scrape /metrics
+    METRICS_ALLOWED_HOSTS: str = config(
+        "METRICS_ALLOWED_HOSTS", default="127.0.0.1,::1"
+    )
+
+    # Event loop lag monitoring
+    EVENT_LOOP_MONITOR_ENABLED: bool = config(
+        "EVENT_LOOP_MONITOR_ENABLED", default=True, cast=bool
+    )
+    EVENT_LOOP_BLOCK_THRESHOLD_MS: float = config(
+        "EVENT_LOOP_BLOCK_THRESHOLD_MS", default=100.0, cast=float
+    )
+    EVENT_LOOP_HEARTBEAT_INTERVAL: float = config(
+        "EVENT_LOOP_HEARTBEAT_INTERVAL", default=0.05, cast=float
+    )
+
+    # On-demand profiling
+    PROFILING_ENABLED: bool = config("PROFILING_ENABLED", default=True, cast=bool)
+    PROFILE_DIR: str = config("PROFILE_DIR", default="profiles")
+    # Enforced per worker process, not across all of them
+    PROFILING_MIN_INTERVAL_SECONDS: float = config(
+        "PROFILING_MIN_INTERVAL_SECONDS", default=60.0, cast=float
+    )
+    PROFILING_SAMPLE_INTERVAL: float = config(
+        "PROFILING_SAMPLE_INTERVAL", default=0.001, cast=float
+    )
+
+    # Slow query log. Off unless enabled, as it writes to SLOW_QUERY_LOG_FILE.
+    # The file is shared by all workers and must be rotated externally
+    SLOW_QUERY_LOG_ENABLED: bool = config(
+        "SLOW_QUERY_LOG_ENABLED", default=False, cast=bool
+    )
+    SLOW_QUERY_THRESHOLD_MS: float = config(
+        "SLOW_QUERY_THRESHOLD_MS", default=200.0, cast=float
+    )
+    # EXPLAIN ANALYZE runs the slow statement again. Opt in while investigating
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = config(
+        "SLOW_QUERY_EXPLAIN_SAMPLE_RATE", default=0.0, cast=float
+    )
+    SLOW_QUERY_LOG_FILE: str = config("SLOW_QUERY_LOG_FILE", default="slow_queries.log")
+
 
 settings = Settings()
\ No newline at end of file
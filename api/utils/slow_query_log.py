@@ -0,0 +1,158 @@
+import json
+import logging
+import random
+import re
+import sys
+import time
+from logging.handlers import WatchedFileHandler
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from api.utils.logger import create_queue_handler
+from api.utils.settings import settings
+
+slow_query_logger = logging.getLogger("afrivia.slow_queries")
+slow_query_logger.setLevel(logging.INFO)
+slow_query_logger.propagate = False
+
+SERVICES_MODULE_PREFIX = "api.v1.services"
+ROUTES_MODULE_PREFIX = "api.v1.routes"
+
+
+def redact_parameters(parameters):
+    """Replaces bound parameter values with their type names so that
+    user data (passwords, emails, questions...) never reaches the log
+
+    Args:
+        parameters: The parameters passed to the DBAPI cursor
+
+    Returns:
+        The same structure with every value replaced
+    """
+    if isinstance(parameters, dict):
+        return {key: redact_parameters(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_parameters(value) for value in parameters]
+    return f"<{type(parameters).__name__}>"
+
+
+def find_calling_method() -> str | None:
+    """Walks up the stack to find the service method, or failing that the route,
+    which issued the current statement
+
+    Returns:
+        str | None: The caller as 'module:qualified_name', None if not found
+    """
+    route_caller = None
+    frame = sys._getframe(1)
+
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        code = frame.f_code
+        caller = f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+        if module.startswith(SERVICES_MODULE_PREFIX):
+            return caller
+        if route_caller is None and module.startswith(ROUTES_MODULE_PREFIX):
+            route_caller = caller
+        frame = frame.f_back
+
+    return route_caller
+
+
+def is_explainable(statement: str) -> bool:
+    """Only plain reads are explained. EXPLAIN ANALYZE runs the statement,
+    so a write would be applied twice"""
+    words = re.findall(r"[A-Z_]+", statement.upper())
+    return (
+        bool(words)
+        and words[0] in ("SELECT", "WITH")
+        and not {"INSERT", "UPDATE", "DELETE"}.intersection(words)
+    )
+
+
+def explain_statement(cursor, statement: str, parameters) -> str | None:
+    """Runs EXPLAIN (ANALYZE, BUFFERS) for a statement inside a savepoint, so a
+    failure can't abort the surrounding transaction
+
+    Args:
+        cursor: The DBAPI cursor the statement was executed with
+        statement (str): The statement
+        parameters: The parameters it was executed with
+
+    Returns:
+        str | None: The query plan, None if it couldn't be captured
+    """
+    explain_cursor = cursor.connection.cursor()
+    try:
+        explain_cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            explain_cursor.execute(
+                f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+            )
+            plan = "\n".join(row[0] for row in explain_cursor.fetchall())
+            explain_cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+            return plan
+        except Exception:
+            explain_cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return None
+    except Exception:
+        return None
+    finally:
+        explain_cursor.close()
+
+
+def register_slow_query_log(
+    engine: Engine,
+    threshold_ms: float = settings.SLOW_QUERY_THRESHOLD_MS,
+    explain_sample_rate: float = settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    handler: logging.Handler | None = None,
+) -> None:
+    """Registers engine events which log every statement slower than the threshold.
+    Each entry is a JSON line with the statement, redacted parameters, duration and
+    calling method. On PostgreSQL, a sampled fraction of slow reads also get their
+    EXPLAIN (ANALYZE, BUFFERS) output attached.
+
+    Args:
+        engine (Engine): The SQLAlchemy engine to instrument
+        threshold_ms (float): Statements taking at least this long are logged
+        explain_sample_rate (float): Fraction (0 to 1) of slow reads to explain
+        handler (logging.Handler | None, optional): Handler for the entries.
+        Defaults to a queued file handler on SLOW_QUERY_LOG_FILE.
+    """
+    if handler is None:
+        # Shared by the workers, so rotated externally like LOG_FILE
+        file_handler = WatchedFileHandler(settings.SLOW_QUERY_LOG_FILE, delay=True)
+        file_handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+        handler = create_queue_handler(file_handler)
+    slow_query_logger.addHandler(handler)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        context._slow_query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - context._slow_query_start) * 1000
+        if duration_ms < threshold_ms:
+            return
+
+        entry = {
+            "duration_ms": round(duration_ms, 2),
+            "caller": find_calling_method(),
+            "statement": " ".join(statement.split()),
+            "parameters": redact_parameters(parameters),
+        }
+
+        if (
+            conn.dialect.name == "postgresql"
+            and not executemany
+            and is_explainable(statement)
+            and random.random() < explain_sample_rate
+        ):
+            entry["explain"] = explain_statement(cursor, statement, parameters)
+
+        slow_query_logger.warning(json.dumps(entry))
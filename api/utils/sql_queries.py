@@ -1,63 +1,104 @@
-from sqlalchemy.orm import aliased
-from sqlalchemy import func, select, Select, asc, or_, ColumnElement, false, true, any_
+from sqlalchemy.orm import aliased, joinedload, selectinload
+from sqlalchemy import func, select, Select, or_, ColumnElement, false, true, exists, case
+from sqlalchemy.sql.selectable import ScalarSelect
+from api.db.types import uuid_text
 from api.v1.models.moderator import Moderator, mod_country_association
 from api.v1.models.submission import Submission
 from api.v1.models.country import Country
 from api.v1.models import (
-    category_trivia_association,
     country_trivia_association,
     Category,
     Trivia,
+    TriviaOption,
 )
 
+# Loader options for the relationships read by the models' to_dict methods.
+# The category is joined into the main query and each collection is loaded for
+# all rows with one extra query, instead of one lazy load per row
+TRIVIA_LOAD_OPTIONS = (
+    joinedload(Trivia.category),
+    selectinload(Trivia.countries),
+    selectinload(Trivia.options),
+)
+
+SUBMISSION_LOAD_OPTIONS = (
+    joinedload(Submission.category),
+    selectinload(Submission.countries),
+    selectinload(Submission.options),
+)
+
+MODERATOR_LOAD_OPTIONS = (
+    selectinload(Moderator.country_preferences),
+    selectinload(Moderator.assigned_submissions),
+)
 
-def query_for_mods_pref_submissions() -> Select:
-    """These sql select statements are used to build a query which results in a
-    table containing 3 columns. One with the moderator's id, the second with an array
-    of their country preferences and the last with a count of pending submissions assigned
-    the mod
+# Separates the values joined by aggregate_strings. The unit separator can't
+# appear in country names or ids
+AGGREGATE_SEPARATOR = "\x1f"
+
+
+def category_id_subquery(name: str) -> ScalarSelect:
+    """Returns the id of the category named `name` as an uncorrelated subquery,
+    so filtering on a category is a single predicate on the indexed category_id
+    column of trivias or submissions
+
+    Args:
+        name (str): The category name
+
+    Returns:
+        ScalarSelect: SQLAlchemy scalar subquery
+    """
+    return select(Category.id).where(Category.name == name).limit(1).scalar_subquery()
+
+
+def query_for_suitable_mod(countries: list[str]) -> Select:
+    """This query selects the id of the moderator a new submission is assigned
+    to: the active moderator with the fewest pending submissions among those
+    without country preferences or preferring one of the submission's countries.
+    Any active moderator can be selected when the submission has no countries
+
+    It is meant to be used as a scalar subquery of the submission INSERT, so the
+    assignment doesn't need a round trip of its own
+
+    Args:
+        countries (list[str]): Names of the countries of the submission
 
     Returns:
-        Select: Sql alchemy select statement
+        Select: Sql alchemy select statement, returning at most one id
     """
 
-    # Aliases for tables
+    # Aliases for tables, as the query is nested in an INSERT into submissions
     mca = aliased(mod_country_association)
     sbm = aliased(Submission)
 
-    # Subquery to connect moderators with their country preference if any
-    subquery_1 = (
-        select(mca.c.moderator_id.label("moderator_id"), Country.name.label("c_name"))
-        .join(Country, mca.c.country_id == Country.id)
-        .subquery()
-    )
-
-    # Subquery to connect moderators with their pending assigned submissions
-    subquery_2 = (
-        select(sbm.moderator_id.label("moderator_id"), sbm.id.label("id"))
-        .where(sbm.status == "pending")
-        .join(Moderator, sbm.moderator_id == Moderator.id)
-        .subquery()
+    pending_count = (
+        select(func.count())
+        .where(sbm.moderator_id == Moderator.id, sbm.status == "pending")
+        .scalar_subquery()
     )
 
-    # Main query to join subquery tables and return required table
     query = (
-        select(
-            Moderator.id,
-            func.array_remove(
-                func.array_agg(func.distinct(subquery_1.c.c_name)), None
-            ).label("country_preferences"),
-            func.count(func.distinct(subquery_2.c.id)).label(
-                "assigned_submissions_count"
-            ),
-        )
+        select(Moderator.id)
         .where(Moderator.is_active)
-        .outerjoin(subquery_1, subquery_1.c.moderator_id == Moderator.id)
-        .outerjoin(subquery_2, subquery_2.c.moderator_id == Moderator.id)
-        .group_by(Moderator.id)
-        .order_by(asc("assigned_submissions_count"))
+        .order_by(pending_count, Moderator.id)
+        .limit(1)
     )
 
+    if countries:
+        preferences = select(mca.c.country_id).where(
+            mca.c.moderator_id == Moderator.id
+        )
+        query = query.where(
+            or_(
+                ~exists(preferences),
+                exists(
+                    preferences.join(Country, mca.c.country_id == Country.id).where(
+                        Country.name.in_(countries)
+                    )
+                ),
+            )
+        )
+
     return query
 
 
@@ -78,11 +119,94 @@ def query_for_submission_stats() -> Select:
     return query
 
 
+def query_for_trivia_projection() -> Select:
+    """This query returns one flat row per trivia with the columns of the trivia
+    response schemas: id, question, difficulty, submission_id, created_at,
+    updated_at, the category name, the country names and incorrect options
+    joined into strings with AGGREGATE_SEPARATOR, and the correct option. The options are read from
+    trivia_options only for trivias without options_json, which is returned too.
+
+    The category is joined and the other related columns are subqueries
+    correlated on the trivia id, so only the rows returned after filtering and
+    LIMIT are aggregated, and no ORM objects are built. The rows are mapped to dicts with TriviaService.projection_to_dict
+
+    Returns:
+        Select: SQLAlchemy select statement, to be filtered, ordered and limited
+    """
+    cntriv_alias = aliased(country_trivia_association)
+
+    countries = (
+        select(func.aggregate_strings(Country.name, AGGREGATE_SEPARATOR))
+        .join(cntriv_alias, cntriv_alias.c.country_id == Country.id)
+        .where(cntriv_alias.c.trivia_id == Trivia.id)
+        .scalar_subquery()
+    )
+    correct_option = (
+        select(TriviaOption.content)
+        .where(TriviaOption.trivia_id == Trivia.id, TriviaOption.is_correct)
+        .limit(1)
+        .scalar_subquery()
+    )
+    incorrect_options = (
+        select(func.aggregate_strings(TriviaOption.content, AGGREGATE_SEPARATOR))
+        .where(TriviaOption.trivia_id == Trivia.id, TriviaOption.is_correct == false())
+        .scalar_subquery()
+    )
+
+    options_missing = Trivia.options_json.is_(None)
+
+    query = select(
+        Trivia.id,
+        Trivia.question,
+        Trivia.difficulty,
+        Trivia.submission_id,
+        Trivia.created_at,
+        Trivia.updated_at,
+        Category.name.label("category"),
+        countries.label("countries"),
+        Trivia.options_json,
+        case((options_missing, correct_option)).label("correct_option"),
+        case((options_missing, incorrect_options)).label("incorrect_options"),
+    ).outerjoin(Category, Trivia.category_id == Category.id)
+
+    return query
+
+
+def query_for_trivia_update(id: str) -> Select:
+    """This query returns the current state of a trivia for TriviaService.update:
+    one row per option, each with the columns of query_for_trivia_projection plus
+    the option's option_id, option_content and option_is_correct. Incorrect
+    options come first, oldest first, the order their new contents are given in
+
+    Args:
+        id (str): The id of the trivia
+
+    Returns:
+        Select: SQLAlchemy select statement
+    """
+    # Aliased, or the projection's option subqueries would correlate to it
+    option = aliased(TriviaOption)
+
+    return (
+        query_for_trivia_projection()
+        .add_columns(
+            option.id.label("option_id"),
+            option.content.label("option_content"),
+            option.is_correct.label("option_is_correct"),
+        )
+        .outerjoin(option, option.trivia_id == Trivia.id)
+        .where(Trivia.id == id)
+        .order_by(option.is_correct, option.created_at, option.id)
+    )
+
+
 def query_for_question_retrieval(
     filters: dict[str, ColumnElement | str | None] = {}, limit: int | None = None
 ) -> Select:
     """This statement queries the database for questions that match a given query.
-    The query is passed as elements of the filters dict. The returned questions order is randomized
+    The query is passed as elements of the filters dict. The returned questions order is randomized.
+    Trivias without countries match every country. Trivias without a category
+    are never returned, as the public question schema requires one.
 
     Args:
         filters (dict[str, ColumnElement | str | None]): A dict containing as its values SQLAlchemy
@@ -90,30 +214,183 @@ def query_for_question_retrieval(
         limit (int | None, optional): The number of trivias to return. Defaults to None.
 
     Returns:
-        Select: Sqlalchemy select statement
+        Select: Sqlalchemy select statement, returning the columns of query_for_trivia_projection
     """
-    catr_alias = aliased(category_trivia_association)
     cntriv_alias = aliased(country_trivia_association)
+    conditions = [Trivia.category_id.is_not(None)]
 
-    countries_arr = func.array_remove(func.array_agg(Country.name), None)
+    for key in ("category", "difficulty"):
+        if (tmp := filters.get(key)) is not None:
+            conditions.append(tmp)
 
-    # filters['countries'] value is passed as a string | None to enable comparison with
-    # the countries_arr label
-    if (tmp := filters.pop("country", None)) is not None:
-        filters["country"] = any_(countries_arr) == tmp
+    if (tmp := filters.get("country")) is not None:
+        conditions.append(
+            or_(
+                Trivia.countries.any(Country.name == tmp),
+                ~exists().where(cntriv_alias.c.trivia_id == Trivia.id),
+            )
+        )
 
     # Build the query
     query = (
-        select(Trivia)
-        .join(catr_alias, catr_alias.c.trivia_id == Trivia.id, isouter=True)
-        .join(Category, catr_alias.c.category_id == Category.id, isouter=True)
+        query_for_trivia_projection()
+        .where(*conditions)
+        .limit(limit)
+        .order_by(func.random())
+    )
+
+    return query
+
+
+def query_for_trivia_totals() -> Select:
+    """This query counts the trivias present for every (category, difficulty) pair.
+    Trivias without a category are left out, like in query_for_question_retrieval
+
+    Returns:
+        Select: SQLAlchemy select statement
+    """
+    query = (
+        select(
+            Category.name.label("category"),
+            Trivia.difficulty.label("difficulty"),
+            func.count(Trivia.id).label("total"),
+        )
+        .join(Category, Trivia.category_id == Category.id)
+        .group_by(Category.name, Trivia.difficulty)
+    )
+
+    return query
+
+
+def query_for_trivia_availability() -> Select:
+    """This query counts the trivias present for every (category, difficulty, country)
+    triple. Trivias not associated with any country are counted under a NULL country.
+    Trivias without a category are left out, like in query_for_question_retrieval
+
+    Returns:
+        Select: SQLAlchemy select statement
+    """
+    cntriv_alias = aliased(country_trivia_association)
+
+    query = (
+        select(
+            Category.name.label("category"),
+            Trivia.difficulty.label("difficulty"),
+            Country.name.label("country"),
+            func.count(Trivia.id).label("count"),
+        )
+        .join(Category, Trivia.category_id == Category.id)
         .join(cntriv_alias, cntriv_alias.c.trivia_id == Trivia.id, isouter=True)
         .join(Country, cntriv_alias.c.country_id == Country.id, isouter=True)
-        .filter(filters.pop("category", true()), filters.pop("difficulty", true()))
-        .group_by(Trivia.id, Category.name)
-        .having(or_(filters.pop("country", true()), countries_arr == []))
+        .group_by(Category.name, Trivia.difficulty, Country.name)
+    )
+
+    return query
+
+
+def query_for_trivia_availability_key(id: str) -> Select:
+    """This query returns the category name, difficulty and country names of a
+    trivia, joined into a string with AGGREGATE_SEPARATOR, as needed to update
+    the availability matrix. No other column or relationship is read
+
+    Args:
+        id (str): The id of the trivia
+
+    Returns:
+        Select: SQLAlchemy select statement
+    """
+    cntriv_alias = aliased(country_trivia_association)
+
+    countries = (
+        select(func.aggregate_strings(Country.name, AGGREGATE_SEPARATOR))
+        .join(cntriv_alias, cntriv_alias.c.country_id == Country.id)
+        .where(cntriv_alias.c.trivia_id == Trivia.id)
+        .scalar_subquery()
+    )
+
+    query = (
+        select(
+            Category.name.label("category"),
+            Trivia.difficulty,
+            countries.label("countries"),
+        )
+        .outerjoin(Category, Trivia.category_id == Category.id)
+        .where(Trivia.id == id)
+    )
+
+    return query
+
+def query_for_moderator_listing(
+    filters: dict[str, bool | None] = {}, skip: int = 0, limit: int | None = None
+) -> Select:
+    """This query returns a page of moderators, newest first, each with its country
+    preferences and pending submission ids joined into strings with
+    AGGREGATE_SEPARATOR, its pending submissions count and the total number of
+    moderators matching the filters
+
+    Args:
+        filters (dict[str, bool | None]): Values for the is_active and is_admin
+        columns. None values are ignored
+        skip (int, optional): The number of moderators to skip. Defaults to 0.
+        limit (int | None, optional): The number of moderators to return. Defaults to None.
+
+    Returns:
+        Select: SQLAlchemy select statement
+    """
+    mca = aliased(mod_country_association)
+
+    # Both are aggregated per moderator before joining, so a moderator's
+    # preferences and submissions don't multiply each other
+    preferences = (
+        select(
+            mca.c.moderator_id.label("moderator_id"),
+            func.aggregate_strings(Country.name, AGGREGATE_SEPARATOR).label("names"),
+        )
+        .join(Country, mca.c.country_id == Country.id)
+        .group_by(mca.c.moderator_id)
+        .subquery()
+    )
+
+    pending = (
+        select(
+            Submission.moderator_id.label("moderator_id"),
+            func.aggregate_strings(
+                uuid_text(Submission.id), AGGREGATE_SEPARATOR
+            ).label("ids"),
+            func.count(Submission.id).label("count"),
+        )
+        .where(Submission.status == "pending")
+        .group_by(Submission.moderator_id)
+        .subquery()
+    )
+
+    query = (
+        select(
+            Moderator.id,
+            Moderator.email,
+            Moderator.first_name,
+            Moderator.last_name,
+            Moderator.username,
+            Moderator.created_at,
+            Moderator.is_admin,
+            Moderator.is_active,
+            preferences.c.names.label("country_preferences"),
+            pending.c.ids.label("pending_submissions"),
+            func.coalesce(pending.c.count, 0).label("pending_submissions_count"),
+            func.count().over().label("total"),
+        )
+        .outerjoin(preferences, preferences.c.moderator_id == Moderator.id)
+        .outerjoin(pending, pending.c.moderator_id == Moderator.id)
+        .filter(
+            *(
+                getattr(Moderator, attr) == value
+                for attr, value in filters.items()
+                if value is not None
+            )
+        )
+        .order_by(Moderator.created_at.desc(), Moderator.id.desc())
+        .offset(skip)
         .limit(limit)
-        .order_by(func.random())
     )
 
     return query
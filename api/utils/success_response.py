@@ -1,9 +1,29 @@
-from typing import Optional
+import time
+from typing import Any, Optional
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
+from pydantic_core import to_json
 
+from api.utils.request_timing import current_request_timings
 
-def success_response(status_code: int, message: str, data: Optional[dict] = None):
+
+class FastJSONResponse(JSONResponse):
+    """JSON response which serializes its content, pydantic models included,
+    straight to bytes in a single pass using pydantic-core.
+    Values pydantic-core doesn't know are handed to `jsonable_encoder`."""
+
+    def render(self, content: Any) -> bytes:
+        start = time.perf_counter()
+        body = to_json(content, fallback=jsonable_encoder)
+
+        timings = current_request_timings()
+        if timings is not None:
+            timings.serialize_time += time.perf_counter() - start
+
+        return body
+
+
+def success_response(status_code: int, message: str, data: Optional[Any] = None):
     """Returns a JSON response for success responses"""
 
     response_data = {"success": True, "message": message}
@@ -11,16 +31,12 @@ def success_response(status_code: int, message: str, data: Optional[dict] = None
     if data is not None:
         response_data["data"] = data
 
-    return JSONResponse(
-        status_code=status_code, content=jsonable_encoder(response_data)
-    )
+    return FastJSONResponse(status_code=status_code, content=response_data)
 
 
-def failure_response(status_code: int, message: str, data: Optional[dict] = None):
+def failure_response(status_code: int, message: str, data: Optional[Any] = None):
     """Returns a JSON response for failure responses"""
 
     response_data = {"success": False, "message": message, "data": None}
 
-    return JSONResponse(
-        status_code=status_code, content=jsonable_encoder(response_data)
-    )
+    return FastJSONResponse(status_code=status_code, content=response_data)
@@ -1,12 +1,11 @@
 from api.v1.models.association import (
     country_submission_association,
     country_trivia_association,
-    category_submission_association,
-    category_trivia_association,
     mod_country_association
 )
 from api.v1.models.category import Category
 from api.v1.models.country import Country
+from api.v1.models.idempotency_key import IdempotencyKey
 from api.v1.models.moderator import Moderator
 from api.v1.models.submission import Submission, SubmissionOption
 from api.v1.models.trivia import Trivia, TriviaOption
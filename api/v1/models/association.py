@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Table
+from sqlalchemy import Column, Integer, ForeignKey, Table
 
 from api.db.database import Base
+from api.db.types import UUIDString
 
 
 mod_country_association = Table(
@@ -8,57 +9,34 @@ mod_country_association = Table(
     Base.metadata,
     Column(
         "moderator_id",
-        String,
+        UUIDString,
         ForeignKey("moderators.id", ondelete="CASCADE"),
         primary_key=True,
     ),
     Column("country_id", Integer, ForeignKey("countries.id"), primary_key=True),
 )
 
-category_submission_association = Table(
-    "categories_submissions",
-    Base.metadata,
-    Column("category_id", Integer, ForeignKey("categories.id"), primary_key=True),
-    Column(
-        "submission_id",
-        String,
-        ForeignKey("submissions.id", ondelete="CASCADE"),
-        primary_key=True,
-    ),
-)
-
 country_submission_association = Table(
     "countries_submissions",
     Base.metadata,
     Column("country_id", Integer, ForeignKey("countries.id"), primary_key=True),
     Column(
         "submission_id",
-        String,
+        UUIDString,
         ForeignKey("submissions.id", ondelete="CASCADE"),
         primary_key=True,
     ),
 )
 
-category_trivia_association = Table(
-    "categories_trivias",
-    Base.metadata,
-    Column("category_id", Integer, ForeignKey("categories.id"), primary_key=True),
-    Column(
-        "trivia_id",
-        String,
-        ForeignKey("trivias.id", ondelete="CASCADE"),
-        primary_key=True,
-    ),
-)
-
 country_trivia_association = Table(
     "countries_trivias",
     Base.metadata,
     Column("country_id", Integer, ForeignKey("countries.id"), primary_key=True),
     Column(
         "trivia_id",
-        String,
+        UUIDString,
         ForeignKey("trivias.id", ondelete="CASCADE"),
         primary_key=True,
+        index=True,
     ),
 )
@@ -4,9 +4,9 @@
 from uuid_extensions import uuid7
 from fastapi import Depends
 from api.db.database import Base
+from api.db.types import UUIDString
 from sqlalchemy import (
     Column,
-    String,
     DateTime,
     func
 )
@@ -16,7 +16,7 @@ class BaseTableModel(Base):
 
     __abstract__ = True
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid7()))
+    id = Column(UUIDString, primary_key=True, default=lambda: str(uuid7()))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
@@ -1,7 +1,6 @@
 from sqlalchemy import Column, String, Integer
 
 from sqlalchemy.orm import relationship
-from api.v1.models.association import category_trivia_association, category_submission_association
 from api.v1.models.base_model import BaseTableModel
 
 
@@ -11,10 +10,6 @@ class Category(BaseTableModel):
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False)
 
-    category_trivias = relationship(
-        "Trivia", secondary=category_trivia_association, back_populates="categories"
-    )
+    category_trivias = relationship("Trivia", back_populates="category")
 
-    submissions = relationship(
-        "Submission", secondary=category_submission_association, back_populates="categories"
-    )
\ No newline at end of file
+    submissions = relationship("Submission", back_populates="category")
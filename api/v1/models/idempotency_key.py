@@ -0,0 +1,22 @@
+from sqlalchemy import JSON, Column, DateTime, Integer, LargeBinary, String
+
+from api.db.database import Base
+
+
+class IdempotencyKey(Base):
+    """A request made with an Idempotency-Key and, once handled, its response.
+    The row is inserted when the request starts, so every worker sees the key
+    as taken while it is being handled"""
+
+    __tablename__ = "idempotency_keys"
+
+    # sha256 of the key scoped by route and caller
+    key = Column(String(64), primary_key=True)
+    # sha256 of the request body
+    fingerprint = Column(String(64), nullable=False)
+    # The response. status_code is NULL while the request is being handled
+    status_code = Column(Integer)
+    headers = Column(JSON)
+    body = Column(LargeBinary)
+    # When the key was reserved, then when its response was stored
+    created_at = Column(DateTime(timezone=True), nullable=False, index=True)
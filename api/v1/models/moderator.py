@@ -21,6 +21,7 @@ class Moderator(BaseTableModel):
         "Country",
         secondary=mod_country_association,
         back_populates="preferred_moderators",
+        passive_deletes=True,
     )
 
     assigned_submissions = relationship("Submission", back_populates="moderator")
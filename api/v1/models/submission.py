@@ -1,9 +1,9 @@
-from sqlalchemy import Column, String, Text, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Text, Boolean, ForeignKey, Enum, Integer
 
 import enum
 from sqlalchemy.orm import relationship
+from api.db.types import UUIDString
 from api.v1.models.association import (
-    category_submission_association,
     country_submission_association,
 )
 from api.v1.models.base_model import BaseTableModel
@@ -18,37 +18,47 @@ class Submission(BaseTableModel):
     status = Column(
         Enum(SubmissionStatusEnum), nullable=False, default=SubmissionStatusEnum.pending
     )
-    moderator_id = Column(String, ForeignKey("moderators.id"), nullable=True)
+    moderator_id = Column(UUIDString, ForeignKey("moderators.id"), nullable=True)
     difficulty = Column(Enum(DifficultyEnum), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), index=True)
     submission_note = Column(Text)
 
     moderator = relationship("Moderator", back_populates="assigned_submissions")
+    # Options and country links are removed by the ON DELETE CASCADE foreign
+    # keys, so deleting a submission doesn't load them
     options = relationship(
         "SubmissionOption",
         back_populates="submission_question",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
-    categories = relationship(
-        "Category",
-        secondary=category_submission_association,
-        back_populates="submissions",
-    )
+    category = relationship("Category", back_populates="submissions")
 
     countries = relationship(
         "Country",
         secondary=country_submission_association,
         back_populates="submissions",
+        passive_deletes=True,
     )
 
+    @property
+    def categories(self) -> list:
+        """The category as a list, as it was exposed before it became a column.
+        Assigning a list sets the category to its first element"""
+        return [self.category] if self.category is not None else []
+
+    @categories.setter
+    def categories(self, categories: list | None) -> None:
+        self.category = categories[0] if categories else None
+
     def to_dict(self) -> dict:
         """returns a dictionary representation of the submission"""
         obj_dict = self.__dict__.copy()
         obj_dict.pop("_sa_instance_state", None)
         obj_dict["id"] = self.id
 
-        # For now it's a one-to-one mapping for question and categories
-        obj_dict["category"] = self.categories[0].name
+        obj_dict["category"] = self.category.name
         obj_dict["countries"] = list(map(lambda x: x.name, self.countries))
 
         obj_dict["correct_option"] = ""
@@ -68,7 +78,7 @@ class SubmissionOption(BaseTableModel):
     __tablename__ = "submission_options"
 
     submission_id = Column(
-        String, ForeignKey("submissions.id", ondelete="CASCADE"), nullable=False
+        UUIDString, ForeignKey("submissions.id", ondelete="CASCADE"), nullable=False
     )
     content = Column(Text, nullable=False)
     is_correct = Column(Boolean, default=False, nullable=False)
@@ -1,11 +1,12 @@
 import enum
 
-from sqlalchemy import Column, String, Boolean, Enum, Text, ForeignKey
+from sqlalchemy import Column, Boolean, Enum, Text, ForeignKey, JSON, Integer
+from sqlalchemy.dialects.postgresql import JSONB
 
 from sqlalchemy.orm import relationship
+from api.db.types import UUIDString
 from api.v1.models.association import (
     country_trivia_association,
-    category_trivia_association,
 )
 from api.v1.models.base_model import BaseTableModel
 from api.v1.schemas.submission import DifficultyEnum
@@ -16,33 +17,60 @@ class Trivia(BaseTableModel):
 
     question = Column(Text, nullable=False, unique=True)
     difficulty = Column(Enum(DifficultyEnum), nullable=False)
-    submission_id = Column(String, ForeignKey("submissions.id"))
+    submission_id = Column(UUIDString, ForeignKey("submissions.id"))
+    category_id = Column(Integer, ForeignKey("categories.id"), index=True)
+    # Copy of the options as {"correct_option": str, "incorrect_options": [str]},
+    # kept in sync by TriviaService so a trivia can be served from its own row.
+    # NULL until backfilled for trivias written before it was added
+    options_json = Column(
+        JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql"),
+        nullable=True,
+    )
 
     submission = relationship("Submission")
+    # Options and country links are removed by the ON DELETE CASCADE foreign
+    # keys, so deleting a trivia doesn't load them
     options = relationship(
-        "TriviaOption", back_populates="trivia_question", cascade="all, delete-orphan"
+        "TriviaOption",
+        back_populates="trivia_question",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
-    categories = relationship(
-        "Category",
-        secondary=category_trivia_association,
-        back_populates="category_trivias",
-    )
+    category = relationship("Category", back_populates="category_trivias")
 
     countries = relationship(
-        "Country", secondary=country_trivia_association, back_populates="trivias"
+        "Country",
+        secondary=country_trivia_association,
+        back_populates="trivias",
+        passive_deletes=True,
     )
 
+    @property
+    def categories(self) -> list:
+        """The category as a list, as it was exposed before it became a column.
+        Assigning a list sets the category to its first element"""
+        return [self.category] if self.category is not None else []
+
+    @categories.setter
+    def categories(self, categories: list | None) -> None:
+        self.category = categories[0] if categories else None
+
     def to_dict(self) -> dict:
         """returns a dictionary representation of the trivia"""
         obj_dict = self.__dict__.copy()
         obj_dict.pop("_sa_instance_state", None)
         obj_dict["id"] = self.id
 
-        # For now it's a one-to-one mapping for question and categories
-        obj_dict["category"] = self.categories[0].name
+        obj_dict["category"] = self.category.name
         obj_dict["countries"] = list(map(lambda x: x.name, self.countries))
 
+        options_json = obj_dict.pop("options_json", None)
+        if options_json:
+            obj_dict["correct_option"] = options_json["correct_option"]
+            obj_dict["incorrect_options"] = list(options_json["incorrect_options"])
+            return obj_dict
+
         obj_dict["correct_option"] = ""
         obj_dict["incorrect_options"] = []
         all_option_objects: list[TriviaOption] = self.options
@@ -60,7 +88,7 @@ class TriviaOption(BaseTableModel):
     __tablename__ = "trivia_options"
 
     trivia_id = Column(
-        String, ForeignKey("trivias.id", ondelete="CASCADE"), nullable=False
+        UUIDString, ForeignKey("trivias.id", ondelete="CASCADE"), nullable=False, index=True
     )
     content = Column(Text, nullable=False)
     is_correct = Column(Boolean, default=False, nullable=False)
@@ -6,13 +6,11 @@ from fastapi import (
     Response,
     Request,
 )
-from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from fastapi.encoders import jsonable_encoder
 
 from api.v1.models.moderator import Moderator
 
-from api.utils.success_response import success_response
+from api.utils.success_response import success_response, FastJSONResponse
 
 from api.v1.schemas.moderator import (
     ModeratorLoginSchema,
@@ -54,16 +52,14 @@ def register(
 
     mod_dict = mod.to_dict()
 
-    response = JSONResponse(
+    response = FastJSONResponse(
         status_code=201,
         content={
             "success": True,
             "message": "Moderator created successfully",
             "access_token": access_token,
             "refresh_token": refresh_token,
-            "data": jsonable_encoder(
-                CreateModeratorResponseSchema.model_validate(mod_dict)
-            ),
+            "data": CreateModeratorResponseSchema.model_validate(mod_dict),
         },
     )
 
@@ -105,16 +101,14 @@ def register_as_admin(
 
     mod_dict = mod.to_dict()
 
-    response = JSONResponse(
+    response = FastJSONResponse(
         status_code=201,
         content={
             "success": True,
             "message": "Admin created successfully",
             "access_token": access_token,
             "refresh_token": refresh_token,
-            "data": jsonable_encoder(
-                CreateModeratorResponseSchema.model_validate(mod_dict)
-            ),
+            "data": CreateModeratorResponseSchema.model_validate(mod_dict),
         },
     )
 
@@ -145,16 +139,14 @@ def login(
 
     mod_dict = mod.to_dict()
 
-    response = JSONResponse(
+    response = FastJSONResponse(
         status_code=200,
         content={
             "success": True,
             "message": "Login successful",
             "access_token": access_token,
             "refresh_token": refresh_token,
-            "data": jsonable_encoder(
-                CreateModeratorResponseSchema.model_validate(mod_dict)
-            ),
+            "data": CreateModeratorResponseSchema.model_validate(mod_dict),
         },
     )
 
@@ -197,7 +189,7 @@ def refresh_access_token(request: Request, db: Session = Depends(get_db)):
         current_refresh_token=current_refresh_token
     )
 
-    response = JSONResponse(
+    response = FastJSONResponse(
         status_code=200,
         content={
             "success": True,
@@ -1,8 +1,7 @@
-from fastapi import APIRouter, Depends, status
-from fastapi.encoders import jsonable_encoder
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 from pydantic import EmailStr
-from typing import Union
+from typing import Annotated, Union
 
 from api.db.database import get_db
 from api.utils.success_response import success_response
@@ -37,7 +36,7 @@ async def get_same_moderator(
     return success_response(
         status_code=status.HTTP_200_OK,
         message="Moderator successfully retrieved",
-        data=jsonable_encoder(CreateModeratorResponseSchema.model_validate(mod_dict)),
+        data=CreateModeratorResponseSchema.model_validate(mod_dict),
     )
 
 
@@ -71,24 +70,33 @@ def change_password(
 async def retrieve_moderators(
     email: EmailStr | None = None,
     id: str | None = None,
+    is_active: bool | None = None,
+    is_admin: bool | None = None,
+    page: Annotated[int, Query(gt=0)] = 1,
+    limit: Annotated[int, Query(gt=0, le=100)] = 20,
     db: Session = Depends(get_db),
     mod: Moderator = Depends(mod_service.get_current_admin),
 ):
-    """Endpoint to retrieve all moderators.
-    Uses query params ?email or ?id if present.
+    """Endpoint to retrieve a page of moderators, newest first.
+    Uses query params ?email or ?id if present to retrieve a single moderator.
 
     Args:
         email(EmailStr): The email of the mod
         id(str): The id of the mod
+        is_active(bool): Only list active or inactive mods
+        is_admin(bool): Only list admins or non admins
+        page(int): The page to be retrieved. Defaults to 1.
+        limit(int): The number of mods per page, at most 100. Defaults to 20.
         db (Session, optional): The db session object.
         mod (Moderator): The admin making the request.
     """
     if email is None and id is None:
-        mods = mod_service.fetch_all(db=db)
-
-        resp_obj = [
-            ReturnModeratorDataForAdmin.model_validate(m.to_dict()) for m in mods
-        ]
+        resp_obj = mod_service.fetch_paginated(
+            db=db,
+            skip=(page - 1) * limit,
+            limit=limit,
+            filters={"is_active": is_active, "is_admin": is_admin},
+        )
 
     elif email is not None:
         mod = mod_service.fetch_by_email(db=db, email=email, raise_404=True)
@@ -99,7 +107,7 @@ async def retrieve_moderators(
         resp_obj = ReturnModeratorDataForAdmin.model_validate(mod.to_dict())
 
     return success_response(
-        data=jsonable_encoder(resp_obj),
+        data=resp_obj,
         message="Successfully retrieved moderator(s)",
         status_code=200,
     )
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, Query
-from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 from typing import Annotated, Literal
+from datetime import datetime
 
 from api.db.database import get_db
+from api.db.types import UUID_PATTERN
 from api.utils.success_response import success_response
 from api.v1.schemas import submission as s_schema
 from api.v1.schemas import trivia as t_schema
+from api.v1.schemas.base_schemas import BulkDeleteSchema, BulkDeleteResponseModelSchema
 
 from api.v1.services.moderator import mod_service, Moderator
 from api.v1.services.submission import submission_service
@@ -31,14 +33,11 @@ async def create_submission(
 
     Returns:
     """
-    submission = submission_service.create(db, schema=schema)
-    s_dict = submission.to_dict()
+    s_dict = submission_service.create(db, schema=schema)
 
-    logger.info(f"Created new submission. ID: {submission.id}.")
+    logger.info(f"Created new submission. ID: {s_dict['id']}.")
     return success_response(
-        data=jsonable_encoder(
-            s_schema.PostSubmissionResponseSchema.model_validate(s_dict)
-        ),
+        data=s_schema.PostSubmissionResponseSchema.model_validate(s_dict),
         message="Successfully added submission",
         status_code=201,
     )
@@ -139,27 +138,59 @@ async def review_single_submission(
 
 @submissions.get(
     "",
-    response_model=s_schema.GetListOfSubmissionForModResponseModelSchema,
+    response_model=s_schema.PaginatedForAdminResponseModelSchema,
     status_code=200,
 )
 async def retrieve_all_submissions(
+    status: s_schema.SubmissionStatusEnum | None = None,
+    moderator_id: Annotated[str | None, Query(pattern=UUID_PATTERN)] = None,
+    category: s_schema.CategoryEnum | None = None,
+    country: s_schema.ACE | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    sort_by: Literal["created_at", "updated_at", "status", "difficulty"] = "created_at",
+    order: Literal["asc", "desc"] = "desc",
+    page: Annotated[int, Query(gt=0)] = 1,
+    limit: Annotated[int, Query(gt=0, le=100)] = 20,
     db: Session = Depends(get_db),
     mod: Moderator = Depends(mod_service.get_current_admin),
 ):
-    """Endpoint to retrieve all submissions.
+    """Endpoint to retrieve a page of submissions.
 
     Args:
+        status (SubmissionStatusEnum | None, optional): Only submissions with this status.
+        moderator_id (str | None, optional): Only submissions assigned to this moderator.
+        category (CategoryEnum | None, optional): Only submissions of this category.
+        country (AfricanCountriesEnum | None, optional): Only submissions about this country.
+        created_after (datetime | None, optional): Only submissions created after this time.
+        created_before (datetime | None, optional): Only submissions created before this time.
+        sort_by (str, optional): The column to sort by. Defaults to "created_at".
+        order (Literal["asc", "desc"], optional): The sort order. Defaults to "desc".
+        page (int, optional): The page to be retrieved. Defaults to 1.
+        limit (int, optional): The number of items per page, at most 100. Defaults to 20.
         db (Session, optional): The db session object.
     """
-    submissions = submission_service.fetch_all(db)
+    filter_obj = {
+        "status": status.value if status is not None else None,
+        "moderator_id": moderator_id,
+        "category": category.value if category is not None else None,
+        "country": country.value if country is not None else None,
+        "created_after": created_after,
+        "created_before": created_before,
+    }
 
-    validated_s_dict = [
-        s_schema.PostSubmissionResponseSchema.model_validate(s.to_dict())
-        for s in submissions
-    ]
+    paged_res = submission_service.fetch_paginated(
+        db=db,
+        skip=(page - 1) * limit,
+        limit=limit,
+        filters=filter_obj,
+        sort_by=sort_by,
+        order=order,
+        schema=s_schema.RetrieveSubmissionForAdminSchema,
+    )
 
     return success_response(
-        data=jsonable_encoder(validated_s_dict),
+        data=paged_res,
         message="Successfully retrieved all submissions",
         status_code=200,
     )
@@ -182,6 +213,32 @@ async def delete_single_submission(
     status = submission_service.delete(db=db, id=id)
 
 
+@submissions.post(
+    "/bulk-delete", response_model=BulkDeleteResponseModelSchema, status_code=200
+)
+async def bulk_delete_submissions(
+    schema: BulkDeleteSchema,
+    db: Session = Depends(get_db),
+    mod: Moderator = Depends(mod_service.get_current_admin),
+):
+    """Endpoint to delete many submissions at once. Nothing is deleted if any of
+    them was published as a trivia.
+
+    Args:
+        schema (BulkDeleteSchema): The ids of the submissions, at most 1000.
+        Unknown ids are ignored
+        db (Session, optional): The db session object.
+    """
+    deleted = submission_service.bulk_delete(db=db, ids=schema.ids)
+
+    logger.info(f"Deleted {len(deleted)} submissions.")
+    return success_response(
+        data={"count": len(deleted), "deleted": deleted},
+        message="Successfully deleted submissions",
+        status_code=200,
+    )
+
+
 @submissions.get(
     "/stats",
     response_model=s_schema.GetSubmissionStatsResponseModelSchema,
@@ -221,12 +278,11 @@ async def retrieve_similar_questions(
     """
     similar_trivias = submission_service.fetch_similars(db=db, id=id)
     validated_t_dict = [
-        t_schema.RetrieveTriviaForModSchema.model_validate(t.to_dict())
-        for t in similar_trivias
+        t_schema.RetrieveTriviaForModSchema.model_validate(t) for t in similar_trivias
     ]
 
     return success_response(
-        data=jsonable_encoder(validated_t_dict),
+        data=validated_t_dict,
         message="Successfully retrieved all similar trivias",
         status_code=200,
     )
@@ -242,7 +298,7 @@ async def retrieve_valid_countries():
     all_countries = [country.value for country in s_schema.ACE]
 
     return success_response(
-        data=jsonable_encoder(all_countries),
+        data=all_countries,
         message="Successfully retrieved all valid countries",
         status_code=200,
     )
@@ -258,7 +314,7 @@ async def retrieve_valid_categories():
     all_categories = [category.value for category in s_schema.CategoryEnum]
 
     return success_response(
-        data=jsonable_encoder(all_categories),
+        data=all_categories,
         message="Successfully retrieved all valid categories",
         status_code=200,
     )
@@ -289,7 +345,7 @@ async def reassign_submission(
     )
 
     return success_response(
-        data=jsonable_encoder(validated_schema),
+        data=validated_schema,
         message="Successfully reassigned submission",
         status_code=200,
     )
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, Query
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import Annotated
+from datetime import datetime
 
 from api.db.database import get_db
+from api.db.types import UUID_PATTERN
 from api.utils.success_response import success_response, failure_response
 from api.v1.schemas import trivia as t_schema
+from api.v1.schemas.base_schemas import BulkDeleteSchema, BulkDeleteResponseModelSchema
 
 from api.v1.services.moderator import mod_service, Moderator
 from api.v1.services.trivia import trivia_service
@@ -37,9 +38,7 @@ async def create_trivia(
 
     logger.info(f"Created new Trivia. ID: {trivia.id}.")
     return success_response(
-        data=jsonable_encoder(
-            t_schema.RetrieveTriviaForModSchema.model_validate(t_dict)
-        ),
+        data=t_schema.RetrieveTriviaForModSchema.model_validate(t_dict),
         message="Successfully added trivia",
         status_code=201,
     )
@@ -63,9 +62,7 @@ async def retrieve_single_trivia(
     t_dict = trivia.to_dict()
 
     return success_response(
-        data=jsonable_encoder(
-            t_schema.RetrieveTriviaForModSchema.model_validate(t_dict)
-        ),
+        data=t_schema.RetrieveTriviaForModSchema.model_validate(t_dict),
         message="Successfully retrieved trivia",
         status_code=200,
     )
@@ -73,26 +70,48 @@ async def retrieve_single_trivia(
 
 @trivias.get(
     "",
-    response_model=t_schema.GetListOfTriviaForModResponseModelSchema,
+    response_model=t_schema.GetPaginatedTriviaForModResponseModelSchema,
     status_code=200,
 )
 async def retrieve_all_trivias(
+    category: t_schema.CategoryEnum | None = None,
+    country: t_schema.ACE | None = None,
+    difficulty: t_schema.DifficultyEnum | None = None,
+    created_after: datetime | None = None,
+    cursor: Annotated[str | None, Query(pattern=UUID_PATTERN)] = None,
+    limit: Annotated[int, Query(gt=0, le=100)] = 20,
     db: Session = Depends(get_db),
     mod: Moderator = Depends(mod_service.get_current_mod),
 ):
-    """Endpoint to retrieve all trivias.
+    """Endpoint to retrieve a page of trivias, newest first.
+    Pass the next_cursor of a page as cursor to get the following one.
+
+    Breaking change: data used to be a plain list of every trivia. It is
+    now an object with limit, next_cursor and items, and items holds the
+    trivias of a single page.
 
     Args:
+        category (CategoryEnum | None, optional): Only trivias of this category.
+        country (AfricanCountriesEnum | None, optional): Only trivias about this country.
+        difficulty (DifficultyEnum | None, optional): Only trivias of this difficulty.
+        created_after (datetime | None, optional): Only trivias created after this time.
+        cursor (str | None, optional): The next_cursor of the previous page.
+        limit (int, optional): The number of trivias per page, at most 100. Defaults to 20.
         db (Session, optional): The db session object.
     """
-    trivias = trivia_service.fetch_all(db)
+    filter_obj = {
+        "category": category.value if category is not None else None,
+        "country": country.value if country is not None else None,
+        "difficulty": difficulty.value if difficulty is not None else None,
+        "created_after": created_after,
+    }
 
-    validated_t_dict = [
-        t_schema.RetrieveTriviaForModSchema.model_validate(t.to_dict()) for t in trivias
-    ]
+    paged_res = trivia_service.fetch_paginated(
+        db=db, limit=limit, cursor=cursor, filters=filter_obj
+    )
 
     return success_response(
-        data=jsonable_encoder(validated_t_dict),
+        data=paged_res,
         message="Successfully retrieved all trivias",
         status_code=200,
     )
@@ -115,14 +134,11 @@ async def update_trivia(
 
     Returns:
     """
-    trivia = trivia_service.update(db=db, schema=schema, id=id)
-    t_dict = trivia.to_dict()
+    t_dict = trivia_service.update(db=db, schema=schema, id=id)
 
-    logger.info(f"Updated Trivia. ID: {trivia.id}.")
+    logger.info(f"Updated Trivia. ID: {t_dict['id']}.")
     return success_response(
-        data=jsonable_encoder(
-            t_schema.RetrieveTriviaForModSchema.model_validate(t_dict)
-        ),
+        data=t_schema.RetrieveTriviaForModSchema.model_validate(t_dict),
         message="Successfully updated trivia",
         status_code=200,
     )
@@ -145,6 +161,31 @@ async def delete_single_trivia(
     status = trivia_service.delete(db=db, id=id)
 
 
+@trivias.post(
+    "/bulk-delete", response_model=BulkDeleteResponseModelSchema, status_code=200
+)
+async def bulk_delete_trivias(
+    schema: BulkDeleteSchema,
+    db: Session = Depends(get_db),
+    mod: Moderator = Depends(mod_service.get_current_admin),
+):
+    """Endpoint to delete many trivias at once.
+
+    Args:
+        schema (BulkDeleteSchema): The ids of the trivias, at most 1000.
+        Unknown ids are ignored
+        db (Session, optional): The db session object.
+    """
+    deleted = trivia_service.bulk_delete(db=db, ids=schema.ids)
+
+    logger.info(f"Deleted {len(deleted)} trivias.")
+    return success_response(
+        data={"count": len(deleted), "deleted": deleted},
+        message="Successfully deleted trivias",
+        status_code=200,
+    )
+
+
 @questions.get(
     "",
     status_code=200,
@@ -167,6 +208,11 @@ async def get_questions(
         if v is not None
     }
 
+    if not trivia_service.has_enough_questions(db, filter_obj, amount):
+        return failure_response(
+            status_code=200, message="Not enough questions in database"
+        )
+
     all_questions = trivia_service.retrieve_questions(db, filter_obj, amount)
 
     if len(all_questions) != amount:
@@ -174,9 +220,34 @@ async def get_questions(
             status_code=200, message="Not enough questions in database"
         )
 
-    all_question_d = [q.to_dict() for q in all_questions]
+    # Validate into the public schema to filter out fields meant for mods only
+    validated_q_dict = [
+        t_schema.HelperSchemaTwo.model_validate(q) for q in all_questions
+    ]
+
+    return success_response(
+        data=validated_q_dict,
+        message="Successfully retrieved questions",
+        status_code=200,
+    )
+
+
+@questions.get(
+    "/availability",
+    status_code=200,
+    response_model=t_schema.GetTriviaAvailabilityResponseModelSchema,
+)
+async def get_questions_availability(db: Session = Depends(get_db)):
+    """Endpoint to retrieve the number of available questions per category and difficulty,
+    broken down by country.
 
-    # Return pydantic model for automatic data filtering
-    return t_schema.GetListOfTriviaForModResponseModelSchema(
-        success=True, message="Successfully retrieved questions", data=all_question_d
+    Args:
+        db (Session, optional): The db session object.
+    """
+    availability = trivia_service.fetch_availability(db)
+
+    return success_response(
+        data=availability,
+        message="Successfully retrieved questions availability",
+        status_code=200,
     )
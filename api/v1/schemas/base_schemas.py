@@ -1,6 +1,26 @@
-from pydantic import BaseModel
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+from api.db.types import UUID_PATTERN
+
+BULK_DELETE_LIMIT = 1000
 
 
 class BaseSuccessResponseSchema(BaseModel):
         success: bool
-        message: str
\ No newline at end of file
+        message: str
+
+
+class BulkDeleteSchema(BaseModel):
+    ids: list[Annotated[str, Field(pattern=UUID_PATTERN)]] = Field(
+        min_length=1, max_length=BULK_DELETE_LIMIT
+    )
+
+
+class BulkDeleteResponseModelSchema(BaseSuccessResponseSchema):
+    class BulkDeletedSchema(BaseModel):
+        count: int
+        deleted: list[str]
+
+    data: BulkDeletedSchema
@@ -92,8 +92,20 @@ class ReturnModeratorDataForAdmin(CreateModeratorResponseSchema):
     pending_submissions: list[str]
 
 
+class ModeratorListItemSchema(ReturnModeratorDataForAdmin):
+    pending_submissions_count: int
+
+
+class PaginatedModeratorsSchema(BaseModel):
+    page: int
+    total_pages: int
+    total: int
+    limit: int
+    items: list[ModeratorListItemSchema]
+
+
 class RetrieveModeratorsModelResponseSchema(BaseSuccessResponseSchema):
-    data: list[ReturnModeratorDataForAdmin]
+    data: PaginatedModeratorsSchema
 
 
 class RetrieveSingleModeratorModelResponseSchema(BaseSuccessResponseSchema):
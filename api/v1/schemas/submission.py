@@ -63,6 +63,11 @@ class RetrieveSubmissionForModSchema(HelperResponseSchemaOne, SubmissionBaseSche
     pass
 
 
+class RetrieveSubmissionForAdminSchema(HelperResponseSchemaOne, SubmissionBaseSchema):
+    # None while the submission awaits a moderator
+    moderator_id: str | None
+
+
 class PaginatedBaseSchema(BaseModel):
     page: int
     total_pages: int
@@ -75,6 +80,14 @@ class PaginatedResponseModelSchema(BaseSuccessResponseSchema):
     data: PaginatedBaseSchema
 
 
+class PaginatedForAdminSchema(PaginatedBaseSchema):
+    items: list[RetrieveSubmissionForAdminSchema]
+
+
+class PaginatedForAdminResponseModelSchema(BaseSuccessResponseSchema):
+    data: PaginatedForAdminSchema
+
+
 class PostSubmissionResponseModelSchema(BaseSuccessResponseSchema):
     data: PostSubmissionResponseSchema
 
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+from pydantic_core import PydanticCustomError
 from datetime import datetime
 from api.v1.schemas.african_countries_enum import AfricanCountriesEnum as ACE
 from api.v1.schemas.submission import DifficultyEnum, CategoryEnum
@@ -32,10 +33,21 @@ class UpdateTriviaSchema(BaseModel):
     category: CategoryEnum | None = None
     countries: list[ACE] | None = Field(default=None)
 
+    @model_validator(mode="after")
+    def reject_explicit_nulls(self):
+        """Fields left out are kept as they are, but can't be set to null"""
+        nulls = sorted(f for f in self.model_fields_set if getattr(self, f) is None)
+        if nulls:
+            raise PydanticCustomError(
+                "null_field", "{fields} can't be null", {"fields": ", ".join(nulls)}
+            )
+        return self
+
 
 class HelperResponseSchemaOne(CreateTriviaSchema):
     id: str
     created_at: datetime
+    updated_at: datetime | None = None
 
 
 class RetrieveTriviaForModSchema(HelperResponseSchemaOne, TriviaBaseSchema):
@@ -46,9 +58,31 @@ class GetTriviaForModResponseModelSchema(BaseSuccessResponseSchema):
     data: RetrieveTriviaForModSchema
 
 
+class KeysetPaginatedTriviaSchema(BaseModel):
+    limit: int
+    next_cursor: str | None
+    items: list[RetrieveTriviaForModSchema]
+
+
 class GetListOfTriviaForModResponseModelSchema(BaseSuccessResponseSchema):
     data: list[RetrieveTriviaForModSchema]
 
 
+class GetPaginatedTriviaForModResponseModelSchema(BaseSuccessResponseSchema):
+    data: KeysetPaginatedTriviaSchema
+
+
 class GetListOfTriviaUsersResponseModelSchema(BaseSuccessResponseSchema):
     data: list[HelperSchemaTwo] | None
+
+
+class TriviaAvailabilitySchema(BaseModel):
+    category: str
+    difficulty: str
+    total: int
+    without_country: int
+    countries: dict[str, int]
+
+
+class GetTriviaAvailabilityResponseModelSchema(BaseSuccessResponseSchema):
+    data: list[TriviaAvailabilitySchema]
@@ -9,6 +9,7 @@ from fastapi.security import (
 )
 import jwt
 from fastapi import Depends, HTTPException
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from passlib.context import CryptContext
@@ -16,7 +17,13 @@ from passlib.context import CryptContext
 from api.db.database import get_db
 from api.utils.settings import settings
 from api.core.base.services import Service
+from api.db.types import is_uuid, to_uuid_string
 from api.v1.models.moderator import Moderator
+from api.utils.sql_queries import (
+    AGGREGATE_SEPARATOR,
+    MODERATOR_LOAD_OPTIONS,
+    query_for_moderator_listing,
+)
 from api.v1.services.country import CountryService
 from api.v1.schemas import moderator
 
@@ -58,13 +65,62 @@ class ModeratorService(Service):
         Returns:
             list[Moderator]: A list of all Moderator objects on the database
         """
-        all_moderators = db.query(Moderator).all()
+        all_moderators = db.query(Moderator).options(*MODERATOR_LOAD_OPTIONS).all()
         return all_moderators
 
+    def fetch_paginated(
+        self, db: Session, skip: int, limit: int, filters: dict[str, bool | None]
+    ) -> dict[str]:
+        """Fetches a page of moderators with their country preferences and pending
+        submissions, all with one query
+
+        Args:
+            db (Session): Db session object
+            skip (int): The number of moderators to skip
+            limit (int): The number of moderators per page
+            filters (dict[str, bool | None]): Values for is_active and is_admin
+
+        Returns:
+            dict: The page number, total_pages, total, limit and the moderators as items
+        """
+        rows = db.execute(query_for_moderator_listing(filters, skip, limit)).all()
+
+        if rows:
+            total = rows[0].total
+        elif skip == 0:
+            total = 0
+        else:
+            # The total is read from the page's rows, so past the last page it
+            # has to be counted separately
+            total = db.scalar(
+                select(func.count(Moderator.id)).filter_by(
+                    **{k: v for k, v in filters.items() if v is not None}
+                )
+            )
+
+        items = []
+        for row in rows:
+            item = row._asdict()
+            item.pop("total")
+            for key in ("country_preferences", "pending_submissions"):
+                item[key] = item[key].split(AGGREGATE_SEPARATOR) if item[key] else []
+            item["pending_submissions"] = list(
+                map(to_uuid_string, item["pending_submissions"])
+            )
+            items.append(moderator.ModeratorListItemSchema.model_validate(item))
+
+        return {
+            "page": skip // limit + 1,
+            "total_pages": -(-total // limit),
+            "total": total,
+            "limit": limit,
+            "items": items,
+        }
+
     def fetch(self, db: Session, id: str, raise_404=False):
-        """Fetches a moderator by their id"""
+        """Fetches a moderator by their id. Ids which aren't UUIDs match nothing"""
 
-        mod = db.get(Moderator, id)
+        mod = db.get(Moderator, id) if is_uuid(id) else None
         
         if mod is None and raise_404 is True:
             raise self.NOT_FOUND_EXC
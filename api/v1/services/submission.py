@@ -2,24 +2,46 @@ from typing import Literal
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
-from sqlalchemy import func
+from pydantic import BaseModel
+from sqlalchemy import (
+    Boolean,
+    Insert,
+    Select,
+    String,
+    Text,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    join,
+    literal,
+    select,
+    true,
+    values,
+)
+from uuid_extensions import uuid7
 
 from api.utils.paginated_response import paginated_response
 from api.v1.models.submission import Submission, SubmissionOption
 from api.v1.models.trivia import Trivia
 from api.core.base.services import Service
+from api.db.types import UUIDString, is_uuid
 from api.v1.services.moderator import mod_service
+from api.v1.services.trivia import trivia_service
 from api.v1.schemas import submission as s_schema
-from api.v1.services.country import CountryService
-from api.v1.services.category import CategoryService
 
 from api.v1.models.moderator import Moderator
 from api.v1.models.country import Country
-from api.v1.models.category import Category
+from api.v1.models.association import country_submission_association
 from api.utils.logger import logger
 from api.utils.sql_queries import (
-    query_for_mods_pref_submissions,
+    AGGREGATE_SEPARATOR,
+    SUBMISSION_LOAD_OPTIONS,
+    category_id_subquery,
+    query_for_suitable_mod,
     query_for_submission_stats,
+    query_for_trivia_projection,
 )
 
 
@@ -40,6 +62,11 @@ class SubmissionService(Service):
         detail="You do not have permission to access this resource",
     )
 
+    PUBLISHED_EXC = HTTPException(
+        status_code=409,
+        detail="Submissions published as trivias can't be deleted",
+    )
+
     def update(self):
         pass
 
@@ -48,14 +75,51 @@ class SubmissionService(Service):
         try:
             submission = self.fetch(db=db, id=id, raise_404=True)
 
-            db.delete(submission)
+            # A single DELETE, the database removes the options and country links
+            db.execute(delete(Submission).where(Submission.id == submission.id))
             db.commit()
 
             return True
+        except IntegrityError:
+            db.rollback()
+            raise self.PUBLISHED_EXC
         except Exception as e:
             logger.exception(e)
             raise e
 
+    def bulk_delete(self, db: Session, ids: list[str]) -> list[str]:
+        """Deletes the submissions with the given ids in one statement, their
+        options and country links going with them through the ON DELETE CASCADE
+        foreign keys. Nothing is deleted if any of them was published as a trivia
+
+        Args:
+            db (Session): Db session object
+            ids (list[str]): Ids of the submissions to delete. Unknown ids are ignored
+
+        Returns:
+            list[str]: The ids of the deleted submissions
+        """
+        ids = [id for id in dict.fromkeys(ids) if is_uuid(id)]
+        if not ids:
+            return []
+
+        try:
+            deleted = db.scalars(
+                delete(Submission)
+                .where(Submission.id.in_(ids))
+                .returning(Submission.id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise self.PUBLISHED_EXC
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+        return deleted
+
     def fetch_all(self, db: Session) -> list[Submission]:
         """Fetches all submissions from the database
 
@@ -65,90 +129,103 @@ class SubmissionService(Service):
         Returns:
             list[Submission]: A list of all Submission objects on the database
         """
-        all_submissions = db.query(Submission).all()
+        all_submissions = db.query(Submission).options(*SUBMISSION_LOAD_OPTIONS).all()
         return all_submissions
 
     def fetch(self, db: Session, id: str, raise_404=False):
-        """Fetches a submission by their id"""
+        """Fetches a submission by their id. Ids which aren't UUIDs match nothing"""
 
-        subm = db.get(Submission, id)
+        subm = (
+            db.get(Submission, id, options=SUBMISSION_LOAD_OPTIONS)
+            if is_uuid(id)
+            else None
+        )
         if subm is None and raise_404 is True:
             raise self.NOT_FOUND_EXC
 
         return subm
 
-    def extract_countries_categories_options(
-        self, schema_d: dict, db: Session
-    ) -> tuple[list[Country], list[Category], list[SubmissionOption]]:
-        """This method extracts and converts countries, categories and options
-            present in the schema dump into sqlalchemy models
-
-        Args:
-            schema_d (dict): Dictionary containing schema dump to be used
-            db (Session): Database session
-        Returns:
-            tuple: A tuple containing a list of extracted models (countries, categories and options)
-        """
-        try:
-            countries = schema_d.pop("countries", [])
-            country_models_list = CountryService.fetch_countries(db, countries)
-
-            given_category = schema_d.pop("category")
-            category_models_list = CategoryService.fetch_categories(
-                db, [given_category]
-            )
-
-            all_options = schema_d.pop("incorrect_options")
-            all_options.append(schema_d.pop("correct_option"))
-
-            options_models_list = [
-                SubmissionOption(content=all_options[0]),
-                SubmissionOption(content=all_options[1]),
-                SubmissionOption(content=all_options[2]),
-                SubmissionOption(content=all_options[3], is_correct=True),
-            ]
-
-            return (country_models_list, category_models_list, options_models_list)
-
-        except Exception as e:
-            logger.exception(e)
-
-    def create(
-        self, db: Session, schema: s_schema.CreateSubmissionSchema
-    ) -> Submission:
-        """Creates a new submission
+    def create(self, db: Session, schema: s_schema.CreateSubmissionSchema) -> dict:
+        """Creates a new submission, assigned to the moderator selected by
+        query_for_suitable_mod as part of the submission INSERT.
 
+        On PostgreSQL the submission, its options and its country links are
+        inserted by a single statement, the INSERTs being composed as CTEs.
+        Other databases (SQLite) don't support INSERT in a CTE and run one INSERT
+        per table instead, so the round trips don't depend on the number of
+        options or countries either way
 
         Args:
             db (Session): Database session
             schema (s_schema.CreateSubmissionSchema): Pydantic Schema
 
         Returns:
-            Submission: Return newly created submission
+            dict: The newly created submission, as returned by Submission.to_dict
         """
-        try:
-            schema_dump = schema.model_dump()
-            assoc_countries_copy = schema_dump.get("countries", []).copy()
-
-            [country_models_list, category_models_list, options_models_list] = (
-                self.extract_countries_categories_options(schema_dump, db)
+        submission = schema.model_dump(mode="json")
+        countries = list(dict.fromkeys(submission.pop("countries")))
+        category = submission.pop("category")
+        options = [
+            {"id": str(uuid7()), "content": content, "is_correct": False}
+            for content in submission["incorrect_options"]
+        ] + [
+            {
+                "id": str(uuid7()),
+                "content": submission["correct_option"],
+                "is_correct": True,
+            }
+        ]
+
+        linked_countries = (
+            select(func.aggregate_strings(Country.name, AGGREGATE_SEPARATOR))
+            .where(Country.name.in_(countries))
+            .scalar_subquery()
+        )
+        submission_insert = (
+            insert(Submission)
+            .values(
+                id=str(uuid7()),
+                question=submission["question"],
+                difficulty=submission["difficulty"],
+                submission_note=submission["submission_note"],
+                category_id=category_id_subquery(category),
+                moderator_id=query_for_suitable_mod(countries).scalar_subquery(),
             )
+            .returning(
+                Submission.id,
+                Submission.status,
+                Submission.moderator_id,
+                Submission.created_at,
+                Submission.updated_at,
+                linked_countries.label("countries"),
+            )
+        )
 
-            sub = Submission(**schema_dump)
-            sub.countries = country_models_list
-            sub.categories = category_models_list
-            sub.options = options_models_list
-
-            mod_id = self.find_suitable_mod(db, assoc_countries_copy)
-            sub.moderator_id = mod_id
+        try:
+            if db.get_bind().dialect.name == "postgresql":
+                row = db.execute(
+                    self.composed_insert(submission_insert, options, countries)
+                ).one()
+            else:
+                row = db.execute(submission_insert).one()
+                db.execute(
+                    insert(SubmissionOption),
+                    [{**option, "submission_id": row.id} for option in options],
+                )
+                if countries:
+                    db.execute(
+                        insert(country_submission_association).from_select(
+                            ["country_id", "submission_id"],
+                            select(Country.id, literal(row.id, UUIDString())).where(
+                                Country.name.in_(countries)
+                            ),
+                        )
+                    )
 
-            db.add(sub)
             db.commit()
-            db.refresh(sub)
-
-            return sub
 
         except IntegrityError as e:
+            db.rollback()
             raise HTTPException(
                 status_code=400,
                 detail="This question already exists",
@@ -156,74 +233,132 @@ class SubmissionService(Service):
 
         except Exception as e:
             logger.exception(e)
+            raise e
+
+        linked = row.countries.split(AGGREGATE_SEPARATOR) if row.countries else []
+        submission.update(row._asdict())
+        submission["category"] = category
+        submission["countries"] = [c for c in countries if c in linked]
+
+        return submission
 
-    def get_mod_prefs_and_assigns(self, db: Session) -> list[tuple[str, list, int]]:
-        """This function uses sql queries to retrieve details of moderators
-        present on the database. These details are used to determine what mod
-        is assigned to a new submission in the database
+    @staticmethod
+    def composed_insert(
+        submission_insert: Insert, options: list[dict], countries: list[str]
+    ) -> Select:
+        """Composes the INSERTs of a submission, its options and its country links
+        into one statement, for PostgreSQL
 
         Args:
-            db (Session): The database session
+            submission_insert (Insert): INSERT of the submission, returning its row
+            options (list[dict]): id, content and is_correct of each option
+            countries (list[str]): Names of the countries to link
 
         Returns:
-            list[tuple[str, list, int]]: This a list of tuples which contains the moderator's id,
-            a list of their preferred countries and the number of submissions pending their review.
-            It is ordered by the pending submission count
+            Select: Statement returning the row returned by submission_insert
         """
-        try:
-            query_obj = query_for_mods_pref_submissions()
-            result = db.execute(query_obj)
-            return result.all()
-        except Exception as e:
-            logger.exception(e)
+        new_submission = submission_insert.cte("new_submission")
+
+        option_rows = values(
+            column("id", String),
+            column("content", Text),
+            column("is_correct", Boolean),
+            name="option_rows",
+        ).data([tuple(option.values()) for option in options])
+        new_options = insert(SubmissionOption).from_select(
+            ["id", "submission_id", "content", "is_correct"],
+            select(
+                cast(option_rows.c.id, UUIDString()),
+                new_submission.c.id,
+                option_rows.c.content,
+                option_rows.c.is_correct,
+            ).select_from(option_rows.join(new_submission, true())),
+        )
 
-    def find_suitable_mod(self, db: Session, assoc_countries: list) -> str:
-        """Function to detetmin what moderator is suitable to be assigned
-        for a given submission made to the db.
+        new_links = insert(country_submission_association).from_select(
+            ["country_id", "submission_id"],
+            select(Country.id, new_submission.c.id)
+            .select_from(join(Country, new_submission, true()))
+            .where(Country.name.in_(countries)),
+        )
 
-        Args:
-            db (Session): Database of session object
-            assoc_countries (list): countries associated with submission
+        ctes = [new_options.cte("new_options")]
+        if countries:
+            ctes.append(new_links.cte("new_links"))
 
-        Returns:
-            str: The id of the selected moderator
-        """
-        try:
-            all_mod_details = self.get_mod_prefs_and_assigns(db)
-            if len(assoc_countries) == 0:
-                # If no countries associated with submission, simply assign to mod
-                # with lowest pending assigns
-                return all_mod_details[0][0]
-
-            for mod_id, mod_cntry_pref, pending_count in all_mod_details:
-                if len(mod_cntry_pref) == 0 or set(mod_cntry_pref).intersection(
-                    assoc_countries
-                ):
-                    return mod_id
+        return select(new_submission).add_cte(*ctes)
 
-        except Exception as e:
-            logger.exception(e)
+    # Columns the paginated listings can be sorted by
+    SORT_COLUMNS = {
+        "created_at": Submission.created_at,
+        "updated_at": Submission.updated_at,
+        "status": Submission.status,
+        "difficulty": Submission.difficulty,
+    }
 
     def fetch_paginated(
-        self, db: Session, skip: int, limit: int, filters: dict[str]
+        self,
+        db: Session,
+        skip: int,
+        limit: int,
+        filters: dict[str],
+        sort_by: str = "created_at",
+        order: Literal["asc", "desc"] = "desc",
+        schema: type[BaseModel] = s_schema.RetrieveSubmissionForModSchema,
     ) -> dict[str]:
+        """Fetches a page of submissions
+
+        Args:
+            db (Session): Db session object
+            skip (int): The number of submissions to skip
+            limit (int): The number of submissions per page
+            filters (dict[str]): Column values to match, e.g. status or moderator_id,
+            plus optional category, country, created_after and created_before.
+            None values are ignored
+            sort_by (str, optional): A key of SORT_COLUMNS. Defaults to "created_at".
+            order (Literal["asc", "desc"], optional): Defaults to "desc".
+            schema (type[BaseModel], optional): Schema the items are validated into.
+            Defaults to RetrieveSubmissionForModSchema.
+
+        Returns:
+            dict: The page number, total_pages, total, limit and the submissions as items
+        """
+        filters = dict(filters)
+        conditions = []
+        if (tmp := filters.pop("category", None)) is not None:
+            conditions.append(Submission.category_id == category_id_subquery(tmp))
+        if (tmp := filters.pop("country", None)) is not None:
+            conditions.append(Submission.countries.any(Country.name == tmp))
+        if (tmp := filters.pop("created_after", None)) is not None:
+            conditions.append(Submission.created_at > tmp)
+        if (tmp := filters.pop("created_before", None)) is not None:
+            conditions.append(Submission.created_at < tmp)
+
+        # The id breaks ties, so rows sharing a sort value keep their page
+        direction = "asc" if order == "asc" else "desc"
+        order_by = (
+            getattr(self.SORT_COLUMNS[sort_by], direction)(),
+            getattr(Submission.id, direction)(),
+        )
 
         page_number = int(skip / limit) + 1
 
         resp = paginated_response(
-            db=db, model=Submission, skip=skip, limit=limit, filters=filters
+            db=db,
+            model=Submission,
+            skip=skip,
+            limit=limit,
+            filters=filters,
+            options=SUBMISSION_LOAD_OPTIONS,
+            conditions=conditions,
+            order_by=order_by,
         )
 
         resp.pop("skip", None)
         resp["page"] = page_number
 
         resp["items"] = list(
-            map(
-                lambda x: s_schema.RetrieveSubmissionForModSchema.model_validate(
-                    x.to_dict()
-                ),
-                resp["results"],
-            )
+            map(lambda x: schema.model_validate(x.to_dict()), resp["results"])
         )
 
         resp.pop("results", None)
@@ -275,7 +410,7 @@ class SubmissionService(Service):
             return result_dict._asdict()
         return None
 
-    def fetch_similars(self, db: Session, id: str) -> list[Trivia]:
+    def fetch_similars(self, db: Session, id: str) -> list[dict]:
         """This function retrieves all trivias similar to a given submission
 
         Args:
@@ -283,14 +418,15 @@ class SubmissionService(Service):
             id (str): Id of submission
 
         Returns:
-            list[Trivia]: A list of trivias that are sufficiently similarity
+            list[dict]: The trivias that are sufficiently similar, as mapped by
+            TriviaService.projection_to_dict
         """
 
         subm = self.fetch(db=db, id=id, raise_404=True)
-        q = db.query(Trivia).where(
+        q = query_for_trivia_projection().where(
             func.similarity(Trivia.question, subm.question) >= 0.6
         )
-        return q.all()
+        return [trivia_service.projection_to_dict(row) for row in db.execute(q).all()]
 
     def reassign(self, db: Session, id: str, new_mod_id: str) -> Submission:
         """This service function aids in manually reassigning a submission to a given moderator
@@ -1,10 +1,14 @@
 from typing import Literal
+from datetime import datetime
+from sqlalchemy import delete, func, insert, literal, select, update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
 from api.core.base.services import Service
+from api.db.types import UUIDString, is_uuid
 
-from api.utils.paginated_response import paginated_response
+from api.utils.paginated_response import paginated_response, keyset_paginated_response
+from api.v1.models.association import country_trivia_association
 from api.v1.models.trivia import Trivia, TriviaOption
 from api.v1.schemas import trivia as t_schema
 from api.v1.services.country import CountryService
@@ -13,7 +17,16 @@ from api.v1.services.category import CategoryService
 from api.v1.models.country import Country
 from api.v1.models.category import Category
 from api.utils.logger import logger
-from api.utils.sql_queries import query_for_question_retrieval
+from api.utils.sql_queries import (
+    AGGREGATE_SEPARATOR,
+    TRIVIA_LOAD_OPTIONS,
+    category_id_subquery,
+    query_for_question_retrieval,
+    query_for_trivia_availability_key,
+    query_for_trivia_projection,
+    query_for_trivia_update,
+)
+from api.utils.availability_matrix import availability_matrix
 
 
 class TriviaService(Service):
@@ -42,19 +55,125 @@ class TriviaService(Service):
         Returns:
             list[Trivia]: A list of all trivia objects on the database
         """
-        all_trivias = db.query(Trivia).all()
+        all_trivias = db.query(Trivia).options(*TRIVIA_LOAD_OPTIONS).all()
         return all_trivias
 
+    def fetch_paginated(
+        self,
+        db: Session,
+        limit: int,
+        cursor: str | None = None,
+        filters: dict[str, str | datetime | None] | None = None,
+    ) -> dict[str]:
+        """Fetches a page of trivias, newest first
+
+        Args:
+            db (Session): Db session object
+            limit (int): The number of trivias per page
+            cursor (str | None, optional): The next_cursor of the previous page.
+            Defaults to None, for the first page.
+            filters (dict | None, optional): Values for category, country,
+            difficulty and created_after. None values are ignored. Defaults to None.
+
+        Returns:
+            dict: The limit, the cursor of the next page (None on the last page)
+            and the trivias as items
+        """
+        filters = filters or {}
+        conditions = []
+        if (tmp := filters.get("category")) is not None:
+            conditions.append(Trivia.category_id == category_id_subquery(tmp))
+        if (tmp := filters.get("country")) is not None:
+            conditions.append(Trivia.countries.any(Country.name == tmp))
+        if (tmp := filters.get("difficulty")) is not None:
+            conditions.append(Trivia.difficulty == tmp)
+        if (tmp := filters.get("created_after")) is not None:
+            conditions.append(Trivia.created_at > tmp)
+
+        resp = keyset_paginated_response(
+            db=db,
+            model=Trivia,
+            limit=limit,
+            cursor=cursor,
+            filters=conditions,
+            statement=query_for_trivia_projection(),
+        )
+
+        resp["items"] = [
+            t_schema.RetrieveTriviaForModSchema.model_validate(self.projection_to_dict(row))
+            for row in resp.pop("results")
+        ]
+
+        return resp
+
     def fetch(self, db: Session, id: str, raise_404=False) -> Trivia | None:
-        """Fetches a Trivia by their id"""
+        """Fetches a Trivia by their id. Ids which aren't UUIDs match nothing"""
 
-        trivia = db.get(Trivia, id)
+        trivia = (
+            db.get(Trivia, id, options=TRIVIA_LOAD_OPTIONS) if is_uuid(id) else None
+        )
 
         if trivia is None and raise_404 is True:
             raise self.NOT_FOUND_EXC
 
         return trivia
 
+    @staticmethod
+    def projection_to_dict(row) -> dict:
+        """Maps a row of query_for_trivia_projection to the dict the trivia
+        schemas validate, like Trivia.to_dict does for a model"""
+        obj_dict = row._asdict()
+        obj_dict["countries"] = (
+            obj_dict["countries"].split(AGGREGATE_SEPARATOR)
+            if obj_dict["countries"]
+            else []
+        )
+
+        options_json = obj_dict.pop("options_json", None)
+        if options_json:
+            obj_dict["correct_option"] = options_json["correct_option"]
+            obj_dict["incorrect_options"] = list(options_json["incorrect_options"])
+            return obj_dict
+
+        obj_dict["incorrect_options"] = (
+            obj_dict["incorrect_options"].split(AGGREGATE_SEPARATOR)
+            if obj_dict["incorrect_options"]
+            else []
+        )
+        obj_dict["correct_option"] = obj_dict["correct_option"] or ""
+        return obj_dict
+
+    @staticmethod
+    def availability_key(trivia: Trivia) -> tuple[str | None, str, list[str]]:
+        """Returns the category, difficulty and country names of a trivia
+        as used by the availability matrix"""
+        return (
+            trivia.category.name if trivia.category is not None else None,
+            getattr(trivia.difficulty, "value", trivia.difficulty),
+            [country.name for country in trivia.countries],
+        )
+
+    @staticmethod
+    def projection_availability_key(
+        obj_dict: dict,
+    ) -> tuple[str | None, str, list[str]]:
+        """Same as availability_key, for a trivia mapped by projection_to_dict"""
+        return (
+            obj_dict["category"],
+            getattr(obj_dict["difficulty"], "value", obj_dict["difficulty"]),
+            sorted(obj_dict["countries"]),
+        )
+
+    @staticmethod
+    def options_json(options: list[TriviaOption]) -> dict:
+        """Returns the value of Trivia.options_json for the given option models"""
+        return {
+            "correct_option": next(
+                (o.content for o in options if o.is_correct), ""
+            ),
+            "incorrect_options": [o.content for o in options if not o.is_correct],
+        }
+
     def extract_options(self, schema_d: dict) -> list[TriviaOption]:
         """This  function extract all options from a given schema dictionary.
         This dictionary might result from a create endpoint or an update endpoint.
@@ -137,13 +256,16 @@ class TriviaService(Service):
 
             trivia = Trivia(**schema_dump)
             trivia.countries = country_models_list
-            trivia.categories = category_models_list
+            trivia.category = category_models_list[0]
             trivia.options = options_models_list
+            trivia.options_json = self.options_json(options_models_list)
 
             db.add(trivia)
             db.commit()
             db.refresh(trivia)
 
+            availability_matrix.record_added(*self.availability_key(trivia))
+
             return trivia
 
         except IntegrityError as e:
@@ -155,55 +277,134 @@ class TriviaService(Service):
         except Exception as e:
             logger.exception(e)
 
-    def update(self, db: Session, schema: t_schema.UpdateTriviaSchema, id: str):
-        """Updates an existing Trivia
+    def update(
+        self, db: Session, schema: t_schema.UpdateTriviaSchema, id: str
+    ) -> dict:
+        """Updates an existing Trivia with only the statements its changes need.
+        The current state is read with one query, then the trivia row is updated,
+        returning its new values, along with the option rows whose content changed
+        and the country links added or removed. Nothing is written if nothing changed
+
         Args:
             db (Session): Database session
-            schema (s_schema.CreateTriviaSchema): Pydantic Schema
+            schema (t_schema.UpdateTriviaSchema): Pydantic Schema. Unset fields are kept
+            id (str): The id of the trivia
 
         Returns:
-            Trivia: Return newly created Trivia
+            dict: The updated trivia, as mapped by projection_to_dict
         """
-        try:
-            trivia = self.fetch(db=db, id=id, raise_404=True)
-            schema_dump = schema.model_dump(exclude_unset=True)
+        rows = db.execute(query_for_trivia_update(id)).all() if is_uuid(id) else []
+        if not rows:
+            raise self.NOT_FOUND_EXC
 
-            [country_models_list, category_models_list, options_models_list] = (
-                self.extract_countries_categories_options(schema_dump, db)
+        trivia = self.projection_to_dict(rows[0])
+        for key in ("option_id", "option_content", "option_is_correct"):
+            trivia.pop(key)
+        # (id, content) of the incorrect option rows, in order, and the correct one
+        incorrect = [
+            (r.option_id, r.option_content)
+            for r in rows
+            if r.option_id is not None and not r.option_is_correct
+        ]
+        correct = next(
+            ((r.option_id, r.option_content) for r in rows if r.option_is_correct),
+            None,
+        )
+
+        old_availability_key = self.projection_availability_key(trivia)
+        changes = schema.model_dump(mode="json", exclude_unset=True)
+
+        values = {
+            key: changes[key]
+            for key in ("question", "difficulty")
+            if key in changes and changes[key] != trivia[key]
+        }
+        if "category" in changes and changes["category"] != trivia["category"]:
+            # Resolved first: a missing category would set category_id to NULL
+            category_id = db.scalar(
+                select(Category.id).where(Category.name == changes["category"])
+            )
+            if category_id is None:
+                raise HTTPException(status_code=400, detail="Category not found")
+            values["category_id"] = category_id
+
+        option_updates = []
+        if "incorrect_options" in changes:
+            option_updates += [
+                {"id": option_id, "content": content}
+                for (option_id, old_content), content in zip(
+                    incorrect, changes["incorrect_options"]
+                )
+                if content != old_content
+            ]
+        if correct is not None and changes.get("correct_option", correct[1]) != correct[1]:
+            option_updates.append(
+                {"id": correct[0], "content": changes["correct_option"]}
             )
 
-            # Update all other fields with the provided schema data
-            for key, value in schema_dump.items():
-                setattr(trivia, key, value)
-
-            # The above may not all be present in the extract from the schema dump for an update
-            if country_models_list is not None:
-                trivia.countries = country_models_list
-            if category_models_list is not None:
-                trivia.categories = category_models_list
-
-            if options_models_list is not None and options_models_list != []:
-                existing_options: list[TriviaOption] = trivia.options
-                # Existing options sorted with correct option last
-                existing_options.sort(key=lambda x: x.is_correct)
-                for i in range(len((existing_options))):
-                    # Find and update correct option model first, if applicable
-                    if len(options_models_list) == 1:
-                        existing_options[-1].content = options_models_list[-1].content
-                        break
-                    # Update incorrect option models only
-                    elif len(options_models_list) == 3:
-                        if i == 3:
-                            break
-                        existing_options[i].content = options_models_list[i].content
-                    else:
-                        existing_options[i].content = options_models_list[i].content
+        if option_updates:
+            trivia["incorrect_options"] = changes.get(
+                "incorrect_options", trivia["incorrect_options"]
+            )
+            trivia["correct_option"] = changes.get(
+                "correct_option", trivia["correct_option"]
+            )
+            values["options_json"] = {
+                "correct_option": trivia["correct_option"],
+                "incorrect_options": trivia["incorrect_options"],
+            }
+
+        new_countries = list(
+            dict.fromkeys(changes.get("countries", trivia["countries"]))
+        )
+        added = [c for c in new_countries if c not in trivia["countries"]]
+        removed = [c for c in trivia["countries"] if c not in new_countries]
+
+        if not (values or option_updates or added or removed):
+            return trivia
+
+        try:
+            # Always written, so updated_at moves whatever changed
+            row = db.execute(
+                update(Trivia)
+                .where(Trivia.id == id)
+                .values(**values, updated_at=func.now())
+                .returning(
+                    Trivia.question,
+                    Trivia.difficulty,
+                    Trivia.created_at,
+                    Trivia.updated_at,
+                )
+                .execution_options(synchronize_session=False)
+            ).one()
+
+            if option_updates:
+                # Executed as one executemany UPDATE by primary key
+                db.execute(update(TriviaOption), option_updates)
+
+            if removed:
+                db.execute(
+                    delete(country_trivia_association).where(
+                        country_trivia_association.c.trivia_id == id,
+                        country_trivia_association.c.country_id.in_(
+                            select(Country.id).where(Country.name.in_(removed))
+                        ),
+                    )
+                )
+            if added:
+                db.execute(
+                    insert(country_trivia_association).from_select(
+                        ["country_id", "trivia_id"],
+                        select(Country.id, literal(id, UUIDString())).where(
+                            Country.name.in_(added)
+                        ),
+                    )
+                )
 
             db.commit()
-            db.refresh(trivia)
-            return trivia
 
         except IntegrityError as e:
+            db.rollback()
             raise HTTPException(
                 status_code=400,
                 detail="This trivia already exists",
@@ -213,22 +414,86 @@ class TriviaService(Service):
             logger.exception(e)
             raise e
 
+        trivia.update(row._asdict())
+        trivia["category"] = changes.get("category", trivia["category"])
+        trivia["countries"] = new_countries
+
+        new_availability_key = self.projection_availability_key(trivia)
+        if new_availability_key != old_availability_key:
+            availability_matrix.record_removed(*old_availability_key)
+            availability_matrix.record_added(*new_availability_key)
+
+        return trivia
+
     def delete(self, db: Session, id: str) -> bool:
         """Deletes an existing Trivia. Else raise a 404 if not found"""
         try:
-            trivia = self.fetch(db=db, id=id, raise_404=True)
+            row = (
+                db.execute(query_for_trivia_availability_key(id)).one_or_none()
+                if is_uuid(id)
+                else None
+            )
+            if row is None:
+                raise self.NOT_FOUND_EXC
+
+            availability_key = self.projection_availability_key(
+                {
+                    "category": row.category,
+                    "difficulty": row.difficulty,
+                    "countries": (
+                        row.countries.split(AGGREGATE_SEPARATOR) if row.countries else []
+                    ),
+                }
+            )
 
-            db.delete(trivia)
+            # A single DELETE, the database removes the options and country links
+            db.execute(delete(Trivia).where(Trivia.id == id))
             db.commit()
 
+            availability_matrix.record_removed(*availability_key)
+
             return True
         except Exception as e:
             logger.exception(e)
             raise e
 
+    def bulk_delete(self, db: Session, ids: list[str]) -> list[str]:
+        """Deletes the trivias with the given ids in one statement, their options
+        and country links going with them through the ON DELETE CASCADE foreign keys
+
+        Args:
+            db (Session): Db session object
+            ids (list[str]): Ids of the trivias to delete. Unknown ids are ignored
+
+        Returns:
+            list[str]: The ids of the deleted trivias
+        """
+        ids = [id for id in dict.fromkeys(ids) if is_uuid(id)]
+        if not ids:
+            return []
+
+        try:
+            deleted = db.scalars(
+                delete(Trivia)
+                .where(Trivia.id.in_(ids))
+                .returning(Trivia.id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            db.commit()
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+        # Rebuilding the matrix is a single query, cheaper than loading the
+        # category and countries of every deleted trivia to decrement it
+        if deleted:
+            availability_matrix.invalidate()
+
+        return deleted
+
     def retrieve_questions(
         self, db: Session, filter_obj: dict[str, str | None], limit: int
-    ) -> list[Trivia]:
+    ) -> list[dict]:
         """This function uses an already prepared sqlalchemy select statement to retrieve
         trivia questions from the database.
 
@@ -237,10 +502,10 @@ class TriviaService(Service):
             limit (int): The number of items to be retrieced
 
         Returns:
-            list[Trivia]: A list of retrieved trivia objects
+            list[dict]: A list of retrieved trivias, as mapped by projection_to_dict
         """
         if (tmp := filter_obj.pop("category", None)) is not None:
-            filter_obj["category"] = Category.name == tmp
+            filter_obj["category"] = Trivia.category_id == category_id_subquery(tmp)
 
         if (tmp := filter_obj.pop("difficulty", None)) is not None:
             filter_obj["difficulty"] = Trivia.difficulty == tmp
@@ -250,9 +515,56 @@ class TriviaService(Service):
             filter_obj["country"] = tmp
 
         stmt = query_for_question_retrieval(filters=filter_obj, limit=limit)
-        results = db.scalars(stmt).all()
+        results = db.execute(stmt).all()
+
+        return [self.projection_to_dict(row) for row in results]
+
+    def fetch_availability(self, db: Session) -> list[dict]:
+        """Retrieves the cached matrix of trivia counts per category, difficulty and country
+
+        Args:
+            db (Session): Db session object
 
-        return results
+        Returns:
+            list[dict]: A list of availability cells
+        """
+        return availability_matrix.snapshot(db)
+
+    def has_enough_questions(
+        self, db: Session, filter_obj: dict[str, str | None], amount: int
+    ) -> bool:
+        """Uses the availability matrix to check if a question request can be satisfied,
+        without running the retrieval query. If the matrix can't be loaded,
+        the check is skipped and the request is allowed through.
+
+        The matrix only tracks the writes made by this process, so it may lag behind
+        trivias added by other workers. Before refusing a request it is reloaded,
+        unless it was reloaded within the last AVAILABILITY_MISS_RELOAD_INTERVAL seconds.
+
+        Args:
+            db (Session): Db session object
+            filter_obj (dict): A dictionary of the category, country and difficulty filters
+            amount (int): The number of questions requested
+
+        Returns:
+            bool: False if the database is known to hold fewer matching questions than requested
+        """
+        filters = {
+            "category": filter_obj.get("category"),
+            "country": filter_obj.get("country"),
+            "difficulty": filter_obj.get("difficulty"),
+        }
+
+        try:
+            if availability_matrix.count(db, **filters) >= amount:
+                return True
+
+            if not availability_matrix.refresh_on_miss(db):
+                return False
+            return availability_matrix.count(db, **filters) >= amount
+        except Exception as e:
+            logger.exception(e)
+            return True
 
 
 trivia_service = TriviaService()
@@ -0,0 +1,136 @@
+"""Benchmark of the per-request overhead of the credentialed-origin middleware
+on GET /api/v1/questions.
+
+Three apps serving the same router are compared:
+    * none- no origin middleware at all (baseline)
+    * decorator- the previous `@app.middleware("http")` implementation,
+    i.e. a BaseHTTPMiddleware
+    * asgi- CredentialedOriginMiddleware
+
+The database is replaced with in-memory trivia rows so only the request path is
+measured. Requests are sent straight to the ASGI app, without a network or HTTP client.
+
+Run from the project root:
+    python -m benchmarks.bench_cors_middleware
+"""
+
+import asyncio
+import statistics
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI
+from sqlalchemy.orm import Session
+from uuid_extensions import uuid7
+
+from api.core.middleware import CredentialedOriginMiddleware
+from api.db.database import get_db
+from api.utils.settings import settings
+from api.utils.sql_queries import query_for_trivia_projection
+from api.v1.routes import api_version_one
+from api.v1.services.trivia import trivia_service
+from main import routes_with_credentials
+
+REQUESTS = 3000
+ROUNDS = 5
+
+
+def make_trivia() -> dict:
+    """Returns a trivia as retrieve_questions does: a row of
+    query_for_trivia_projection mapped by projection_to_dict"""
+    Row = namedtuple("Row", query_for_trivia_projection().selected_columns.keys())
+    values = {
+        "id": str(uuid7()),
+        "question": "Who was the first president of Ghana?",
+        "difficulty": "easy",
+        "submission_id": None,
+        "created_at": datetime.now(timezone.utc),
+        "category": "History",
+        "countries": "Ghana",
+        "incorrect_options": None,
+        "correct_option": None,
+        "options_json": {
+            "correct_option": "Kwame Nkrumah",
+            "incorrect_options": ["John Mahama", "Jerry Rawlings", "John Kufuor"],
+        },
+    }
+    return trivia_service.projection_to_dict(Row(**values))
+
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+    app.include_router(api_version_one)
+    app.dependency_overrides[get_db] = lambda: MagicMock(spec=Session)
+
+    if variant == "decorator":
+
+        @app.middleware("http")
+        async def cors_middleware(request, call_next):
+            response = await call_next(request)
+            if request.url.path in routes_with_credentials:
+                response.headers["Access-Control-Allow-Origin"] = settings.APP_URL
+            return response
+
+    elif variant == "asgi":
+        app.add_middleware(
+            CredentialedOriginMiddleware,
+            paths=routes_with_credentials,
+            allow_origin=settings.APP_URL,
+        )
+
+    return app
+
+
+async def run_requests(app: FastAPI, count: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/v1/questions",
+        "raw_path": b"/api/v1/questions",
+        "root_path": "",
+        "query_string": b"amount=1",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(count):
+        await app(dict(scope), receive, send)
+    return time.perf_counter() - start
+
+
+def main():
+    trivias = [make_trivia()]
+    trivia_service.has_enough_questions = lambda db, filter_obj, amount: True
+    trivia_service.retrieve_questions = lambda db, filter_obj, limit: [
+        dict(trivia) for trivia in trivias
+    ]
+
+    results = {}
+    for variant in ("none", "decorator", "asgi"):
+        app = build_app(variant)
+        asyncio.run(run_requests(app, 100))  # warm up
+        rounds = [asyncio.run(run_requests(app, REQUESTS)) for _ in range(ROUNDS)]
+        results[variant] = statistics.median(rounds) / REQUESTS * 1e6
+
+    print(f"{'variant':>10} {'us/request':>11} {'overhead (us)':>14}")
+    for variant, per_request in results.items():
+        print(
+            f"{variant:>10} {per_request:>11.1f} {per_request - results['none']:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
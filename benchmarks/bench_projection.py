@@ -0,0 +1,99 @@
+"""Compares the two ways trivias are read for list responses: hydrating Trivia
+models with their relationships eager loaded then calling to_dict, and the
+query_for_trivia_projection rows mapped with TriviaService.projection_to_dict.
+
+Both paths run against the same in-memory SQLite database, populated with
+`benchmarks.generate_dataset`, and end with the same model_validate into
+RetrieveTriviaForModSchema. Each case reads 20, 100 and 1000 trivias, with
+timings and allocations measured by `benchmarks.harness.measure`.
+
+Run from the project root:
+    python -m benchmarks.bench_projection [--trivias 5000] [--json results.json]
+"""
+
+import argparse
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.db.database import Base
+from api.utils.sql_queries import TRIVIA_LOAD_OPTIONS, query_for_trivia_projection
+from api.v1.models.trivia import Trivia
+from api.v1.schemas.trivia import RetrieveTriviaForModSchema
+from api.v1.services.trivia import trivia_service
+from benchmarks.generate_dataset import DatasetGenerator
+from benchmarks.harness import measure, print_table, write_json
+
+LIST_SIZES = [20, 100, 1000]
+
+
+def orm_read(session_factory, size: int) -> list:
+    with session_factory() as db:
+        trivias = (
+            db.query(Trivia)
+            .options(*TRIVIA_LOAD_OPTIONS)
+            .order_by(Trivia.id.desc())
+            .limit(size)
+            .all()
+        )
+        return [RetrieveTriviaForModSchema.model_validate(t.to_dict()) for t in trivias]
+
+
+def projection_read(session_factory, size: int) -> list:
+    with session_factory() as db:
+        rows = db.execute(
+            query_for_trivia_projection().order_by(Trivia.id.desc()).limit(size)
+        ).all()
+        return [
+            RetrieveTriviaForModSchema.model_validate(
+                trivia_service.projection_to_dict(row)
+            )
+            for row in rows
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--trivias", type=int, default=5000, help="Trivias generated (default: 5000)"
+    )
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="Minimum seconds per timed run"
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    DatasetGenerator(engine, args.trivias, seed=42, batch_size=5000).run()
+    session_factory = sessionmaker(bind=engine)
+
+    # Both paths must read the same trivias
+    assert [t.id for t in orm_read(session_factory, 20)] == [
+        t.id for t in projection_read(session_factory, 20)
+    ]
+
+    results = []
+    for size in LIST_SIZES:
+        for name, read in (("orm", orm_read), ("projection", projection_read)):
+            results.append(
+                {
+                    "case": name,
+                    "items": size,
+                    **measure(lambda: read(session_factory, size), min_time=args.min_time),
+                }
+            )
+
+    print_table(
+        results,
+        ["case", "items", "best_us", "median_us", "peak_kib", "retained_kib"],
+    )
+    if args.json:
+        write_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Microbenchmark comparing the previous and current ways of building a
+list-of-trivia response.
+
+Before: model_validate -> jsonable_encoder in the route -> jsonable_encoder
+in success_response -> stdlib json.dumps in JSONResponse.
+After: model_validate -> FastJSONResponse, serialized once by pydantic-core.
+
+Run from the project root:
+    python -m benchmarks.bench_responses
+"""
+
+import json
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from uuid_extensions import uuid7
+
+from api.utils.success_response import success_response
+from api.v1.models.category import Category
+from api.v1.models.country import Country
+from api.v1.models.trivia import Trivia, TriviaOption
+from api.v1.schemas import trivia as t_schema
+from benchmarks.harness import measure
+
+LIST_SIZES = [1, 20, 1000]
+
+
+def make_trivia(i: int) -> Trivia:
+    triv = Trivia(
+        id=str(uuid7()),
+        question=f"Question number {i}?",
+        difficulty="medium",
+        created_at=datetime.now(timezone.utc),
+        updated_at=datetime.now(timezone.utc),
+    )
+    triv.categories = [Category(name="History")]
+    triv.countries = [Country(name="Ghana"), Country(name="Nigeria")]
+    triv.options = [
+        TriviaOption(content="First", is_correct=False),
+        TriviaOption(content="Second", is_correct=False),
+        TriviaOption(content="Third", is_correct=False),
+        TriviaOption(content="Fourth", is_correct=True),
+    ]
+    return triv
+
+
+def legacy_success_response(status_code: int, message: str, data=None):
+    """success_response as it was before FastJSONResponse"""
+    response_data = {"success": True, "message": message}
+    if data is not None:
+        response_data["data"] = data
+    return JSONResponse(status_code=status_code, content=jsonable_encoder(response_data))
+
+
+def before(validated: list) -> bytes:
+    return legacy_success_response(
+        status_code=200, message="Retrieved", data=jsonable_encoder(validated)
+    ).body
+
+
+def after(validated: list) -> bytes:
+    return success_response(status_code=200, message="Retrieved", data=validated).body
+
+
+def main():
+    print(f"{'items':>6} {'before (ms)':>12} {'after (ms)':>12} {'speedup':>8}")
+
+    for size in LIST_SIZES:
+        trivia_dicts = [make_trivia(i).to_dict() for i in range(size)]
+        validated = [
+            t_schema.RetrieveTriviaForModSchema.model_validate(t) for t in trivia_dicts
+        ]
+        assert json.loads(before(validated)) == json.loads(
+            after(validated)
+        ), "Both paths must produce the same document"
+
+        timings = {
+            name: measure(lambda: fn(validated))["best_us"] / 1000
+            for name, fn in (("before", before), ("after", after))
+        }
+
+        print(
+            f"{size:>6} {timings['before']:>12.3f} {timings['after']:>12.3f}"
+            f" {timings['before'] / timings['after']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Microbenchmarks for the code run for every item of a list response:
+the models' to_dict methods, TriviaService.extract_options and the full
+to_dict -> model_validate -> success_response chain.
+
+Each case runs at 1, 20 and 1000 items with timings and allocations measured
+by `benchmarks.harness.measure`.
+
+Run from the project root:
+    python -m benchmarks.bench_serialization [--json results.json] [--case trivia_to_dict]
+"""
+
+import argparse
+from datetime import datetime, timezone
+
+from uuid_extensions import uuid7
+
+from api.utils.success_response import success_response
+from api.v1.models.country import Country
+from api.v1.models.moderator import Moderator
+from api.v1.models.submission import Submission, SubmissionOption
+from api.v1.models.category import Category
+from api.v1.schemas import moderator as m_schema
+from api.v1.schemas import submission as s_schema
+from api.v1.schemas import trivia as t_schema
+from api.v1.services.trivia import trivia_service
+from benchmarks.bench_responses import make_trivia
+from benchmarks.harness import measure, print_table, write_json
+
+LIST_SIZES = [1, 20, 1000]
+
+
+def make_submission(i: int) -> Submission:
+    subm = Submission(
+        id=str(uuid7()),
+        question=f"Submitted question number {i}?",
+        difficulty="hard",
+        status="pending",
+        moderator_id=str(uuid7()),
+        created_at=datetime.now(timezone.utc),
+        updated_at=datetime.now(timezone.utc),
+    )
+    subm.categories = [Category(name="Geography")]
+    subm.countries = [Country(name="Kenya")]
+    subm.options = [
+        SubmissionOption(content="First", is_correct=False),
+        SubmissionOption(content="Second", is_correct=False),
+        SubmissionOption(content="Third", is_correct=False),
+        SubmissionOption(content="Fourth", is_correct=True),
+    ]
+    return subm
+
+
+def make_moderator(i: int) -> Moderator:
+    mod = Moderator(
+        id=str(uuid7()),
+        first_name="Ada",
+        last_name=f"Moderator{i}",
+        username=f"moderator{i}",
+        email=f"moderator{i}@afrivia.bench",
+        password="hash",
+        is_admin=False,
+        is_active=True,
+        created_at=datetime.now(timezone.utc),
+        updated_at=datetime.now(timezone.utc),
+    )
+    mod.country_preferences = [Country(name="Ghana"), Country(name="Egypt")]
+    mod.assigned_submissions = [make_submission(j) for j in range(10)]
+    return mod
+
+
+def option_schema_dump() -> dict:
+    return {
+        "incorrect_options": ["First", "Second", "Third"],
+        "correct_option": "Fourth",
+    }
+
+
+def cases(size: int) -> dict:
+    """Returns the benchmarked callables for a list of `size` items"""
+    trivias = [make_trivia(i) for i in range(size)]
+    submissions = [make_submission(i) for i in range(size)]
+    moderators = [make_moderator(i) for i in range(size)]
+
+    return {
+        "trivia_to_dict": lambda: [t.to_dict() for t in trivias],
+        "submission_to_dict": lambda: [s.to_dict() for s in submissions],
+        "moderator_to_dict": lambda: [m.to_dict() for m in moderators],
+        "extract_options": lambda: [
+            trivia_service.extract_options(option_schema_dump()) for _ in range(size)
+        ],
+        "trivia_response": lambda: success_response(
+            status_code=200,
+            message="Retrieved",
+            data=[
+                t_schema.RetrieveTriviaForModSchema.model_validate(t.to_dict())
+                for t in trivias
+            ],
+        ).body,
+        "submission_response": lambda: success_response(
+            status_code=200,
+            message="Retrieved",
+            data=[
+                s_schema.PostSubmissionResponseSchema.model_validate(s.to_dict())
+                for s in submissions
+            ],
+        ).body,
+        "moderator_response": lambda: success_response(
+            status_code=200,
+            message="Retrieved",
+            data=[
+                m_schema.ReturnModeratorDataForAdmin.model_validate(m.to_dict())
+                for m in moderators
+            ],
+        ).body,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--case", action="append", help="Only run the given case(s)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="Minimum seconds per timed run"
+    )
+    args = parser.parse_args()
+
+    results = []
+    for size in LIST_SIZES:
+        for name, fn in cases(size).items():
+            if args.case and name not in args.case:
+                continue
+            results.append(
+                {"case": name, "items": size, **measure(fn, min_time=args.min_time)}
+            )
+
+    results.sort(key=lambda row: (row["case"], row["items"]))
+    print_table(
+        results,
+        ["case", "items", "best_us", "median_us", "peak_kib", "retained_kib"],
+    )
+    if args.json:
+        write_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Compares text ids, as stored before the native UUID migration, with the
+UUIDString columns the models now use: the size of the tables and indexes
+holding them and the speed of the joins and lookups on them.
+
+Both databases are in-memory SQLite ones holding the same rows, generated with
+`benchmarks.generate_dataset` into the current schema then copied into a copy
+of it where every UUIDString column is a String. Sizes come from SQLite's
+dbstat table, timings from `benchmarks.harness.measure`. On PostgreSQL, where
+UUIDString is a native 16 byte UUID, compare pg_relation_size of the same
+tables and indexes before and after running the migration.
+
+Run from the project root:
+    python -m benchmarks.bench_uuid_keys [--trivias 20000] [--json results.json]
+"""
+
+import argparse
+
+from sqlalchemy import MetaData, String, create_engine, func, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+
+from api.db.database import Base
+from api.db.types import UUIDString
+from benchmarks.generate_dataset import DatasetGenerator
+from benchmarks.harness import measure, print_table, write_json
+
+TABLES = ["trivias", "trivia_options", "countries_trivias", "submissions"]
+
+LOOKUPS = 100
+
+
+def make_engine() -> Engine:
+    return create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+
+
+def text_copy(source: Engine) -> tuple[Engine, MetaData]:
+    """Copies the schema and rows of `source` into a new database where the
+    UUIDString columns are plain strings"""
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        copy = table.to_metadata(metadata)
+        for column in copy.columns:
+            if isinstance(column.type, UUIDString):
+                column.type = String()
+
+    engine = make_engine()
+    metadata.create_all(engine)
+    with source.connect() as src, engine.begin() as dst:
+        for table in Base.metadata.sorted_tables:
+            rows = [dict(row) for row in src.execute(select(table)).mappings()]
+            if rows:
+                dst.execute(metadata.tables[table.name].insert(), rows)
+
+    return engine, metadata
+
+
+def sizes(engine: Engine) -> dict[str, dict[str, float]]:
+    """Returns the KiB used by each table in TABLES and by its indexes"""
+    with engine.connect() as conn:
+        owners = dict(
+            conn.execute(text("SELECT name, tbl_name FROM sqlite_master")).all()
+        )
+        pages = conn.execute(
+            text("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")
+        ).all()
+
+    result = {table: {"table_kib": 0.0, "index_kib": 0.0} for table in TABLES}
+    for name, size in pages:
+        table = owners.get(name)
+        if table in result:
+            key = "table_kib" if name == table else "index_kib"
+            result[table][key] = round(result[table][key] + size / 1024, 2)
+    return result
+
+
+def cases(engine: Engine, metadata: MetaData) -> dict:
+    """Returns the benchmarked queries against one of the databases"""
+    trivias = metadata.tables["trivias"]
+    options = metadata.tables["trivia_options"]
+    countries = metadata.tables["countries_trivias"]
+    submissions = metadata.tables["submissions"]
+
+    with engine.connect() as conn:
+        ids = conn.scalars(
+            select(trivias.c.id).order_by(func.random()).limit(LOOKUPS)
+        ).all()
+
+    queries = {
+        "options_join": select(trivias.c.id, options.c.content)
+        .join(options, options.c.trivia_id == trivias.c.id)
+        .order_by(trivias.c.id.desc())
+        .limit(1000),
+        "countries_join": select(func.count())
+        .select_from(trivias)
+        .join(countries, countries.c.trivia_id == trivias.c.id)
+        .join(submissions, submissions.c.id == trivias.c.submission_id),
+        "id_lookups": select(trivias.c.id, trivias.c.question).where(
+            trivias.c.id.in_(ids)
+        ),
+    }
+
+    def run(query):
+        with engine.connect() as conn:
+            return conn.execute(query).all()
+
+    return {name: (lambda q=query: run(q)) for name, query in queries.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--trivias", type=int, default=20000, help="Trivias generated (default: 20000)"
+    )
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="Minimum seconds per timed run"
+    )
+    args = parser.parse_args()
+
+    uuid_engine = make_engine()
+    Base.metadata.create_all(uuid_engine)
+    DatasetGenerator(uuid_engine, args.trivias, seed=42, batch_size=5000).run()
+    text_engine, text_metadata = text_copy(uuid_engine)
+
+    variants = {
+        "text": (text_engine, text_metadata),
+        "uuid": (uuid_engine, Base.metadata),
+    }
+
+    size_rows, time_rows = [], []
+    for keys, (engine, metadata) in variants.items():
+        for table, used in sizes(engine).items():
+            size_rows.append({"table": table, "keys": keys, **used})
+        for name, fn in cases(engine, metadata).items():
+            time_rows.append(
+                {"case": name, "keys": keys, **measure(fn, min_time=args.min_time)}
+            )
+
+    size_rows.sort(key=lambda row: (row["table"], row["keys"]))
+    time_rows.sort(key=lambda row: (row["case"], row["keys"]))
+    print_table(size_rows, ["table", "keys", "table_kib", "index_kib"])
+    print()
+    print_table(time_rows, ["case", "keys", "best_us", "median_us", "peak_kib"])
+    if args.json:
+        write_json({"sizes": size_rows, "timings": time_rows}, args.json)
+
+
+if __name__ == "__main__":
+    main()
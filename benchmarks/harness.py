@@ -0,0 +1,73 @@
+"""Helpers shared by the microbenchmarks.
+
+`measure` times a callable the same way for every benchmark: the number of
+calls per run is calibrated so a run lasts at least `min_time`, garbage
+collection is off while timing, and the best and median of `repeat` runs are
+kept. Allocations are measured in a separate, untimed call under tracemalloc
+so tracing doesn't skew the timings.
+"""
+
+import gc
+import json
+import statistics
+import timeit
+import tracemalloc
+from typing import Any, Callable
+
+
+def measure(
+    fn: Callable[[], Any], min_time: float = 0.2, repeat: int = 5
+) -> dict[str, float]:
+    """Measures the time and memory used by one call of `fn`
+
+    Args:
+        fn (Callable): The function to benchmark. Called without arguments
+        min_time (float, optional): Minimum duration of a timed run in seconds
+        repeat (int, optional): Number of timed runs
+
+    Returns:
+        dict: best_us and median_us per call, peak_kib allocated during a call
+        and retained_kib still allocated after it
+    """
+    timer = timeit.Timer(fn)
+
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+
+    runs = [run / number for run in timer.repeat(repeat=repeat, number=number)]
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = fn()
+        after, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "best_us": round(min(runs) * 1e6, 2),
+        "median_us": round(statistics.median(runs) * 1e6, 2),
+        "peak_kib": round((peak - before) / 1024, 2),
+        "retained_kib": round((after - before) / 1024, 2),
+    }
+
+
+def print_table(results: list[dict[str, Any]], columns: list[str]) -> None:
+    """Prints results as an aligned table with the given columns"""
+    widths = [
+        max(len(column), *(len(str(row[column])) for row in results))
+        for column in columns
+    ]
+    print("  ".join(c.rjust(w) for c, w in zip(columns, widths)))
+    for row in results:
+        print("  ".join(str(row[c]).rjust(w) for c, w in zip(columns, widths)))
+
+
+def write_json(results: list[dict[str, Any]], path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
@@ -0,0 +1,289 @@
+"""End-to-end HTTP load benchmark.
+
+Drives the real FastAPI app in process through httpx's ASGI transport (so the
+whole middleware stack, routing, services and serialization are exercised)
+against a database seeded with `benchmarks.generate_dataset`. Every scenario
+runs a fixed number of operations at each concurrency level and the
+throughput and p50/p95/p99 latencies are printed as JSON, which can be saved
+with --output and diffed between commits.
+
+Scenarios:
+    questions             GET /questions with a mix of filters and amount=10
+    create_submission     POST /submissions with a new question each time
+    assigned_submissions  GET /assigned-submissions, random pages of 20, as moderators
+    auth_flow             login -> refresh-access-token -> logout
+
+`create_submission` adds rows to the database.
+
+Run from the project root:
+    python -m benchmarks.generate_dataset --scale 10k --db-url sqlite:///bench.db --create-schema
+    python -m benchmarks.load --db-url sqlite:///bench.db --output before.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import platform
+import random
+import subprocess
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from api.db.database import get_db
+from api.v1.models import Moderator, Trivia
+from api.v1.schemas.african_countries_enum import AfricanCountriesEnum
+from api.v1.schemas.submission import CategoryEnum, DifficultyEnum
+from benchmarks.generate_dataset import MODERATOR_PASSWORD
+from main import app
+
+BASE_URL = "http://testserver/api/v1"
+
+# Filters combined in GET /questions requests
+QUESTION_FILTERS = (
+    (),
+    ("category",),
+    ("category", "difficulty"),
+    ("country",),
+    ("category", "country", "difficulty"),
+)
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest rank percentile of already sorted values"""
+    return sorted_values[max(math.ceil(q * len(sorted_values)) - 1, 0)]
+
+
+class LoadBenchmark:
+    """Holds the client and state shared by the scenarios. Every scenario
+    method performs one operation and returns whether it succeeded"""
+
+    def __init__(self, db_url: str, seed: int):
+        connect_args = {"check_same_thread": False} if db_url.startswith("sqlite") else {}
+        self.engine = create_engine(db_url, connect_args=connect_args)
+        self.session_factory = sessionmaker(
+            autocommit=False, autoflush=False, bind=self.engine
+        )
+        self.rng = random.Random(seed)
+        self.run_id = uuid.uuid4().hex[:8]
+        # Numbers the submitted questions, which must be unique across levels
+        self.submission_numbers = itertools.count()
+        self.transport = httpx.ASGITransport(app=app)
+        self.client = httpx.AsyncClient(transport=self.transport, base_url=BASE_URL)
+
+        def get_bench_db():
+            db = self.session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = get_bench_db
+
+    async def setup(self, moderator_count: int = 8) -> None:
+        """Logs in the moderators used by the authenticated scenarios"""
+        with self.session_factory() as db:
+            self.trivia_count = db.scalar(select(func.count(Trivia.id)))
+            self.emails = db.scalars(
+                select(Moderator.email)
+                .where(Moderator.is_active, Moderator.is_admin.is_(False))
+                .order_by(Moderator.email)
+                .limit(moderator_count)
+            ).all()
+
+        if not self.emails:
+            raise SystemExit("No moderators found. Seed the database first")
+
+        self.tokens = []
+        for email in self.emails:
+            response = await self.client.post(
+                "/auth/login", json={"email": email, "password": MODERATOR_PASSWORD}
+            )
+            response.raise_for_status()
+            self.tokens.append(response.json()["access_token"])
+
+    async def close(self) -> None:
+        await self.client.aclose()
+        app.dependency_overrides.pop(get_db, None)
+        self.engine.dispose()
+
+    async def questions(self, i: int) -> bool:
+        params = {"amount": 10}
+        for name in self.rng.choice(QUESTION_FILTERS):
+            if name == "category":
+                params["category"] = self.rng.choice(list(CategoryEnum)).value
+            elif name == "country":
+                params["country"] = self.rng.choice(list(AfricanCountriesEnum)).value
+            else:
+                params["difficulty"] = self.rng.choice(list(DifficultyEnum)).value
+
+        response = await self.client.get("/questions", params=params)
+        return response.status_code < 400
+
+    async def create_submission(self, i: int) -> bool:
+        response = await self.client.post(
+            "/submissions",
+            json={
+                "question": (
+                    f"Load test {self.run_id}-{next(self.submission_numbers)}: "
+                    "which of these is true?"
+                ),
+                "incorrect_options": ["First", "Second", "Third"],
+                "correct_option": "Fourth",
+                "difficulty": self.rng.choice(list(DifficultyEnum)).value,
+                "category": self.rng.choice(list(CategoryEnum)).value,
+                "countries": [
+                    c.value
+                    for c in self.rng.sample(list(AfricanCountriesEnum), self.rng.randint(0, 2))
+                ],
+            },
+        )
+        return response.status_code < 400
+
+    async def assigned_submissions(self, i: int) -> bool:
+        response = await self.client.get(
+            "/assigned-submissions",
+            params={"page": self.rng.randint(1, 5), "limit": 20},
+            headers={"Authorization": f"Bearer {self.rng.choice(self.tokens)}"},
+        )
+        return response.status_code < 400
+
+    async def auth_flow(self, i: int) -> bool:
+        # A client per flow keeps each session cookie separate
+        async with httpx.AsyncClient(transport=self.transport, base_url=BASE_URL) as client:
+            login = await client.post(
+                "/auth/login",
+                json={"email": self.emails[i % len(self.emails)], "password": MODERATOR_PASSWORD},
+            )
+            if login.status_code >= 400:
+                return False
+
+            refresh = await client.post("/auth/refresh-access-token")
+            logout = await client.post(
+                "/auth/logout",
+                headers={"Authorization": f"Bearer {login.json()['access_token']}"},
+            )
+            return refresh.status_code < 400 and logout.status_code < 400
+
+    async def run_level(self, scenario: str, concurrency: int, operations: int) -> dict:
+        """Runs `operations` operations of a scenario from `concurrency` workers"""
+        operation = getattr(self, scenario)
+        counter = itertools.count()
+        latencies: list[float] = []
+        errors = 0
+
+        async def worker():
+            nonlocal errors
+            while (i := next(counter)) < operations:
+                start = time.perf_counter()
+                ok = await operation(i)
+                latencies.append(time.perf_counter() - start)
+                errors += not ok
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        duration = time.perf_counter() - start
+
+        latencies.sort()
+        return {
+            "operations": operations,
+            "errors": errors,
+            "duration_s": round(duration, 3),
+            "throughput_ops": round(operations / duration, 2),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    bench = LoadBenchmark(args.db_url, args.seed)
+    dialect = bench.engine.dialect.name
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "dialect": dialect,
+            "concurrency": args.concurrency,
+            "operations": args.operations,
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+
+    try:
+        await bench.setup()
+        report["meta"]["trivias"] = bench.trivia_count
+
+        for scenario in args.scenarios:
+            await bench.run_level(scenario, 1, args.warmup)
+            report["results"][scenario] = {}
+            for concurrency in args.concurrency:
+                result = await bench.run_level(scenario, concurrency, args.operations)
+                report["results"][scenario][str(concurrency)] = result
+                print(f"{scenario:<22} c={concurrency:<4} {result}", flush=True)
+    finally:
+        await bench.close()
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db-url", required=True, help="Seeded database to run against")
+    parser.add_argument(
+        "--scenarios", type=lambda v: v.split(","),
+        default=["questions", "create_submission", "assigned_submissions", "auth_flow"],
+        help="Comma separated scenarios (default: all)",
+    )
+    parser.add_argument(
+        "--concurrency", type=lambda v: [int(c) for c in v.split(",")],
+        default=[1, 8, 32], help="Comma separated concurrency levels (default: 1,8,32)",
+    )
+    parser.add_argument(
+        "--operations", type=int, default=200,
+        help="Operations per scenario and concurrency level (default: 200)",
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=10, help="Unmeasured operations per scenario"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument(
+        "--log-requests", action="store_true",
+        help="Keep the app's per request logs (silenced by default)",
+    )
+    args = parser.parse_args()
+
+    if not args.log_requests:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    report = asyncio.run(run(args))
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
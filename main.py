@@ -1,8 +1,9 @@
 import uvicorn
+from contextlib import asynccontextmanager
 from sqlalchemy.exc import IntegrityError
-from fastapi import HTTPException, Request
+from fastapi import Depends, HTTPException, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import (
@@ -10,12 +11,74 @@ from starlette.middleware.sessions import (
 )  # required for refresh token
 
 # from api.utils.logger import logger
-from api.utils.success_response import success_response
+from api.core.middleware import (
+    CompressionMiddleware,
+    CredentialedOriginMiddleware,
+    IdempotencyMiddleware,
+    PrometheusMiddleware,
+    ProfilingMiddleware,
+    ServerTimingMiddleware,
+)
+from api.db.database import engine
+from api.utils.event_loop_monitor import EventLoopMonitor
+from api.utils.idempotency_store import IdempotencyPurger, IdempotencyStore
+from api.utils.metrics import (
+    REGISTRY,
+    SnapshotWriter,
+    clear_multiproc_dir,
+    register_db_pool_metrics,
+)
+from api.utils.request_timing import register_db_timing
+from api.utils.slow_query_log import register_slow_query_log
+from api.utils.success_response import success_response, FastJSONResponse
 from api.v1.routes import api_version_one
 from api.utils.settings import settings
 
 
-app = FastAPI(title="Afrivia API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    snapshot_writer = None
+    loop_monitor = None
+    idempotency_purger = None
+
+    # Share this worker's metrics with the other workers, after dropping the
+    # snapshots of a previous run if no worker of this one has started yet
+    if settings.METRICS_ENABLED and settings.METRICS_MULTIPROC_DIR:
+        clear_multiproc_dir(settings.METRICS_MULTIPROC_DIR)
+        snapshot_writer = SnapshotWriter(
+            REGISTRY, settings.METRICS_MULTIPROC_DIR, settings.METRICS_FLUSH_INTERVAL
+        )
+        snapshot_writer.start()
+
+    if settings.EVENT_LOOP_MONITOR_ENABLED:
+        loop_monitor = EventLoopMonitor(
+            threshold=settings.EVENT_LOOP_BLOCK_THRESHOLD_MS / 1000,
+            interval=settings.EVENT_LOOP_HEARTBEAT_INTERVAL,
+        )
+        loop_monitor.start()
+
+    if settings.IDEMPOTENCY_ENABLED:
+        idempotency_purger = IdempotencyPurger(
+            idempotency_store, app, settings.IDEMPOTENCY_PURGE_INTERVAL
+        )
+        idempotency_purger.start()
+
+    yield
+
+    if idempotency_purger is not None:
+        await idempotency_purger.stop()
+
+    if loop_monitor is not None:
+        await loop_monitor.stop()
+
+    if snapshot_writer is not None:
+        snapshot_writer.stop()
+
+
+app = FastAPI(
+    title="Afrivia API", default_response_class=FastJSONResponse, lifespan=lifespan
+)
 
 https_only = settings.PYTHON_ENV == "prod"
 
@@ -35,24 +98,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+idempotent_routes = [
+    "/api/v1/submissions",
+    "/api/v1/trivias",
+]
+
+# Shared by the workers through the database, reached through get_db
+idempotency_store = IdempotencyStore(
+    ttl=settings.IDEMPOTENCY_KEY_TTL,
+    lock_timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT,
+)
+
+# Added before compression so the stored responses are uncompressed
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(
+        IdempotencyMiddleware, paths=idempotent_routes, store=idempotency_store
+    )
+
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
 routes_with_credentials = [
     "/api/v1/auth/login",
     "/api/v1/auth/register",
     "/api/v1/auth/register-admin",
-    "/api/v1/auth/refresh-token"
-    "/api/v1/auth/logout"
+    "/api/v1/auth/refresh-access-token",
+    "/api/v1/auth/logout",
 ]
 
-# Apply CORS middleware to specific routes
-@app.middleware("http")
-async def cors_middleware(request, call_next):
-    response = await call_next(request)
+# Restrict the allowed origin on routes which set or clear the session cookie
+app.add_middleware(
+    CredentialedOriginMiddleware,
+    paths=routes_with_credentials,
+    allow_origin=settings.APP_URL,
+)
+
+if settings.METRICS_ENABLED:
+    register_db_pool_metrics(engine)
+    app.add_middleware(PrometheusMiddleware)
+
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        profile_dir=settings.PROFILE_DIR,
+        min_interval=settings.PROFILING_MIN_INTERVAL_SECONDS,
+        sample_interval=settings.PROFILING_SAMPLE_INTERVAL,
+    )
 
-    # Check the request path and apply CORS middleware accordingly
-    if request.url.path in routes_with_credentials:
-        response.headers["Access-Control-Allow-Origin"] = settings.APP_URL
+if settings.SLOW_QUERY_LOG_ENABLED:
+    register_slow_query_log(engine)
 
-    return response
+# Added last so the timings cover every other middleware
+if settings.SERVER_TIMING_ENABLED:
+    register_db_timing(engine)
+    app.add_middleware(ServerTimingMiddleware)
 
 
 app.include_router(api_version_one)
@@ -117,6 +221,35 @@ async def get_root(request: Request) -> dict:
     )
 
 
+metrics_allowed_hosts = {
+    host.strip() for host in settings.METRICS_ALLOWED_HOSTS.split(",") if host.strip()
+}
+
+
+def metrics_client_allowed(request: Request) -> None:
+    """Only lets the hosts in METRICS_ALLOWED_HOSTS scrape the metrics"""
+    if request.client is None or request.client.host not in metrics_allowed_hosts:
+        raise HTTPException(
+            status_code=403,
+            detail="You do not have permission to access this resource",
+        )
+
+
+if settings.METRICS_ENABLED:
+
+    @app.get(
+        "/metrics",
+        tags=["Home"],
+        include_in_schema=False,
+        dependencies=[Depends(metrics_client_allowed)],
+    )
+    def get_metrics() -> PlainTextResponse:
+        return PlainTextResponse(
+            REGISTRY.generate_latest(settings.METRICS_MULTIPROC_DIR),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
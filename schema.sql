@@ -11,7 +11,7 @@ CREATE TYPE "submission_status_enum" AS ENUM (
 CREATE TYPE "difficulty_enum" AS ENUM ('easy', 'medium', 'hard');
 
 CREATE TABLE "moderators" (
-  "id" varchar PRIMARY KEY,
+  "id" uuid PRIMARY KEY,
   "avatar_url" varchar,
   "first_name" varchar NOT NULL,
   "last_name" varchar NOT NULL,
@@ -25,7 +25,7 @@ CREATE TABLE "moderators" (
 );
 
 CREATE TABLE "mod_country_preferences" (
-  "moderator_id" varchar NOT NULL,
+  "moderator_id" uuid NOT NULL,
   "country_id" int NOT NULL,
   PRIMARY KEY ("moderator_id", "country_id")
 );
@@ -45,19 +45,20 @@ CREATE TABLE "countries" (
 );
 
 CREATE TABLE "submissions" (
-  "id" varchar PRIMARY KEY,
+  "id" uuid PRIMARY KEY,
   "question" text UNIQUE NOT NULL,
   "status" submission_status_enum NOT NULL DEFAULT 'pending',
-  "moderator_id" varchar,
+  "moderator_id" uuid,
   "difficulty" difficulty_enum NOT NULL,
+  "category_id" int,
   "submission_note" text,
   "created_at" timestamptz DEFAULT (now()),
   "updated_at" timestamptz DEFAULT (now())
 );
 
 CREATE TABLE "submission_options" (
-  "id" varchar PRIMARY KEY NOT NULL,
-  "submission_id" varchar NOT NULL,
+  "id" uuid PRIMARY KEY NOT NULL,
+  "submission_id" uuid NOT NULL,
   "content" text NOT NULL,
   "is_correct" bool NOT NULL DEFAULT false,
   "created_at" timestamptz DEFAULT (now()),
@@ -65,47 +66,47 @@ CREATE TABLE "submission_options" (
 );
 
 CREATE TABLE "trivias" (
-  "id" varchar PRIMARY KEY NOT NULL,
+  "id" uuid PRIMARY KEY NOT NULL,
   "question" text UNIQUE NOT NULL,
   "difficulty" difficulty_enum NOT NULL,
-  "submission_id" varchar,
+  "category_id" int,
+  "submission_id" uuid,
   "created_at" timestamptz DEFAULT (now()),
   "updated_at" timestamptz DEFAULT (now())
 );
 
 CREATE TABLE "trivia_options" (
-  "id" varchar PRIMARY KEY NOT NULL,
-  "trivia_id" varchar NOT NULL,
+  "id" uuid PRIMARY KEY NOT NULL,
+  "trivia_id" uuid NOT NULL,
   "content" text NOT NULL,
   "is_correct" bool NOT NULL DEFAULT false,
   "created_at" timestamptz DEFAULT (now()),
   "updated_at" timestamptz DEFAULT (now())
 );
 
-CREATE TABLE "categories_trivias" (
-  "category_id" int NOT NULL,
-  "trivia_id" varchar NOT NULL,
-  PRIMARY KEY ("category_id", "trivia_id")
-);
-
 CREATE TABLE "countries_trivias" (
   "country_id" int NOT NULL,
-  "trivia_id" varchar NOT NULL,
+  "trivia_id" uuid NOT NULL,
   PRIMARY KEY ("country_id", "trivia_id")
 );
 
-CREATE TABLE "categories_submissions" (
-  "category_id" int NOT NULL,
-  "submission_id" varchar NOT NULL,
-  PRIMARY KEY ("category_id", "submission_id")
-);
-
 CREATE TABLE "countries_submissions" (
   "country_id" int NOT NULL,
-  "submission_id" varchar NOT NULL,
+  "submission_id" uuid NOT NULL,
   PRIMARY KEY ("country_id", "submission_id")
 );
 
+CREATE TABLE "idempotency_keys" (
+  "key" varchar(64) PRIMARY KEY,
+  "fingerprint" varchar(64) NOT NULL,
+  "status_code" int,
+  "headers" json,
+  "body" bytea,
+  "created_at" timestamptz NOT NULL
+);
+
+CREATE INDEX "ix_idempotency_keys_created_at" ON "idempotency_keys" ("created_at");
+
 COMMENT ON TABLE "moderators" IS 'This table keeps a record of all mods for the api. A mod can be an admin.';
 
 COMMENT ON TABLE "mod_country_preferences" IS 'This table links moderators to their preferred country[ies]';
@@ -122,6 +123,8 @@ COMMENT ON TABLE "trivias" IS 'This table holds all questions in the trivia db';
 
 COMMENT ON TABLE "trivia_options" IS 'This table holds all options in the trivia db';
 
+COMMENT ON TABLE "idempotency_keys" IS 'This holds the responses to POST requests made with an Idempotency-Key';
+
 ALTER TABLE
   "mod_country_preferences"
 ADD
@@ -143,22 +146,22 @@ ADD
   FOREIGN KEY ("submission_id") REFERENCES "submissions" ("id") ON DELETE CASCADE;
 
 ALTER TABLE
-  "trivias"
+  "submissions"
 ADD
-  FOREIGN KEY ("submission_id") REFERENCES "submissions" ("id");
+  FOREIGN KEY ("category_id") REFERENCES "categories" ("id");
 
 ALTER TABLE
-  "trivia_options"
+  "trivias"
 ADD
-  FOREIGN KEY ("trivia_id") REFERENCES "trivias" ("id") ON DELETE CASCADE;
+  FOREIGN KEY ("category_id") REFERENCES "categories" ("id");
 
 ALTER TABLE
-  "categories_trivias"
+  "trivias"
 ADD
-  FOREIGN KEY ("category_id") REFERENCES "categories" ("id");
+  FOREIGN KEY ("submission_id") REFERENCES "submissions" ("id");
 
 ALTER TABLE
-  "categories_trivias"
+  "trivia_options"
 ADD
   FOREIGN KEY ("trivia_id") REFERENCES "trivias" ("id") ON DELETE CASCADE;
 
@@ -172,16 +175,6 @@ ALTER TABLE
 ADD
   FOREIGN KEY ("trivia_id") REFERENCES "trivias" ("id") ON DELETE CASCADE;
 
-ALTER TABLE
-  "categories_submissions"
-ADD
-  FOREIGN KEY ("category_id") REFERENCES "categories" ("id");
-
-ALTER TABLE
-  "categories_submissions"
-ADD
-  FOREIGN KEY ("submission_id") REFERENCES "submissions" ("id") ON DELETE CASCADE;
-
 ALTER TABLE
   "countries_submissions"
 ADD
@@ -0,0 +1,117 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from api.core.middleware import CompressionMiddleware
+from api.core.middleware import compression
+
+LARGE_BODY = "afrivia " * 500
+SMALL_BODY = "afrivia"
+
+compressed_app = FastAPI()
+compressed_app.add_middleware(CompressionMiddleware, minimum_size=1000)
+
+
+@compressed_app.get("/large")
+async def large():
+    return PlainTextResponse(LARGE_BODY)
+
+
+@compressed_app.get("/small")
+async def small():
+    return PlainTextResponse(SMALL_BODY)
+
+
+@compressed_app.get("/stream")
+async def stream():
+    async def chunks():
+        for _ in range(3):
+            yield LARGE_BODY
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+@compressed_app.get("/binary")
+async def binary():
+    return PlainTextResponse(LARGE_BODY, media_type="image/png")
+
+
+@pytest.fixture
+def client():
+    client = TestClient(compressed_app)
+    yield client
+
+
+class TestCompressionMiddleware:
+
+    def test_large_response_is_gzipped(self, client: TestClient):
+        """Test to verify responses above the threshold are compressed."""
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(LARGE_BODY)
+        assert response.text == LARGE_BODY
+
+    def test_small_response_is_not_compressed(self, client: TestClient):
+        """Test to verify responses below the threshold are sent as is."""
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.text == SMALL_BODY
+
+    def test_response_not_compressed_without_accept_encoding(self, client: TestClient):
+        """Test to verify clients which don't accept gzip get identity responses."""
+        response = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert response.text == LARGE_BODY
+
+    def test_response_not_compressed_when_gzip_refused(self, client: TestClient):
+        """Test to verify a q=0 encoding is never used."""
+        response = client.get("/large", headers={"Accept-Encoding": "gzip;q=0, *"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_streaming_response_is_not_compressed(self, client: TestClient):
+        """Test to verify streamed responses are passed through."""
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.text == LARGE_BODY * 3
+
+    def test_binary_response_is_not_compressed(self, client: TestClient):
+        """Test to verify non textual content types are passed through."""
+        response = client.get("/binary", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_choose_encoding(self, mocker):
+        """Test to verify the client's q-values rank the encodings and brotli
+        is preferred on ties, only when available."""
+        choose = CompressionMiddleware.choose_encoding
+
+        mocker.patch.object(compression, "brotli", None)
+        assert choose("gzip, deflate, br") == "gzip"
+        assert choose("br") is None
+        assert choose("*") == "gzip"
+
+        mocker.patch.object(compression, "brotli", object())
+        assert choose("gzip, deflate, br") == "br"
+        assert choose("gzip, br;q=0") == "gzip"
+        assert choose("br;q=0.1, gzip") == "gzip"
+        assert choose("gzip;q=0.5, br;q=0.8") == "br"
+        assert choose("gzip;q=0.5, *;q=0.8") == "br"
+        assert choose("gzip;q=0.5, br;q=0.5") == "br"
+        assert choose("gzip;q=0, br;q=0") is None
+        assert choose("") is None
+
+    def test_compress_gzip(self):
+        """Test to verify gzip output round trips."""
+        middleware = CompressionMiddleware(compressed_app, gzip_level=9)
+
+        assert gzip.decompress(middleware.compress(b"afrivia", "gzip")) == b"afrivia"
@@ -0,0 +1,45 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from api.utils.settings import settings
+from main import app, routes_with_credentials
+
+ORIGIN = "https://some-other-site.com"
+
+
+@pytest.fixture
+def client():
+    client = TestClient(app)
+    yield client
+
+
+class TestCredentialedOriginMiddleware:
+
+    def test_routes_with_credentials(self):
+        """Test to verify every auth route which touches the session is listed once."""
+        assert len(routes_with_credentials) == len(set(routes_with_credentials)) == 5
+        assert "/api/v1/auth/refresh-access-token" in routes_with_credentials
+        assert "/api/v1/auth/logout" in routes_with_credentials
+
+    @pytest.mark.parametrize("path", routes_with_credentials)
+    def test_auth_route_origin_is_app_url(self, client: TestClient, path: str):
+        """Test to verify auth routes only allow the app's origin."""
+        response = client.post(path, json={}, headers={"Origin": ORIGIN})
+
+        assert response.headers["access-control-allow-origin"] == settings.APP_URL
+
+    def test_auth_route_preflight_origin_is_app_url(self, client: TestClient):
+        """Test to verify preflight requests to auth routes only allow the app's origin."""
+        response = client.options(
+            "/api/v1/auth/login",
+            headers={"Origin": ORIGIN, "Access-Control-Request-Method": "POST"},
+        )
+
+        assert response.headers["access-control-allow-origin"] == settings.APP_URL
+
+    def test_other_routes_are_untouched(self, client: TestClient):
+        """Test to verify other routes keep the default CORS behaviour."""
+        response = client.get("/api/v1/submissions/countries", headers={"Origin": ORIGIN})
+
+        assert response.status_code == 200
+        assert response.headers["access-control-allow-origin"] in ("*", ORIGIN)
@@ -0,0 +1,303 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.core.middleware import IdempotencyMiddleware
+from api.db.database import Base, get_db
+from api.utils.idempotency_store import (
+    IdempotencyPurger,
+    IdempotencyStore,
+    StoredResponse,
+)
+from api.v1.models import IdempotencyKey
+from api.v1.services.submission import submission_service
+from main import app
+
+store = IdempotencyStore(ttl=60, lock_timeout=10)
+calls = []
+
+KEY = "01920000-0000-7000-8000-0000000000cd"
+
+idempotent_app = FastAPI()
+idempotent_app.add_middleware(IdempotencyMiddleware, paths=["/items"], store=store)
+
+
+@idempotent_app.exception_handler(HTTPException)
+async def http_exception(request: Request, exc: HTTPException):
+    return JSONResponse(status_code=exc.status_code, content={"message": exc.detail})
+
+
+@idempotent_app.post("/items", status_code=201)
+async def create_item(item: dict):
+    calls.append(item)
+    if item.get("fail"):
+        raise HTTPException(status_code=400, detail="Rejected")
+    return {"id": len(calls), **item}
+
+
+@idempotent_app.post("/other")
+async def other(item: dict):
+    calls.append(item)
+    return {"id": len(calls)}
+
+
+def make_session_factory() -> sessionmaker:
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def override_get_db(session_factory: sessionmaker):
+    def get_test_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    return get_test_db
+
+
+@pytest.fixture
+def session_factory():
+    session_factory = make_session_factory()
+    yield session_factory
+    session_factory.kw["bind"].dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    with session_factory() as db:
+        yield db
+
+
+@pytest.fixture
+def client(session_factory):
+    calls.clear()
+    idempotent_app.dependency_overrides[get_db] = override_get_db(session_factory)
+    yield TestClient(idempotent_app)
+    idempotent_app.dependency_overrides = {}
+
+
+def post(client: TestClient, path: str, body: dict, key: str | None = KEY, **headers):
+    if key is not None:
+        headers["Idempotency-Key"] = key
+    return client.post(path, json=body, headers=headers)
+
+
+class TestIdempotencyMiddleware:
+
+    def test_repeat_is_replayed(self, client: TestClient):
+        """Test to verify a repeated request gets the stored response without reaching the route."""
+        first = post(client, "/items", {"name": "a"})
+        second = post(client, "/items", {"name": "a"})
+
+        assert first.status_code == second.status_code == 201
+        assert first.json() == second.json() == {"id": 1, "name": "a"}
+        assert "idempotent-replayed" not in first.headers
+        assert second.headers["idempotent-replayed"] == "true"
+        assert len(calls) == 1
+
+    def test_key_reused_with_another_body(self, client: TestClient):
+        """Test to verify a key can't be reused for a different request."""
+        post(client, "/items", {"name": "a"})
+        response = post(client, "/items", {"name": "b"})
+
+        assert response.status_code == 422
+        assert len(calls) == 1
+
+    def test_failed_response_is_not_stored(self, client: TestClient):
+        """Test to verify a request which failed can be retried with the same key."""
+        assert post(client, "/items", {"fail": True}).status_code == 400
+        assert post(client, "/items", {"fail": True}).status_code == 400
+        assert len(calls) == 2
+
+    def test_keys_are_scoped_by_caller(self, client: TestClient):
+        """Test to verify callers with different credentials don't share keys."""
+        post(client, "/items", {"name": "a"}, Authorization="Bearer one")
+        response = post(client, "/items", {"name": "a"}, Authorization="Bearer two")
+
+        assert "idempotent-replayed" not in response.headers
+        assert len(calls) == 2
+
+    @pytest.mark.parametrize("key, path", [(None, "/items"), (KEY, "/other")])
+    def test_other_requests_are_untouched(self, client: TestClient, key, path):
+        """Test to verify requests without a key or to other paths always reach the route."""
+        post(client, path, {"name": "a"}, key)
+        response = post(client, path, {"name": "a"}, key)
+
+        assert "idempotent-replayed" not in response.headers
+        assert len(calls) == 2
+
+    @pytest.mark.parametrize("key", ["", "key-1", f"{KEY}0"])
+    def test_invalid_key(self, client: TestClient, key):
+        """Test to verify keys which aren't UUIDs are rejected."""
+        response = post(client, "/items", {"name": "a"}, key)
+
+        assert response.status_code == 400
+        assert calls == []
+
+    def test_anonymous_keys_are_scoped_by_client_address(self):
+        """Test to verify anonymous callers sharing a key don't share its response."""
+        scoped_key = IdempotencyMiddleware.scoped_key
+
+        assert scoped_key("/items", "", "10.0.0.1", KEY) != scoped_key(
+            "/items", "", "10.0.0.2", KEY
+        )
+        assert scoped_key("/items", "Bearer one", "10.0.0.1", KEY) == scoped_key(
+            "/items", "Bearer one", "10.0.0.2", KEY.upper()
+        )
+
+    def test_request_in_flight(self, client: TestClient, db):
+        """Test to verify a repeat of a request still being handled gets a 409."""
+        # Reserved by another worker, still handling the first request
+        key = IdempotencyMiddleware.scoped_key("/items", "", "testclient", KEY)
+        store.reserve(db, key, hashlib.sha256(b'{"name": "a"}').hexdigest())
+
+        headers = {"Idempotency-Key": KEY, "Content-Type": "application/json"}
+        response = client.post("/items", content=b'{"name": "a"}', headers=headers)
+        assert response.status_code == 409
+        response = client.post("/items", content=b'{"name": "b"}', headers=headers)
+        assert response.status_code == 422
+        assert calls == []
+
+
+class TestIdempotencyStore:
+
+    @staticmethod
+    def response(fingerprint: str = "body") -> StoredResponse:
+        return StoredResponse(
+            fingerprint=fingerprint,
+            status=201,
+            headers=[(b"content-type", b"application/json")],
+            body=b"{}",
+        )
+
+    def test_reserved_key_is_shared_by_stores(self, session_factory):
+        """Test to verify a key reserved by one worker's store is seen by another's."""
+        other_store = IdempotencyStore(ttl=60, lock_timeout=10)
+        db, other_db = session_factory(), session_factory()
+
+        assert store.reserve(db, "key", "body")[0] == IdempotencyStore.NEW
+        assert other_store.reserve(other_db, "key", "body")[0] == IdempotencyStore.IN_FLIGHT
+        assert (
+            other_store.reserve(other_db, "key", "other body")[0]
+            == IdempotencyStore.MISMATCH
+        )
+
+        store.complete(db, "key", self.response())
+        assert other_store.reserve(other_db, "key", "body") == (
+            IdempotencyStore.REPLAY,
+            self.response(),
+        )
+        db.close()
+        other_db.close()
+
+    def test_released_key_can_be_retried(self, db):
+        """Test to verify a key released after a failure can be reserved again."""
+        store.reserve(db, "key", "body")
+        store.release(db, "key")
+
+        assert store.reserve(db, "key", "body")[0] == IdempotencyStore.NEW
+
+    def test_expired_keys(self, db, mocker):
+        """Test to verify responses expire after ttl and reservations after lock_timeout."""
+        now = datetime(2026, 10, 19, tzinfo=timezone.utc)
+        clock = mocker.patch.object(IdempotencyStore, "_now", return_value=now)
+
+        store.reserve(db, "stored", "body")
+        store.complete(db, "stored", self.response())
+        store.reserve(db, "abandoned", "body")
+
+        clock.return_value = now + timedelta(seconds=11)
+        assert store.reserve(db, "abandoned", "other body")[0] == IdempotencyStore.NEW
+        assert store.reserve(db, "stored", "other body")[0] == IdempotencyStore.MISMATCH
+
+        clock.return_value = now + timedelta(seconds=61)
+        assert store.reserve(db, "stored", "other body")[0] == IdempotencyStore.NEW
+
+    def test_expired_rows_are_purged(self, db, mocker):
+        """Test to verify purge_expired deletes expired responses and abandoned reservations."""
+        now = datetime(2026, 10, 19, tzinfo=timezone.utc)
+        clock = mocker.patch.object(IdempotencyStore, "_now", return_value=now)
+        store.reserve(db, "old", "body")
+        store.complete(db, "old", self.response())
+        store.reserve(db, "abandoned", "body")
+
+        clock.return_value = now + timedelta(seconds=30)
+        store.reserve(db, "new", "body")
+        store.complete(db, "new", self.response())
+        clock.return_value = now + timedelta(seconds=55)
+        store.reserve(db, "in flight", "body")
+
+        clock.return_value = now + timedelta(seconds=61)
+        assert store.purge_expired(db) == 2
+        assert sorted(db.scalars(select(IdempotencyKey.key)).all()) == sorted(
+            [IdempotencyStore._row_key("new"), IdempotencyStore._row_key("in flight")]
+        )
+
+    def test_purger_uses_the_app_sessions(self, session_factory, db, mocker):
+        """Test to verify the background purge runs on the app's get_db override."""
+        now = datetime(2026, 10, 19, tzinfo=timezone.utc)
+        clock = mocker.patch.object(IdempotencyStore, "_now", return_value=now)
+        store.reserve(db, "old", "body")
+        store.complete(db, "old", self.response())
+        clock.return_value = now + timedelta(seconds=61)
+
+        purge_app = FastAPI()
+        purge_app.dependency_overrides[get_db] = override_get_db(session_factory)
+
+        assert IdempotencyPurger(store, purge_app, interval=60).purge() == 1
+        assert db.scalars(select(IdempotencyKey.key)).all() == []
+
+
+def test_submission_retry_does_not_reach_the_service(session_factory, mocker):
+    """Test to verify POST /submissions is idempotent with a key, its keys
+    being stored through the overridden get_db."""
+    app.dependency_overrides[get_db] = override_get_db(session_factory)
+    mock_create = mocker.patch.object(
+        submission_service,
+        "create",
+        return_value={
+            "id": "01920000-0000-7000-8000-000000000000",
+            "status": "pending",
+            "moderator_id": "01920000-0000-7000-8000-0000000000ab",
+            "created_at": "2026-10-19T12:00:00+00:00",
+            "question": "Who is the current president of Algeria?",
+            "incorrect_options": ["Lil Wayne", "George Bush", "Barack Obama"],
+            "correct_option": "Abdelmadjid Tebboune",
+            "difficulty": "easy",
+            "category": "General-Knowledge",
+            "countries": ["Algeria"],
+        },
+    )
+    client = TestClient(app)
+    body = {
+        "question": "Who is the current president of Algeria?",
+        "incorrect_options": ["Lil Wayne", "George Bush", "Barack Obama"],
+        "correct_option": "Abdelmadjid Tebboune",
+        "difficulty": "easy",
+        "category": "General-Knowledge",
+        "countries": ["Algeria"],
+    }
+    headers = {"Idempotency-Key": "01920000-0000-7000-8000-0000000000cd"}
+
+    first = client.post("/api/v1/submissions", json=body, headers=headers)
+    second = client.post("/api/v1/submissions", json=body, headers=headers)
+
+    assert first.status_code == second.status_code == 201
+    assert first.json() == second.json()
+    assert second.headers["idempotent-replayed"] == "true"
+    mock_create.assert_called_once()
+    with session_factory() as db:
+        assert db.scalar(select(func.count()).select_from(IdempotencyKey)) == 1
+    app.dependency_overrides = {}
@@ -0,0 +1,162 @@
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.utils.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    clear_multiproc_dir,
+)
+from main import app
+
+
+@pytest.fixture
+def client():
+    client = TestClient(app)
+    yield client
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def write_process_snapshot(directory, pid: int, registry: MetricsRegistry):
+    with open(os.path.join(directory, f"metrics_{pid}.json"), "w") as f:
+        json.dump({"pid": pid, "metrics": registry.snapshot()}, f)
+
+
+class TestMetricsRegistry:
+
+    def test_render_counter_and_gauge(self, registry: MetricsRegistry):
+        """Test to verify counters and gauges are rendered in the text format."""
+        counter = Counter("jobs_total", "Jobs run", ["kind"], registry=registry)
+        gauge = Gauge("queue_depth", "Jobs waiting", registry=registry)
+        counter.inc(kind="email")
+        counter.inc(2, kind="email")
+        gauge.set(4)
+
+        output = registry.render(registry.snapshot())
+
+        assert "# TYPE jobs_total counter" in output
+        assert 'jobs_total{kind="email"} 3.0' in output
+        assert "queue_depth 4.0" in output
+
+    def test_render_histogram(self, registry: MetricsRegistry):
+        """Test to verify histogram buckets are cumulative."""
+        histogram = Histogram(
+            "latency_seconds", "Latency", ["route"], buckets=[0.1, 1], registry=registry
+        )
+        histogram.observe(0.05, route="/a")
+        histogram.observe(0.5, route="/a")
+        histogram.observe(5, route="/a")
+
+        output = registry.render(registry.snapshot())
+
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in output
+        assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in output
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in output
+        assert 'latency_seconds_count{route="/a"} 3' in output
+
+    def test_label_values_are_escaped(self, registry: MetricsRegistry):
+        """Test to verify label values can't break the text format."""
+        counter = Counter("odd_total", "Odd labels", ["value"], registry=registry)
+        counter.inc(value='a"b\\c')
+
+        assert 'odd_total{value="a\\"b\\\\c"} 1.0' in registry.render(
+            registry.snapshot()
+        )
+
+    def test_wrong_labels_are_rejected(self, registry: MetricsRegistry):
+        """Test to verify labels must match the declared label names."""
+        counter = Counter("strict_total", "Strict", ["kind"], registry=registry)
+
+        with pytest.raises(ValueError):
+            counter.inc(other="x")
+
+    def test_merge_snapshots_across_processes(self, tmp_path, mocker):
+        """Test to verify counters and histograms are summed over every worker,
+        while gauges of workers which have exited are dropped."""
+        worker = MetricsRegistry()
+        counter = Counter("jobs_total", "Jobs run", registry=worker)
+        gauge = Gauge("in_flight", "In flight", registry=worker)
+        histogram = Histogram("latency", "Latency", buckets=[1], registry=worker)
+        counter.inc(2)
+        gauge.set(3)
+        histogram.observe(0.5)
+
+        write_process_snapshot(tmp_path, 1001, worker)
+        write_process_snapshot(tmp_path, 1002, worker)
+        write_process_snapshot(tmp_path, 1003, worker)
+
+        mocker.patch(
+            "api.utils.metrics._process_is_alive", side_effect=lambda pid: pid != 1003
+        )
+        merged = MetricsRegistry.merge_snapshots(str(tmp_path))
+
+        assert merged["jobs_total"]["samples"]["[]"] == 6
+        assert merged["in_flight"]["samples"]["[]"] == 6
+        assert merged["latency"]["samples"]["[]"] == {
+            "buckets": [3],
+            "sum": 1.5,
+            "count": 3,
+        }
+
+    def test_generate_latest_with_multiproc_dir(self, tmp_path, registry):
+        """Test to verify a scrape includes this process' own snapshot."""
+        Counter("jobs_total", "Jobs run", registry=registry).inc()
+
+        output = registry.generate_latest(str(tmp_path))
+
+        assert "jobs_total 1.0" in output
+        assert os.path.exists(tmp_path / f"metrics_{os.getpid()}.json")
+
+    def test_clear_multiproc_dir_drops_a_previous_run(self, tmp_path, registry, mocker):
+        """Test to verify snapshots are only cleared when all their writers have exited."""
+        write_process_snapshot(tmp_path, 1001, registry)
+        write_process_snapshot(tmp_path, 1002, registry)
+        is_alive = mocker.patch(
+            "api.utils.metrics._process_is_alive", side_effect=lambda pid: pid == 1002
+        )
+
+        # A sibling worker is already writing: its snapshots belong to this run
+        assert clear_multiproc_dir(str(tmp_path)) is False
+        assert len(os.listdir(tmp_path)) == 2
+
+        is_alive.side_effect = lambda pid: False
+        assert clear_multiproc_dir(str(tmp_path)) is True
+        assert os.listdir(tmp_path) == []
+
+
+class TestMetricsEndpoint:
+
+    def test_metrics_use_route_templates(self, client: TestClient, mocker):
+        """Test to verify requests are labelled by route template and status."""
+        mocker.patch("main.metrics_allowed_hosts", {"testclient"})
+        client.get("/api/v1/assigned-submissions/some-id")
+        client.get("/api/v1/this-does-not-exist")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert (
+            'http_requests_total{method="GET",'
+            'route="/api/v1/assigned-submissions/{id}",status="401"}' in response.text
+        )
+        assert 'route="<unmatched>",status="404"' in response.text
+        assert "some-id" not in response.text
+        assert "# TYPE http_request_duration_seconds histogram" in response.text
+        assert "# TYPE http_requests_in_flight gauge" in response.text
+        assert "# TYPE db_pool_checked_out gauge" in response.text
+
+    def test_metrics_are_restricted_to_allowed_hosts(self, client: TestClient):
+        """Test to verify clients outside METRICS_ALLOWED_HOSTS can't scrape the metrics."""
+        response = client.get("/metrics")
+
+        assert response.status_code == 403
+        assert "http_requests_total" not in response.text
@@ -0,0 +1,161 @@
+import os
+import sys
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from api.core.middleware import ProfilingMiddleware
+from api.utils.profiler import sample_stack
+from api.utils.slow_query_log import redact_parameters
+from api.utils.success_response import success_response
+from api.v1.services.moderator import mod_service
+
+ADMIN_HEADERS = {"X-Profile": "1", "Authorization": "Bearer admin-token"}
+MOD_ID = "01920000-0000-7000-8000-0000000000ab"
+
+
+def create_profiled_app(profile_dir, min_interval=60):
+    profiled_app = FastAPI()
+    profiled_app.add_middleware(
+        ProfilingMiddleware,
+        profile_dir=str(profile_dir),
+        min_interval=min_interval,
+        sample_interval=0.001,
+    )
+
+    @profiled_app.get("/slow")
+    def slow_route():
+        # Keep application code on the stack long enough to be sampled
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            redact_parameters({"email": "a@b.com", "ids": [1, 2, 3]})
+        return success_response(status_code=200, message="Done")
+
+    return profiled_app
+
+
+@pytest.fixture
+def token(mocker):
+    return mocker.patch.object(mod_service, "verify_access_token", return_value=MOD_ID)
+
+
+@pytest.fixture
+def admin(mocker, token):
+    """The admin lookup, the only step of the check which queries the database"""
+    return mocker.patch.object(
+        mod_service, "fetch", return_value=MagicMock(is_admin=True)
+    )
+
+
+class TestProfilingMiddleware:
+
+    def test_requests_without_header_are_not_profiled(self, tmp_path, admin):
+        client = TestClient(create_profiled_app(tmp_path))
+        response = client.get("/slow")
+
+        assert response.status_code == 200
+        assert "X-Profile-Status" not in response.headers
+        admin.assert_not_called()
+        assert os.listdir(tmp_path) == []
+
+    def test_non_admins_are_not_profiled(self, tmp_path, admin):
+        admin.return_value = MagicMock(is_admin=False)
+
+        client = TestClient(create_profiled_app(tmp_path))
+        response = client.get("/slow", headers=ADMIN_HEADERS)
+
+        assert response.status_code == 200
+        assert response.headers["X-Profile-Status"] == "forbidden"
+        assert "X-Profile-Id" not in response.headers
+        assert os.listdir(tmp_path) == []
+
+    def test_missing_token_is_not_profiled(self, tmp_path, admin):
+        client = TestClient(create_profiled_app(tmp_path))
+        response = client.get("/slow", headers={"X-Profile": "1"})
+
+        assert response.headers["X-Profile-Status"] == "forbidden"
+        admin.assert_not_called()
+
+    def test_invalid_token_is_not_looked_up(self, tmp_path, token, admin):
+        token.side_effect = HTTPException(status_code=401)
+
+        client = TestClient(create_profiled_app(tmp_path))
+        response = client.get("/slow", headers=ADMIN_HEADERS)
+
+        assert response.headers["X-Profile-Status"] == "forbidden"
+        admin.assert_not_called()
+
+    def test_admin_request_is_profiled(self, tmp_path, token, admin):
+        client = TestClient(create_profiled_app(tmp_path))
+        response = client.get("/slow", headers=ADMIN_HEADERS)
+
+        assert response.status_code == 200
+        assert response.headers["X-Profile-Status"] == "captured"
+
+        profile_id = response.headers["X-Profile-Id"]
+        assert token.call_args.args[0] == "admin-token"
+        assert admin.call_args.args[1] == MOD_ID
+
+        with open(tmp_path / f"{profile_id}.txt") as f:
+            report = f.read()
+        with open(tmp_path / f"{profile_id}.folded") as f:
+            folded = f.read()
+
+        assert "GET /slow -> 200" in report
+        assert "utils" in report
+        assert "api.utils.slow_query_log:redact_parameters" in report
+        assert "api.utils.slow_query_log:redact_parameters" in folded
+
+    def test_profiles_are_rate_limited(self, tmp_path, admin):
+        client = TestClient(create_profiled_app(tmp_path))
+
+        first = client.get("/slow", headers=ADMIN_HEADERS)
+        second = client.get("/slow", headers=ADMIN_HEADERS)
+
+        assert first.headers["X-Profile-Status"] == "captured"
+        assert second.status_code == 200
+        assert second.headers["X-Profile-Status"] == "rate-limited"
+        assert "X-Profile-Id" not in second.headers
+        assert len(os.listdir(tmp_path)) == 2
+        # The rate limit is checked before the admin is looked up
+        assert admin.call_count == 1
+
+    def test_admin_check_uses_get_current_admin(self, tmp_path, mocker, token):
+        get_current_admin = mocker.patch.object(
+            mod_service,
+            "get_current_admin",
+            side_effect=HTTPException(status_code=403),
+        )
+
+        client = TestClient(create_profiled_app(tmp_path))
+        response = client.get("/slow", headers=ADMIN_HEADERS)
+
+        assert response.headers["X-Profile-Status"] == "forbidden"
+        credentials = get_current_admin.call_args.kwargs["credentials"]
+        assert credentials.credentials == "admin-token"
+
+    def test_missing_moderator_is_not_profiled(self, tmp_path, admin):
+        admin.return_value = None
+
+        client = TestClient(create_profiled_app(tmp_path))
+        response = client.get("/slow", headers=ADMIN_HEADERS)
+
+        assert response.status_code == 200
+        assert response.headers["X-Profile-Status"] == "forbidden"
+
+    def test_non_admins_do_not_use_up_the_rate_limit(self, tmp_path, admin):
+        client = TestClient(create_profiled_app(tmp_path))
+
+        admin.return_value = MagicMock(is_admin=False)
+        first = client.get("/slow", headers=ADMIN_HEADERS)
+        admin.return_value = MagicMock(is_admin=True)
+        second = client.get("/slow", headers=ADMIN_HEADERS)
+
+        assert first.headers["X-Profile-Status"] == "forbidden"
+        assert second.headers["X-Profile-Status"] == "captured"
+
+    def test_stacks_outside_application_code_are_dropped(self):
+        assert sample_stack(sys._getframe()) is None
@@ -0,0 +1,80 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from api.core.middleware import ServerTimingMiddleware
+from api.utils.request_timing import (
+    current_request_timings,
+    end_request_timings,
+    register_db_timing,
+    start_request_timings,
+)
+from api.utils.success_response import success_response
+from main import app
+
+sqlite_engine = create_engine("sqlite://")
+register_db_timing(sqlite_engine)
+
+timed_app = FastAPI()
+timed_app.add_middleware(ServerTimingMiddleware)
+
+
+@timed_app.get("/queries")
+def run_queries():
+    with sqlite_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("SELECT 2"))
+    return success_response(status_code=200, message="Ran queries", data=[1, 2])
+
+
+@pytest.fixture
+def client():
+    client = TestClient(timed_app)
+    yield client
+
+
+class TestServerTimingMiddleware:
+
+    def test_server_timing_header(self, client: TestClient):
+        """Test to verify the Server-Timing header reports every phase."""
+        response = client.get("/queries")
+
+        assert response.status_code == 200
+        server_timing = response.headers["server-timing"]
+        metrics = [m.strip().split(";")[0] for m in server_timing.split(",")]
+        assert metrics == ["total", "db", "serialize"]
+        assert 'desc="2 queries"' in server_timing
+
+    def test_server_timing_is_logged(self, client: TestClient, caplog):
+        """Test to verify request timings are written to the log."""
+        with caplog.at_level(logging.INFO):
+            client.get("/queries")
+
+        record = [r for r in caplog.records if hasattr(r, "request_timing")][-1]
+        assert record.request_timing["path"] == "/queries"
+        assert record.request_timing["status"] == 200
+        assert record.request_timing["db_queries"] == 2
+        assert "db_queries=2" in record.getMessage()
+
+    def test_main_app_sends_server_timing(self):
+        """Test to verify the middleware is installed on the app."""
+        response = TestClient(app).get("/api/v1/submissions/countries")
+
+        assert response.headers["server-timing"].startswith("total;dur=")
+
+    def test_queries_outside_requests_are_ignored(self):
+        """Test to verify statements run outside a request are not attributed to one."""
+        assert current_request_timings() is None
+        with sqlite_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        timings, token = start_request_timings()
+        with sqlite_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        end_request_timings(token)
+
+        assert timings.db_queries == 1
+        assert current_request_timings() is None
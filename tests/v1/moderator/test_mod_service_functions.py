@@ -11,6 +11,9 @@ from fastapi.security import HTTPAuthorizationCredentials
 
 import pytest
 
+MOD_ID = "01920000-0000-7000-8000-000000000001"
+
+
 class TestModeratorService:
 
     # Creating a new moderator with valid data
@@ -34,10 +37,10 @@ class TestModeratorService:
     # Fetching a moderator by their ID
     def test_fetch_moderator_by_id(self, mocker):
         db = mocker.Mock()
-        mod = mocker.Mock(id='some-id')
+        mod = mocker.Mock(id=MOD_ID)
         db.get.return_value = mod
         
-        result = mod_service.fetch(db, "some-id")
+        result = mod_service.fetch(db, MOD_ID)
         assert result == mod
 
     # Fetching a moderator by their email
@@ -52,14 +55,14 @@ class TestModeratorService:
     # Updating a moderator's details with valid data and valid permission
     def test_update_moderator_with_valid_data(self, mocker):
         db = mocker.Mock()
-        current_mod = mocker.Mock(id='some-id')
+        current_mod = mocker.Mock(id=MOD_ID)
         mod = mocker.Mock(first_name='Gina')
 
         schema = mocker.Mock()
         schema.model_dump.return_value = {"first_name": "Jane"}
         
         db.get.return_value = mod
-        result = mod_service.update(db, current_mod, schema, "some-id")
+        result = mod_service.update(db, current_mod, schema, MOD_ID)
         
         assert result.first_name == "Jane"
         assert result == mod
@@ -76,7 +79,7 @@ class TestModeratorService:
         db.get.return_value = mod
 
         with pytest.raises(HTTPException) as exc:
-            mod_service.update(db, current_mod, schema, "some-id")
+            mod_service.update(db, current_mod, schema, MOD_ID)
             assert exc.value.status_code == 403
             assert exc.value.detail == 'You do not have permission to access this resource'
 
@@ -88,15 +91,15 @@ class TestModeratorService:
         mod = mocker.Mock(is_active=True)
         db.get.return_value = mod
 
-        result = mod_service.deactivateOrActivate(db, "some-id", current_mod_admin, False)
+        result = mod_service.deactivateOrActivate(db, MOD_ID, current_mod_admin, False)
         assert result.is_active is False
         assert result is mod
 
 
-        current_mod = mocker.Mock(id='some-id')
+        current_mod = mocker.Mock(id=MOD_ID)
         db.get.return_value = mod
 
-        result = mod_service.deactivateOrActivate(db, "some-id", current_mod, True)
+        result = mod_service.deactivateOrActivate(db, MOD_ID, current_mod, True)
         assert result.is_active is True
         assert result is mod
 
@@ -111,7 +114,7 @@ class TestModeratorService:
         db.get.return_value = mod
 
         with pytest.raises(HTTPException) as exc:
-            mod_service.deactivateOrActivate(db, "some-id", current_mod, True)
+            mod_service.deactivateOrActivate(db, MOD_ID, current_mod, True)
             assert exc.value.status_code == 403
             assert exc.value.detail == 'You do not have permission to access this resource'
 
@@ -204,7 +207,7 @@ class TestModeratorService:
                 
         
         db.delete = db_delete_mocker
-        result = mod_service.delete(db, 'some-id', current_mod)
+        result = mod_service.delete(db, MOD_ID, current_mod)
         assert result == True
 
 
@@ -214,7 +217,7 @@ class TestModeratorService:
         current_mod = mocker.Mock(is_admin=False)
 
         with pytest.raises(HTTPException) as exc:
-            mod_service.delete(db, 'some-id', current_mod)
+            mod_service.delete(db, MOD_ID, current_mod)
             assert exc.value == 403
             assert exc.value.detail == 'You do not have permission to access this resource'
 
@@ -338,7 +341,7 @@ class TestModeratorService:
         mod = mocker.Mock(first_name="John", last_name="Doe")
 
         # Mocking the verify_access_token method to return a moderator id
-        mocker.patch.object(mod_service, "verify_access_token", return_value="valid_mod_id")
+        mocker.patch.object(mod_service, "verify_access_token", return_value=MOD_ID)
 
         
         db.get.return_value = mod
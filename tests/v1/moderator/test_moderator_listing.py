@@ -0,0 +1,97 @@
+"""Runs the moderator listing query against an in-memory SQLite database"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.db.database import Base
+from api.v1.models import Country, Moderator, Submission
+from api.v1.services.moderator import mod_service
+
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    ghana, kenya = Country(name="Ghana"), Country(name="Kenya")
+    mods = []
+    for i, (is_active, is_admin) in enumerate(
+        [(True, True), (True, False), (False, False), (True, False)]
+    ):
+        mod = Moderator(
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            username=f"mod{i}",
+            email=f"mod{i}@example.com",
+            password="not-a-real-hash",
+            is_active=is_active,
+            is_admin=is_admin,
+            created_at=BASE_TIME + timedelta(days=i),
+        )
+        mods.append(mod)
+
+    mods[1].country_preferences = [ghana, kenya]
+    mods[3].country_preferences = [kenya]
+    for i, status in enumerate(("pending", "pending", "approved")):
+        mods[1].assigned_submissions.append(
+            Submission(question=f"Question {i}?", difficulty="easy", status=status)
+        )
+
+    session.add_all(mods)
+    session.commit()
+    session.mods = mods
+
+    yield session
+
+    session.close()
+    engine.dispose()
+
+
+def test_listing_aggregates_preferences_and_pending_submissions(db):
+    page = mod_service.fetch_paginated(db, skip=0, limit=10, filters={})
+
+    assert page["total"] == 4
+    assert page["total_pages"] == 1
+    # Newest first
+    assert [m.username for m in page["items"]] == ["mod3", "mod2", "mod1", "mod0"]
+
+    busy = page["items"][2]
+    pending_ids = {s.id for s in db.mods[1].assigned_submissions if s.status == "pending"}
+    assert sorted(busy.country_preferences) == ["Ghana", "Kenya"]
+    assert set(busy.pending_submissions) == pending_ids
+    assert busy.pending_submissions_count == 2
+
+    idle = page["items"][3]
+    assert idle.country_preferences == []
+    assert idle.pending_submissions == []
+    assert idle.pending_submissions_count == 0
+
+
+def test_listing_filters_and_paginates(db):
+    page = mod_service.fetch_paginated(
+        db, skip=1, limit=1, filters={"is_active": True, "is_admin": False}
+    )
+
+    assert page["page"] == 2
+    assert page["total"] == 2
+    assert page["total_pages"] == 2
+    assert [m.username for m in page["items"]] == ["mod1"]
+
+
+def test_listing_past_the_last_page_still_counts(db):
+    page = mod_service.fetch_paginated(
+        db, skip=20, limit=10, filters={"is_active": False, "is_admin": None}
+    )
+
+    assert page["items"] == []
+    assert page["total"] == 1
+    assert page["page"] == 3
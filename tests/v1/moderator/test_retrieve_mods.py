@@ -39,6 +39,24 @@ def mock_mod(is_active=True, first_name="John"):
     return mod
 
 
+def list_item(mod: Moderator, pending_submissions=()) -> dict:
+    return {
+        **mod.to_dict(),
+        "pending_submissions": list(pending_submissions),
+        "pending_submissions_count": len(pending_submissions),
+    }
+
+
+def paginated(items: list, page=1, limit=20) -> dict:
+    return {
+        "page": page,
+        "total_pages": 1 if items else 0,
+        "total": len(items),
+        "limit": limit,
+        "items": items,
+    }
+
+
 mocked_db = MagicMock(spec=Session)
 
 
@@ -69,16 +87,55 @@ class TestRetrieveAllModerators:
         """Test to verify response for getting all moderators."""
 
         mock_data = [
-            mock_mod(),
-            mock_mod(first_name="Whoo?"),
+            list_item(mock_mod(), pending_submissions=["sub-1", "sub-2"]),
+            list_item(mock_mod(first_name="Whoo?")),
         ]
 
-        mocker.patch.object(mod_service, "fetch_all", return_value=mock_data)
+        mock_fetch = mocker.patch.object(
+            mod_service, "fetch_paginated", return_value=paginated(mock_data)
+        )
         response = client.get(ENDPOINT_URL)
 
         assert response.status_code == 200
-        assert response.json()["data"][0]["first_name"] == mock_data[0].first_name
-        assert response.json()["data"][1]["first_name"] == mock_data[1].first_name
+        items = response.json()["data"]["items"]
+        assert items[0]["first_name"] == mock_data[0]["first_name"]
+        assert items[0]["pending_submissions_count"] == 2
+        assert items[1]["first_name"] == mock_data[1]["first_name"]
+        mock_fetch.assert_called_once_with(
+            db=mocked_db,
+            skip=0,
+            limit=20,
+            filters={"is_active": None, "is_admin": None},
+        )
+
+    def test_get_all_moderators_paginated_and_filtered(
+        self, client, mocker: MockerFixture
+    ):
+        """Test that page, limit and status filters are passed to the service."""
+
+        mock_fetch = mocker.patch.object(
+            mod_service, "fetch_paginated", return_value=paginated([], page=3, limit=5)
+        )
+        response = client.get(
+            ENDPOINT_URL,
+            params={"page": 3, "limit": 5, "is_active": "false", "is_admin": "true"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["data"]["page"] == 3
+        mock_fetch.assert_called_once_with(
+            db=mocked_db,
+            skip=10,
+            limit=5,
+            filters={"is_active": False, "is_admin": True},
+        )
+
+    @pytest.mark.parametrize("params", [{"page": 0}, {"limit": 0}, {"limit": 101}])
+    def test_get_all_moderators_invalid_pagination(self, client, params):
+        """Test that out of range page and limit params are rejected."""
+
+        response = client.get(ENDPOINT_URL, params=params)
+        assert response.status_code == 422
 
     def test_get_moderator_by_email(self, client: TestClient, mocker: MockerFixture):
         """Test to verify response for getting moderator by email param."""
@@ -128,12 +185,25 @@ class TestRetrieveAllModerators:
     ):
         """Test to unsuccessful request for getting moderator by id param."""
 
+        mod_id = str(uuid7())
         mock_fetch = mocker.patch.object(mocked_db, "get", return_value=None)
+        response = client.get(ENDPOINT_URL, params={"id": mod_id})
+
+        assert response.status_code == 404
+        assert response.json()["message"] == "Moderator not found"
+        mock_fetch.assert_called_once_with(Moderator, mod_id)
+
+    def test_get_moderator_by_invalid_id(
+        self, client: TestClient, mocker: MockerFixture
+    ):
+        """Test that an id which isn't a UUID is not found without querying the db."""
+
+        mock_fetch = mocker.patch.object(mocked_db, "get")
         response = client.get(ENDPOINT_URL, params={"id": "random-id"})
 
         assert response.status_code == 404
         assert response.json()["message"] == "Moderator not found"
-        mock_fetch.assert_called_once_with(Moderator, "random-id")
+        mock_fetch.assert_not_called()
 
     def test_get_moderator_by_email_not_found(
         self, client: TestClient, mocker: MockerFixture
@@ -152,12 +222,12 @@ class TestRetrieveAllModerators:
         """Test to verify response for getting all moderators, even when there are
         none."""
 
-        mock_data = []
-        mocker.patch.object(mod_service, "fetch_all", return_value=mock_data)
+        mocker.patch.object(mod_service, "fetch_paginated", return_value=paginated([]))
         response = client.get(ENDPOINT_URL)
 
         assert response.status_code == 200
-        assert response.json().get("data") == []
+        assert response.json()["data"]["items"] == []
+        assert response.json()["data"]["total"] == 0
 
     def test_retrieve_all_moderators_unauthenticated(self, client, mocker):
         """Test to retrieve all moderators without sign-in"""
@@ -0,0 +1,92 @@
+"""Checks submissions are deleted with set based statements, their options and
+country links going through the ON DELETE CASCADE foreign keys, against an
+in-memory SQLite database"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.db.database import Base, enable_sqlite_foreign_keys, get_db
+from api.v1.models import (
+    Country,
+    Submission,
+    SubmissionOption,
+    Trivia,
+    country_submission_association,
+)
+from api.v1.services.moderator import mod_service
+from main import app
+
+ENDPOINT_URL = "/api/v1/submissions/bulk-delete"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    event.listen(engine, "connect", enable_sqlite_foreign_keys)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    country = Country(name="Kenya")
+    for i in range(5):
+        submission = Submission(
+            question=f"Submission {i}?", difficulty="easy", status="pending"
+        )
+        submission.countries = [country]
+        submission.options = [
+            SubmissionOption(content=f"Option {j}", is_correct=j == 3)
+            for j in range(4)
+        ]
+        session.add(submission)
+    session.commit()
+
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def client(db):
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[mod_service.get_current_admin] = lambda: MagicMock(
+        is_admin=True
+    )
+    yield TestClient(app)
+    app.dependency_overrides = {}
+
+
+def count(db, table) -> int:
+    return db.scalar(select(func.count()).select_from(table))
+
+
+def submission_ids(db) -> list[str]:
+    return db.scalars(select(Submission.id).order_by(Submission.question)).all()
+
+
+def test_bulk_delete_cascades(db, client):
+    ids = submission_ids(db)
+
+    response = client.post(ENDPOINT_URL, json={"ids": ids[:3]})
+
+    assert response.status_code == 200
+    assert response.json()["data"]["count"] == 3
+    assert count(db, Submission) == 2
+    assert count(db, SubmissionOption) == 8
+    assert count(db, country_submission_association) == 2
+
+
+def test_bulk_delete_refuses_published_submissions(db, client):
+    ids = submission_ids(db)
+    db.add(Trivia(question="Published?", difficulty="easy", submission_id=ids[0]))
+    db.commit()
+
+    response = client.post(ENDPOINT_URL, json={"ids": ids})
+
+    assert response.status_code == 409
+    assert count(db, Submission) == 5
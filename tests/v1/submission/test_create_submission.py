@@ -64,39 +64,18 @@ class TestCreateSubmission:
     def test_create_submission_success(self, mocker):
         """Test to successfully create a new submission"""
         test_body_copy = test_sub_req_body_1.copy()
+        mock_sub = mock_submission()
 
-        def mock_extractor(dump, db):
-            # Mock the extractor method and inject/remove values to/from the schema dump
-            all_options = test_body_copy.get("incorrect_options").copy()
-            all_options.append(test_body_copy.get("correct_option"))
-
-            dump.pop("incorrect_options")
-            dump.pop("correct_option")
-            dump.pop("countries")
-            dump.pop("category")
-
-            dump["id"] = "dummy_id"
-            dump["status"] = "pending"
-            dump["created_at"] = datetime.now()
-            dump["updated_at"] = datetime.now()
-
-            return [
-                [Country(name="Algeria")],
-                [Category(name="General-Knowledge")],
-                [
-                    SubmissionOption(content=all_options[0]),
-                    SubmissionOption(content=all_options[1]),
-                    SubmissionOption(content=all_options[2]),
-                    SubmissionOption(content=all_options[3], is_correct=True),
-                ],
-            ]
-
-        mocker.patch.object(
-            submission_service, "extract_countries_categories_options", mock_extractor
-        )
-
-        mocker.patch.object(
-            submission_service, "find_suitable_mod", return_value="some_mod"
+        mock_create = mocker.patch.object(
+            submission_service,
+            "create",
+            return_value={
+                "id": mock_sub.id,
+                "status": mock_sub.status,
+                "moderator_id": mock_sub.moderator_id,
+                "created_at": mock_sub.created_at,
+                **test_body_copy,
+            },
         )
 
         response = client.post("/api/v1/submissions", json=test_body_copy)
@@ -105,6 +84,13 @@ class TestCreateSubmission:
         assert response.json()["data"]["question"] == test_sub_req_body_1["question"]
         assert response.json()["data"]["category"] == test_sub_req_body_1["category"]
         assert response.json()["data"]["countries"] == test_sub_req_body_1["countries"]
+        assert response.json()["data"]["moderator_id"] == mock_sub.moderator_id
+
+        schema = mock_create.call_args.kwargs["schema"]
+        assert schema.model_dump(mode="json") == {
+            **test_sub_req_body_1,
+            "submission_note": None,
+        }
 
     def test_create_submission_duplicate(self, mocker):
         """Test for creating duplicate submissions"""
@@ -117,7 +103,7 @@ class TestCreateSubmission:
             if mock_sub in db_store:
                 raise IntegrityError(None, None, None)
             db_store.append(mock_sub)
-            return mocker.Mock()
+            return mocker.MagicMock()
 
         mocker.patch.object(submission_service, "create", mock_create)
         mocker.patch(
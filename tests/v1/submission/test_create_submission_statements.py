@@ -0,0 +1,151 @@
+"""Checks SubmissionService.create inserts a submission, assigning it to a
+moderator, with a fixed number of statements, against an in-memory SQLite
+database. The single statement composed for PostgreSQL is only compiled"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.db.database import Base
+from api.v1.models import Category, Country, Moderator, Submission, SubmissionOption
+from api.v1.schemas.submission import CreateSubmissionSchema
+from api.v1.services.submission import submission_service
+
+
+class Database:
+    def __init__(self):
+        self.engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.statements = 0
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def count_statement(*args):
+            self.statements += 1
+
+        countries = {name: Country(name=name) for name in ("Ghana", "Togo", "Benin")}
+        self.session.add_all([Category(name="History"), *countries.values()])
+        self.moderators = {
+            "ghana": self.make_moderator("ghana", [countries["Ghana"]]),
+            "benin": self.make_moderator("benin", [countries["Benin"]]),
+        }
+        self.session.commit()
+
+    def make_moderator(self, name: str, countries: list[Country]) -> Moderator:
+        mod = Moderator(
+            first_name=name,
+            last_name=name,
+            username=name,
+            email=f"{name}@example.com",
+            password="not-a-real-hash",
+        )
+        mod.country_preferences = countries
+        self.session.add(mod)
+        return mod
+
+    def create(self, question: str, countries: list[str]) -> dict:
+        return submission_service.create(
+            self.session,
+            CreateSubmissionSchema(
+                question=question,
+                incorrect_options=["Mahama", "Rawlings", "Kufuor"],
+                correct_option="Nkrumah",
+                difficulty="easy",
+                category="History",
+                countries=countries,
+            ),
+        )
+
+
+@pytest.fixture
+def database():
+    database = Database()
+    yield database
+    database.session.close()
+    database.engine.dispose()
+
+
+@pytest.mark.parametrize("countries", [[], ["Ghana"], ["Ghana", "Togo", "Benin"]])
+def test_create_runs_a_fixed_number_of_statements(database, countries):
+    database.statements = 0
+
+    s_dict = database.create("Who was Ghana's first president?", countries)
+
+    assert database.statements == (3 if countries else 2)
+    assert s_dict["status"] == "pending"
+    assert s_dict["category"] == "History"
+    assert s_dict["countries"] == countries
+    assert s_dict["correct_option"] == "Nkrumah"
+    assert s_dict["created_at"] is not None
+
+    database.session.expire_all()
+    submission = database.session.get(Submission, s_dict["id"])
+    assert submission.category.name == "History"
+    assert sorted(c.name for c in submission.countries) == sorted(countries)
+    assert sorted((o.content, o.is_correct) for o in submission.options) == [
+        ("Kufuor", False),
+        ("Mahama", False),
+        ("Nkrumah", True),
+        ("Rawlings", False),
+    ]
+
+
+def test_create_assigns_moderator_preferring_a_country(database):
+    ghana, benin = database.moderators["ghana"], database.moderators["benin"]
+
+    assert database.create("Q1?", ["Ghana"])["moderator_id"] == ghana.id
+    assert database.create("Q2?", ["Ghana", "Benin"])["moderator_id"] == benin.id
+    assert database.create("Q3?", ["Togo"])["moderator_id"] is None
+
+
+def test_create_assigns_moderator_with_fewest_pending(database):
+    ids = [database.create(f"Q{i}?", [])["moderator_id"] for i in range(4)]
+
+    assert sorted(ids) == sorted(
+        [database.moderators["ghana"].id, database.moderators["benin"].id] * 2
+    )
+
+
+def test_create_skips_unknown_countries(database):
+    assert database.create("Q1?", ["Ghana", "Mali"])["countries"] == ["Ghana"]
+
+
+def test_create_duplicate_question(database):
+    database.create("Who was Ghana's first president?", ["Ghana"])
+
+    with pytest.raises(HTTPException) as exc:
+        database.create("Who was Ghana's first president?", ["Ghana"])
+
+    assert exc.value.status_code == 400
+    assert database.session.scalar(select(func.count(SubmissionOption.id))) == 4
+
+
+def test_postgresql_create_is_one_statement():
+    db = MagicMock(spec=Session)
+    db.get_bind.return_value.dialect.name = "postgresql"
+    db.execute.return_value.one.return_value.countries = "Ghana"
+
+    submission_service.create(
+        db,
+        CreateSubmissionSchema(
+            question="Who was Ghana's first president?",
+            incorrect_options=["Mahama", "Rawlings", "Kufuor"],
+            correct_option="Nkrumah",
+            difficulty="easy",
+            category="History",
+            countries=["Ghana"],
+        ),
+    )
+
+    db.execute.assert_called_once()
+    sql = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("WITH new_submission AS")
+    assert sql.count("INSERT INTO") == 3
+    db.commit.assert_called_once()
@@ -16,16 +16,15 @@ from api.v1.services.moderator import (
     HTTPAuthorizationCredentials,
 )
 from api.db.database import get_db
-from api.v1.services.submission import (
-    submission_service,
-    CountryService,
-    CategoryService,
-)
+from api.v1.services.submission import submission_service
 from api.v1.models.submission import Submission, SubmissionOption
 from api.v1.models.category import Category
 from api.v1.models.country import Country
+from api.v1.schemas.submission import RetrieveSubmissionForAdminSchema
 from main import app
 
+MOD_ID = str(uuid7())
+
 ENDPOINT_URL = "/api/v1/submissions"
 
 
@@ -52,6 +51,19 @@ def mock_sub(question="Who"):
     return subm
 
 
+def paginated(submissions: list, page=1, limit=20) -> dict:
+    return {
+        "page": page,
+        "total_pages": 1 if submissions else 0,
+        "total": len(submissions),
+        "limit": limit,
+        "items": [
+            RetrieveSubmissionForAdminSchema.model_validate(s.to_dict())
+            for s in submissions
+        ],
+    }
+
+
 mocked_db = MagicMock(spec=Session)
 
 
@@ -86,32 +98,106 @@ class TestRetrieveAllSubmissions:
             mock_sub("Who is the first?"),
         ]
 
-        mocker.patch.object(
-            submission_service, "fetch_all", return_value=mock_submission_data
+        mock_fetch = mocker.patch.object(
+            submission_service,
+            "fetch_paginated",
+            return_value=paginated(mock_submission_data),
         )
-        response = client.get(ENDPOINT_URL.format(""))
+        response = client.get(ENDPOINT_URL)
 
         assert response.status_code == 200
-        assert (
-            response.json()["data"][0]["question"] == mock_submission_data[0].question
+        items = response.json()["data"]["items"]
+        assert items[0]["question"] == mock_submission_data[0].question
+        assert items[1]["difficulty"] == mock_submission_data[1].difficulty
+        assert items[1]["moderator_id"] == mock_submission_data[1].moderator_id
+        mock_fetch.assert_called_once_with(
+            db=mocked_db,
+            skip=0,
+            limit=20,
+            filters={
+                "status": None,
+                "moderator_id": None,
+                "category": None,
+                "country": None,
+                "created_after": None,
+                "created_before": None,
+            },
+            sort_by="created_at",
+            order="desc",
+            schema=RetrieveSubmissionForAdminSchema,
         )
-        assert (
-            response.json()["data"][1]["difficulty"]
-            == mock_submission_data[1].difficulty
+
+    def test_get_all_submissions_filtered_and_sorted(
+        self, client, mocker: MockerFixture
+    ):
+        """Test that filters, sorting and pagination are passed to the service."""
+
+        mock_fetch = mocker.patch.object(
+            submission_service, "fetch_paginated", return_value=paginated([])
+        )
+        response = client.get(
+            ENDPOINT_URL,
+            params={
+                "status": "awaiting",
+                "moderator_id": MOD_ID,
+                "category": "History",
+                "country": "Kenya",
+                "created_after": "2024-01-01T00:00:00Z",
+                "created_before": "2024-02-01T00:00:00Z",
+                "sort_by": "status",
+                "order": "asc",
+                "page": 3,
+                "limit": 10,
+            },
+        )
+
+        assert response.status_code == 200
+        mock_fetch.assert_called_once_with(
+            db=mocked_db,
+            skip=20,
+            limit=10,
+            filters={
+                "status": "awaiting",
+                "moderator_id": MOD_ID,
+                "category": "History",
+                "country": "Kenya",
+                "created_after": datetime(2024, 1, 1, tzinfo=timezone.utc),
+                "created_before": datetime(2024, 2, 1, tzinfo=timezone.utc),
+            },
+            sort_by="status",
+            order="asc",
+            schema=RetrieveSubmissionForAdminSchema,
         )
 
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"limit": 101},
+            {"page": 0},
+            {"sort_by": "question"},
+            {"order": "up"},
+            {"status": "lost"},
+            {"moderator_id": "some-mod-id"},
+        ],
+    )
+    def test_get_all_submissions_invalid_params(self, client, params):
+        """Test that invalid listing params are rejected."""
+
+        response = client.get(ENDPOINT_URL, params=params)
+        assert response.status_code == 422
+
     def test_get_all_submissions_empty(self, client, mocker: MockerFixture):
         """Test to verify response for getting all submissions, even when there are
         none."""
 
-        mock_submission_data = []
         mocker.patch.object(
-            submission_service, "fetch_all", return_value=mock_submission_data
+            submission_service, "fetch_paginated", return_value=paginated([])
         )
-        response = client.get(ENDPOINT_URL.format(""))
+        response = client.get(ENDPOINT_URL)
 
         assert response.status_code == 200
-        assert response.json().get("data") == []
+        assert response.json()["data"]["items"] == []
+        assert response.json()["data"]["total"] == 0
 
     def test_retrieve_all_submissions_unauthenticated(self, client, mocker):
         """Test to retrieve all submissions without sign-in"""
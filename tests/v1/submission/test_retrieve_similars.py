@@ -79,7 +79,9 @@ class TestRetrieveSimilarTriviasToSubmission:
         ]
 
         mock_obj = mocker.patch.object(
-            submission_service, "fetch_similars", return_value=mock_trivia_data
+            submission_service,
+            "fetch_similars",
+            return_value=[t.to_dict() for t in mock_trivia_data],
         )
 
         id = "some-id"
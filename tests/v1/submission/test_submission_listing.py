@@ -0,0 +1,125 @@
+"""Runs the paginated submission listing against an in-memory SQLite database"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.db.database import Base
+from api.v1.models import Category, Country, Moderator, Submission, SubmissionOption
+from api.v1.schemas.submission import RetrieveSubmissionForAdminSchema
+from api.v1.services.submission import submission_service
+
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+MODERATOR_ID = "01920000-0000-7000-8000-000000000001"
+
+# (status, difficulty, category, country, assigned)
+ROWS = [
+    ("pending", "easy", "History", "Ghana", True),
+    ("approved", "hard", "History", "Kenya", True),
+    ("awaiting", "medium", "Sports", None, False),
+    ("rejected", "easy", "Sports", "Ghana", True),
+    ("pending", "hard", "Art", "Kenya", False),
+]
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    moderator = Moderator(
+        id=MODERATOR_ID,
+        first_name="Mod",
+        last_name="Mod",
+        username="mod",
+        email="mod@example.com",
+        password="not-a-real-hash",
+    )
+    categories = {name: Category(name=name) for name in ("History", "Sports", "Art")}
+    countries = {name: Country(name=name) for name in ("Ghana", "Kenya")}
+    session.add(moderator)
+
+    for i, (status, difficulty, category, country, assigned) in enumerate(ROWS):
+        subm = Submission(
+            question=f"Submission {i}?",
+            status=status,
+            difficulty=difficulty,
+            created_at=BASE_TIME + timedelta(days=i),
+        )
+        subm.categories = [categories[category]]
+        subm.countries = [countries[country]] if country else []
+        subm.options = [
+            SubmissionOption(content=f"Option {j}", is_correct=j == 3) for j in range(4)
+        ]
+        subm.moderator = moderator if assigned else None
+        session.add(subm)
+
+    session.commit()
+
+    yield session
+
+    session.close()
+    engine.dispose()
+
+
+def numbers(page: dict) -> list[int]:
+    return [int(item.question.split()[1].rstrip("?")) for item in page["items"]]
+
+
+def fetch(db, filters={}, **kwargs) -> dict:
+    return submission_service.fetch_paginated(
+        db,
+        skip=kwargs.pop("skip", 0),
+        limit=kwargs.pop("limit", 10),
+        filters=filters,
+        schema=RetrieveSubmissionForAdminSchema,
+        **kwargs,
+    )
+
+
+def test_listing_defaults_to_newest_first(db):
+    page = fetch(db)
+
+    assert numbers(page) == [4, 3, 2, 1, 0]
+    assert page["total"] == 5
+    # Awaiting submissions have no moderator yet
+    assert page["items"][2].moderator_id is None
+
+
+@pytest.mark.parametrize(
+    "filters, expected",
+    [
+        ({"status": "pending"}, [4, 0]),
+        ({"moderator_id": MODERATOR_ID}, [3, 1, 0]),
+        ({"category": "Sports"}, [3, 2]),
+        ({"country": "Kenya"}, [4, 1]),
+        ({"created_after": BASE_TIME + timedelta(days=1)}, [4, 3, 2]),
+        ({"created_before": BASE_TIME + timedelta(days=1)}, [0]),
+        ({"status": "pending", "country": "Ghana", "category": None}, [0]),
+    ],
+)
+def test_listing_filters(db, filters, expected):
+    page = fetch(db, filters)
+
+    assert numbers(page) == expected
+    assert page["total"] == len(expected)
+
+
+def test_listing_sorts(db):
+    assert numbers(fetch(db, order="asc")) == [0, 1, 2, 3, 4]
+    # Ties on difficulty are broken by id, in the same direction
+    assert numbers(fetch(db, sort_by="difficulty", order="asc")) == [0, 3, 1, 4, 2]
+
+
+def test_listing_paginates(db):
+    page = fetch(db, skip=2, limit=2, order="asc")
+
+    assert numbers(page) == [2, 3]
+    assert page["page"] == 2
+    assert page["total_pages"] == 3
@@ -0,0 +1,193 @@
+"""Guards against N+1 queries by counting the SQL statements each route runs
+against a real (in-memory SQLite) database.
+
+Every route in ROUTE_BUDGETS is requested against a database holding one row
+and one holding SEEDED_ROWS rows of everything it lists. The number of
+statements must be the same for both and within the route's budget.
+
+Not covered: GET /submissions/{id}/similars, as it relies on PostgreSQL only
+functions, and POST /submissions, whose statements are counted by
+tests/v1/submission/test_create_submission_statements.py.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.db.database import Base, get_db
+from api.utils.availability_matrix import availability_matrix
+from api.v1.models import (
+    Category,
+    Country,
+    Moderator,
+    Submission,
+    SubmissionOption,
+    Trivia,
+    TriviaOption,
+)
+from api.v1.schemas.african_countries_enum import AfricanCountriesEnum
+from api.v1.schemas.submission import CategoryEnum
+from api.v1.services.moderator import mod_service
+from main import app
+
+SEEDED_ROWS = 15
+
+# (method, path, user making the request, maximum number of statements)
+ROUTE_BUDGETS = [
+    ("GET", "/api/v1/trivias", "moderator", 2),
+    ("GET", "/api/v1/trivias?category=Sports&country=Algeria&limit=50", "moderator", 2),
+    ("GET", "/api/v1/trivias/{trivia_id}", "moderator", 4),
+    ("GET", "/api/v1/submissions", "admin", 5),
+    ("GET", "/api/v1/submissions?status=pending&country=Algeria&limit=50", "admin", 5),
+    ("GET", "/api/v1/submissions/stats", None, 1),
+    ("GET", "/api/v1/assigned-submissions?limit=50", "moderator", 5),
+    ("GET", "/api/v1/assigned-submissions/{submission_id}", "moderator", 4),
+    ("GET", "/api/v1/moderators", "admin", 2),
+    ("GET", "/api/v1/moderators?id={moderator_id}", "admin", 4),
+    ("GET", "/api/v1/moderators/me", "moderator", 3),
+    ("GET", "/api/v1/questions", None, 3),
+    ("GET", "/api/v1/questions?category=Entertainment&difficulty=easy", None, 3),
+    ("GET", "/api/v1/questions/availability", None, 2),
+]
+
+
+class SeededDatabase:
+    """An in-memory database with `rows` trivias, submissions assigned to one
+    moderator and extra moderators, plus a statement counter"""
+
+    def __init__(self, rows: int):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(self.engine)
+        self.session_factory = sessionmaker(bind=self.engine)
+        self.statements = 0
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def count_statement(*args):
+            self.statements += 1
+
+        with self.session_factory() as db:
+            self.seed(db, rows)
+
+    def seed(self, db, rows: int) -> None:
+        categories = [Category(name=c.value) for c in CategoryEnum]
+        countries = [Country(name=c.value) for c in AfricanCountriesEnum]
+        db.add_all(categories + countries)
+
+        admin = self.make_moderator("admin", is_admin=True)
+        moderator = self.make_moderator("moderator", countries=countries[:2])
+        others = [
+            self.make_moderator(f"other{i}", countries=countries[i : i + 2])
+            for i in range(rows - 1)
+        ]
+        db.add_all([admin, moderator] + others)
+
+        for i in range(rows):
+            trivia = Trivia(question=f"Trivia {i}?", difficulty="easy")
+            trivia.categories = [categories[i % len(categories)]]
+            trivia.countries = countries[i : i + 2]
+            trivia.options = self.make_options(TriviaOption)
+
+            submission = Submission(
+                question=f"Submission {i}?", difficulty="hard", status="pending"
+            )
+            submission.categories = [categories[i % len(categories)]]
+            submission.countries = countries[i : i + 2]
+            submission.options = self.make_options(SubmissionOption)
+            submission.moderator = moderator
+            db.add_all([trivia, submission])
+
+        db.commit()
+
+        self.ids = {
+            "trivia_id": trivia.id,
+            "submission_id": submission.id,
+            "moderator_id": moderator.id,
+        }
+        self.tokens = {
+            "admin": mod_service.create_access_token(admin.id),
+            "moderator": mod_service.create_access_token(moderator.id),
+        }
+
+    @staticmethod
+    def make_moderator(name: str, is_admin=False, countries=()) -> Moderator:
+        mod = Moderator(
+            first_name=name,
+            last_name=name,
+            username=name,
+            email=f"{name}@example.com",
+            password="not-a-real-hash",
+            is_admin=is_admin,
+        )
+        mod.country_preferences = list(countries)
+        return mod
+
+    @staticmethod
+    def make_options(option_model) -> list:
+        return [
+            option_model(content=f"Option {i}", is_correct=i == 3) for i in range(4)
+        ]
+
+    def get_db(self):
+        db = self.session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+
+@pytest.fixture(scope="module")
+def databases():
+    databases = {rows: SeededDatabase(rows) for rows in (1, SEEDED_ROWS)}
+    yield databases
+    for database in databases.values():
+        database.engine.dispose()
+
+
+@pytest.fixture
+def client():
+    previous_overrides = dict(app.dependency_overrides)
+    yield TestClient(app)
+    app.dependency_overrides = previous_overrides
+    availability_matrix.invalidate()
+
+
+def count_statements(
+    client: TestClient, database: SeededDatabase, method: str, path: str, user
+) -> int:
+    app.dependency_overrides[get_db] = database.get_db
+    availability_matrix.invalidate()
+
+    headers = {}
+    if user is not None:
+        headers["Authorization"] = f"Bearer {database.tokens[user]}"
+
+    database.statements = 0
+    response = client.request(method, path.format(**database.ids), headers=headers)
+    assert response.status_code == 200, response.text
+    return database.statements
+
+
+@pytest.mark.parametrize(
+    "method, path, user, budget",
+    ROUTE_BUDGETS,
+    ids=[f"{method} {path}" for method, path, _, _ in ROUTE_BUDGETS],
+)
+def test_route_query_budget(databases, client, method, path, user, budget):
+    counts = {
+        rows: count_statements(client, database, method, path, user)
+        for rows, database in databases.items()
+    }
+
+    assert counts[1] == counts[SEEDED_ROWS], (
+        f"{method} {path} runs {counts[1]} statements for 1 row but "
+        f"{counts[SEEDED_ROWS]} for {SEEDED_ROWS} rows"
+    )
+    assert counts[SEEDED_ROWS] <= budget, (
+        f"{method} {path} runs {counts[SEEDED_ROWS]} statements, budget is {budget}"
+    )
@@ -0,0 +1,57 @@
+"""Checks UUIDString against a real (in-memory SQLite) database"""
+
+import pytest
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.exc import StatementError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.db.database import Base
+from api.db.types import is_uuid, to_uuid_string, uuid_text
+from api.v1.models import Moderator
+
+MOD_ID = "01920000-0000-7000-8000-0000000000ab"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(
+        Moderator(
+            id=MOD_ID,
+            first_name="Mod",
+            last_name="Mod",
+            username="mod",
+            email="mod@example.com",
+            password="not-a-real-hash",
+        )
+    )
+    session.commit()
+
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_ids_are_stored_as_16_bytes_and_read_as_strings(db):
+    assert db.execute(text("SELECT length(id), typeof(id) FROM moderators")).one() == (
+        16,
+        "blob",
+    )
+    assert db.scalar(select(Moderator.id)) == MOD_ID
+    assert db.get(Moderator, MOD_ID.upper()).id == MOD_ID
+
+
+def test_uuid_text_is_read_back_with_to_uuid_string(db):
+    value = db.scalar(select(func.aggregate_strings(uuid_text(Moderator.id), ",")))
+    assert to_uuid_string(value) == MOD_ID
+
+
+def test_binding_an_invalid_id_fails(db):
+    assert not is_uuid("some-id")
+    with pytest.raises(StatementError):
+        db.execute(select(Moderator).where(Moderator.id == "some-id"))
@@ -0,0 +1,135 @@
+"""Checks trivias are deleted with set based statements, their options and
+country links going through the ON DELETE CASCADE foreign keys, against an
+in-memory SQLite database"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.db.database import Base, enable_sqlite_foreign_keys, get_db
+from api.utils.availability_matrix import availability_matrix
+from api.v1.models import Country, Trivia, TriviaOption, country_trivia_association
+from api.v1.services.moderator import mod_service
+from api.v1.services.trivia import trivia_service
+from main import app
+
+ENDPOINT_URL = "/api/v1/trivias/bulk-delete"
+
+
+class Database:
+    def __init__(self):
+        self.engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        event.listen(self.engine, "connect", enable_sqlite_foreign_keys)
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.statements = 0
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def count_statement(*args):
+            self.statements += 1
+
+    def add_trivias(self, count: int) -> list[str]:
+        country = Country(name="Ghana")
+        trivias = []
+        for i in range(count):
+            trivia = Trivia(question=f"Trivia {i}?", difficulty="easy")
+            trivia.countries = [country]
+            trivia.options = [
+                TriviaOption(content=f"Option {j}", is_correct=j == 3)
+                for j in range(4)
+            ]
+            trivias.append(trivia)
+        self.session.add_all(trivias)
+        self.session.commit()
+        return [trivia.id for trivia in trivias]
+
+    def count(self, table) -> int:
+        return self.session.scalar(select(func.count()).select_from(table))
+
+
+@pytest.fixture
+def database():
+    database = Database()
+    yield database
+    database.session.close()
+    database.engine.dispose()
+
+
+@pytest.fixture
+def client(database):
+    app.dependency_overrides[get_db] = lambda: database.session
+    app.dependency_overrides[mod_service.get_current_admin] = lambda: MagicMock(
+        is_admin=True
+    )
+    yield TestClient(app)
+    app.dependency_overrides = {}
+
+
+def test_bulk_delete_is_one_statement(database, client):
+    ids = database.add_trivias(30)
+    database.statements = 0
+
+    response = client.post(ENDPOINT_URL, json={"ids": ids[:20]})
+
+    assert response.status_code == 200
+    assert response.json()["data"]["count"] == 20
+    assert sorted(response.json()["data"]["deleted"]) == sorted(ids[:20])
+    assert database.statements == 1
+
+    assert database.count(Trivia) == 10
+    assert database.count(TriviaOption) == 40
+    assert database.count(country_trivia_association) == 10
+
+
+def test_bulk_delete_ignores_unknown_ids(database, client, mocker):
+    ids = database.add_trivias(2)
+    invalidate = mocker.spy(availability_matrix, "invalidate")
+
+    unknown_id = "01920000-0000-7000-8000-000000000000"
+    response = client.post(ENDPOINT_URL, json={"ids": [ids[0], ids[0], unknown_id]})
+
+    assert response.json()["data"] == {"count": 1, "deleted": [ids[0]]}
+    assert database.count(Trivia) == 1
+    invalidate.assert_called_once()
+
+
+@pytest.mark.parametrize("body", [{"ids": []}, {"ids": ["some-id"]}, {}])
+def test_bulk_delete_invalid_body(client, body):
+    response = client.post(ENDPOINT_URL, json=body)
+    assert response.status_code == 422
+
+
+def test_single_delete_does_not_load_the_trivia(database, mocker):
+    record_removed = mocker.spy(availability_matrix, "record_removed")
+
+    for count in (1, 5):
+        trivia_id = database.add_trivias(count)[0]
+        database.session.expire_all()
+        database.statements = 0
+
+        trivia_service.delete(database.session, trivia_id)
+
+        # One SELECT of the availability key, one DELETE
+        assert database.statements == 2
+        assert database.session.get(Trivia, trivia_id) is None
+        record_removed.assert_called_with(None, "easy", ["Ghana"])
+
+    assert database.count(TriviaOption) == 16
+
+
+@pytest.mark.parametrize("trivia_id", ["some-id", "01920000-0000-7000-8000-000000000000"])
+def test_single_delete_unknown_trivia(database, trivia_id):
+    database.add_trivias(1)
+
+    with pytest.raises(HTTPException) as exc:
+        trivia_service.delete(database.session, trivia_id)
+
+    assert exc.value.status_code == 404
+    assert database.count(Trivia) == 1
@@ -70,7 +70,11 @@ class TestClassDeleteTrivia:
     # Invalid id
     def test_delete_trivia_invalid_id(self, client, mocker):
 
-        mocker.patch.object(mocked_db, "get", return_value=None)
+        mocker.patch.object(
+            mocked_db,
+            "execute",
+            return_value=MagicMock(one_or_none=MagicMock(return_value=None)),
+        )
 
         response = client.delete(ENDPOINT_URL.format("some-id"))
         assert response.status_code == 404
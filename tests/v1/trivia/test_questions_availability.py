@@ -0,0 +1,305 @@
+import pytest
+
+from unittest.mock import MagicMock
+from pytest_mock import MockerFixture
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.db.database import Base, get_db
+from api.utils.availability_matrix import AvailabilityMatrix
+from api.v1.models import Category, Country, Trivia
+from api.v1.services.trivia import trivia_service
+from main import app
+
+ENDPOINT_URL = "/api/v1/questions/availability"
+
+# Rows as returned by query_for_trivia_totals: (category, difficulty, total)
+mock_totals = [
+    ("Science", "easy", 5),
+    ("Science", "hard", 2),
+    ("History", "easy", 4),
+]
+
+# Rows as returned by query_for_trivia_availability: (category, difficulty, country, count)
+mock_availability = [
+    ("Science", "easy", None, 2),
+    ("Science", "easy", "Ghana", 3),
+    ("Science", "easy", "Nigeria", 1),
+    ("Science", "hard", "Ghana", 2),
+    ("History", "easy", None, 4),
+]
+
+
+def mock_db():
+    db = MagicMock(spec=Session)
+    db.execute.side_effect = [
+        MagicMock(all=MagicMock(return_value=mock_totals)),
+        MagicMock(all=MagicMock(return_value=mock_availability)),
+    ]
+    return db
+
+
+@pytest.fixture
+def client():
+    client = TestClient(app)
+    yield client
+
+
+class TestAvailabilityMatrix:
+
+    def test_count_without_filters(self):
+        """Test to verify every trivia is counted once without filters."""
+        matrix = AvailabilityMatrix(ttl=60)
+
+        assert matrix.count(mock_db()) == 11
+
+    def test_count_with_filters(self):
+        """Test to verify country filters also match trivias without a country."""
+        matrix = AvailabilityMatrix(ttl=60)
+        matrix.refresh(mock_db())
+
+        assert matrix.count(None, category="Science") == 7
+        assert matrix.count(None, difficulty="easy") == 9
+        assert matrix.count(None, country="Ghana") == 11
+        assert matrix.count(None, country="Nigeria") == 7
+        assert matrix.count(None, category="Science", country="Nigeria") == 3
+        assert matrix.count(None, category="Science", difficulty="hard") == 2
+        assert matrix.count(None, category="Politics") == 0
+
+    def test_matrix_is_only_loaded_once_within_ttl(self):
+        """Test to verify the database is not queried while the matrix is fresh."""
+        matrix = AvailabilityMatrix(ttl=60)
+        db = mock_db()
+
+        matrix.count(db)
+        matrix.count(db, category="Science")
+
+        assert db.execute.call_count == 2
+
+    def test_matrix_is_reloaded_after_invalidation(self):
+        """Test to verify an invalidated matrix is reloaded on next use."""
+        matrix = AvailabilityMatrix(ttl=60)
+        matrix.refresh(mock_db())
+        matrix.invalidate()
+
+        assert matrix.is_fresh() is False
+        assert matrix.count(mock_db()) == 11
+
+    def test_record_added_and_removed(self):
+        """Test to verify trivia writes update the matrix incrementally."""
+        matrix = AvailabilityMatrix(ttl=60)
+        matrix.refresh(mock_db())
+
+        matrix.record_added("Politics", "medium", ["Ghana", "Chad"])
+        matrix.record_added("Science", "easy", [])
+
+        assert matrix.count(None, category="Politics", country="Chad") == 1
+        assert matrix.count(None, category="Science", country="Togo") == 3
+
+        matrix.record_removed("Science", "hard", ["Ghana"])
+        assert matrix.count(None, category="Science", difficulty="hard") == 1
+
+    def test_record_before_load_is_ignored(self):
+        """Test to verify writes made before the first load do not create a partial matrix."""
+        matrix = AvailabilityMatrix(ttl=60)
+        matrix.record_added("Politics", "medium", [])
+
+        assert matrix.is_fresh() is False
+        assert matrix.count(mock_db(), category="Politics") == 0
+
+    def test_trivias_without_category_are_not_counted(self):
+        """Test to verify trivias without a category, never served, are left out."""
+        matrix = AvailabilityMatrix(ttl=60)
+        matrix.refresh(mock_db())
+
+        matrix.record_added(None, "easy", [])
+        assert matrix.count(None) == 11
+        assert [c["category"] for c in matrix.snapshot(None)] == [
+            "History",
+            "Science",
+            "Science",
+        ]
+
+        matrix.record_removed(None, "easy", [])
+        assert matrix.count(None, difficulty="easy") == 9
+
+    def test_matrix_matches_question_retrieval(self):
+        """Test to verify the matrix counts the trivias served by query_for_question_retrieval."""
+        engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        ghana, history = Country(name="Ghana"), Category(name="History")
+        db.add_all(
+            [
+                Trivia(question="Q1?", difficulty="easy", category=history),
+                Trivia(question="Q2?", difficulty="easy", countries=[ghana]),
+                Trivia(question="Q3?", difficulty="hard"),
+            ]
+        )
+        db.commit()
+
+        matrix = AvailabilityMatrix(ttl=60)
+        for filters in ({}, {"difficulty": "easy"}, {"country": "Ghana"}):
+            retrieved = trivia_service.retrieve_questions(db, dict(filters), 10)
+            assert matrix.count(db, **filters) == len(retrieved)
+        assert [c["category"] for c in matrix.snapshot(db)] == ["History"]
+
+        db.close()
+        engine.dispose()
+
+    def test_questions_skip_trivias_without_category(self, mocker: MockerFixture):
+        """Test to verify GET /questions serves questions while trivias without a category exist."""
+        engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        options = {
+            "correct_option": "Nkrumah",
+            "incorrect_options": ["Mahama", "Rawlings", "Kufuor"],
+        }
+        db.add_all(
+            [
+                Trivia(
+                    question="Q1?",
+                    difficulty="easy",
+                    category=Category(name="History"),
+                    options_json=options,
+                ),
+                Trivia(question="Q2?", difficulty="easy", options_json=options),
+            ]
+        )
+        db.commit()
+        mocker.patch(
+            "api.v1.services.trivia.availability_matrix", AvailabilityMatrix(ttl=60)
+        )
+        app.dependency_overrides[get_db] = lambda: db
+        try:
+            client = TestClient(app)
+            served = client.get("/api/v1/questions", params={"amount": 1})
+            too_many = client.get("/api/v1/questions", params={"amount": 2})
+        finally:
+            app.dependency_overrides = {}
+            db.close()
+            engine.dispose()
+
+        assert served.status_code == 200
+        assert served.json()["data"][0]["question"] == "Q1?"
+        assert served.json()["data"][0]["category"] == "History"
+        assert too_many.json()["message"] == "Not enough questions in database"
+
+
+class TestRetrieveAvailability:
+
+    @classmethod
+    def setup_class(cls):
+        app.dependency_overrides[get_db] = lambda: MagicMock(spec=Session)
+
+    @classmethod
+    def teardown_class(cls):
+        app.dependency_overrides = {}
+
+    def test_get_availability(self, client: TestClient, mocker: MockerFixture):
+        """Test to verify response for getting the availability matrix."""
+        matrix = AvailabilityMatrix(ttl=60)
+        mocker.patch("api.v1.services.trivia.availability_matrix", matrix)
+        matrix.refresh(mock_db())
+
+        response = client.get(ENDPOINT_URL)
+
+        assert response.status_code == 200
+        assert response.json()["data"][0] == {
+            "category": "History",
+            "difficulty": "easy",
+            "total": 4,
+            "without_country": 4,
+            "countries": {},
+        }
+        assert response.json()["data"][1]["countries"] == {"Ghana": 3, "Nigeria": 1}
+
+    def test_has_enough_questions(self, mocker: MockerFixture):
+        """Test to verify the availability check used by the questions endpoint."""
+        matrix = AvailabilityMatrix(ttl=60)
+        mocker.patch("api.v1.services.trivia.availability_matrix", matrix)
+        matrix.refresh(mock_db())
+
+        assert trivia_service.has_enough_questions(None, {"country": "Nigeria"}, 7)
+        assert not trivia_service.has_enough_questions(
+            mock_db(), {"country": "Nigeria", "difficulty": "hard"}, 1
+        )
+
+    def test_has_enough_questions_reloads_before_refusing(
+        self, mocker: MockerFixture
+    ):
+        """Test to verify trivias added by other workers are seen before refusing a request."""
+        matrix = AvailabilityMatrix(ttl=60, miss_reload_interval=0)
+        mocker.patch("api.v1.services.trivia.availability_matrix", matrix)
+        matrix.refresh(mock_db())
+
+        # Added by another worker since the matrix was loaded
+        db = MagicMock(spec=Session)
+        db.execute.side_effect = [
+            MagicMock(all=MagicMock(return_value=[*mock_totals, ("Sports", "easy", 1)])),
+            MagicMock(
+                all=MagicMock(return_value=[*mock_availability, ("Sports", "easy", None, 1)])
+            ),
+        ]
+
+        assert trivia_service.has_enough_questions(db, {"category": "Sports"}, 1)
+        assert db.execute.call_count == 2
+
+        # Known to be enough without touching the database again
+        assert trivia_service.has_enough_questions(db, {"category": "Sports"}, 1)
+        assert db.execute.call_count == 2
+
+    def test_unsatisfiable_requests_reload_once_per_interval(
+        self, mocker: MockerFixture
+    ):
+        """Test to verify repeated requests the database can't satisfy don't reload the matrix each time."""
+        matrix = AvailabilityMatrix(ttl=60, miss_reload_interval=5)
+        mocker.patch("api.v1.services.trivia.availability_matrix", matrix)
+        clock = mocker.patch("api.utils.availability_matrix.time.monotonic")
+        clock.return_value = 100.0
+        matrix.refresh(mock_db())
+
+        refresh = mocker.spy(matrix, "refresh")
+        filters = {"category": "Sports"}
+
+        # Loaded within the interval: the matrix is trusted
+        clock.return_value = 102.0
+        for _ in range(3):
+            assert not trivia_service.has_enough_questions(mock_db(), filters, 1)
+        refresh.assert_not_called()
+
+        # Past the interval: one reload, then trusted again
+        clock.return_value = 106.0
+        for _ in range(3):
+            assert not trivia_service.has_enough_questions(mock_db(), filters, 1)
+        refresh.assert_called_once()
+
+    def test_refresh_on_miss_is_single_flight(self):
+        """Test to verify a reload is skipped while another thread runs one."""
+        matrix = AvailabilityMatrix(ttl=60, miss_reload_interval=0)
+        matrix._reload_lock.acquire()
+        db = mock_db()
+
+        assert matrix.refresh_on_miss(db) is False
+        db.execute.assert_not_called()
+
+        matrix._reload_lock.release()
+        assert matrix.refresh_on_miss(db) is True
+
+    def test_has_enough_questions_when_matrix_fails(self, mocker: MockerFixture):
+        """Test to verify requests are let through when the matrix can't be loaded."""
+        db = MagicMock(spec=Session)
+        db.execute.side_effect = Exception("Database unavailable")
+        mocker.patch(
+            "api.v1.services.trivia.availability_matrix", AvailabilityMatrix(ttl=60)
+        )
+
+        assert trivia_service.has_enough_questions(db, {}, 20)
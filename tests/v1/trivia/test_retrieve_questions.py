@@ -1,5 +1,6 @@
 import pytest
 
+from collections import namedtuple
 from datetime import datetime, timezone
 from unittest.mock import MagicMock
 from pytest_mock import MockerFixture
@@ -21,6 +22,7 @@ from api.v1.services.trivia import trivia_service, CountryService, CategoryServi
 from api.v1.models.trivia import Trivia, TriviaOption
 from api.v1.models.category import Category
 from api.v1.models.country import Country
+from api.utils.sql_queries import AGGREGATE_SEPARATOR, category_id_subquery
 from main import app
 
 ENDPOINT_URL = "/api/v1/questions"
@@ -47,6 +49,34 @@ def mock_trivia(question="Who"):
     return triv
 
 
+ProjectionRow = namedtuple(
+    "ProjectionRow",
+    "id question difficulty submission_id created_at category countries "
+    "options_json correct_option incorrect_options",
+)
+
+
+def projection_rows(trivias: list[Trivia]) -> list[ProjectionRow]:
+    """Rows as returned by query_for_trivia_projection"""
+    return [
+        ProjectionRow(
+            id=t.id,
+            question=t.question,
+            difficulty=t.difficulty,
+            submission_id=None,
+            created_at=t.created_at,
+            category=t.categories[0].name,
+            countries=AGGREGATE_SEPARATOR.join(c.name for c in t.countries),
+            options_json=None,
+            correct_option=next(o.content for o in t.options if o.is_correct),
+            incorrect_options=AGGREGATE_SEPARATOR.join(
+                o.content for o in t.options if not o.is_correct
+            ),
+        )
+        for t in trivias
+    ]
+
+
 mocked_db = MagicMock(spec=Session)
 
 
@@ -60,6 +90,12 @@ def client():
     yield client
 
 
+@pytest.fixture(autouse=True)
+def enough_questions(mocker: MockerFixture):
+    """The availability matrix is tested separately. Let every request through here."""
+    return mocker.patch.object(trivia_service, "has_enough_questions", return_value=True)
+
+
 class TestRetrieveTrivias:
 
     @classmethod
@@ -85,7 +121,7 @@ class TestRetrieveTrivias:
             "api.v1.services.trivia.query_for_question_retrieval"
         )
 
-        mocked_db.scalars().all.return_value = mock_trivia_data
+        mocked_db.execute().all.return_value = projection_rows(mock_trivia_data)
 
         response = client.get(ENDPOINT_URL, params=params)
 
@@ -109,7 +145,7 @@ class TestRetrieveTrivias:
         mock_db_query_fn = mocker.patch(
             "api.v1.services.trivia.query_for_question_retrieval"
         )
-        mocked_db.scalars().all.return_value = mock_trivia_data
+        mocked_db.execute().all.return_value = projection_rows(mock_trivia_data)
 
         response = client.get(ENDPOINT_URL, params=params)
 
@@ -138,7 +174,7 @@ class TestRetrieveTrivias:
         mock_db_query_fn = mocker.patch(
             "api.v1.services.trivia.query_for_question_retrieval"
         )
-        mocked_db.scalars().all.return_value = mock_trivia_data
+        mocked_db.execute().all.return_value = projection_rows(mock_trivia_data)
 
         response = client.get(ENDPOINT_URL, params=params)
 
@@ -148,7 +184,9 @@ class TestRetrieveTrivias:
         # Assert equality of binary expressions
         _, kwargs = mock_db_query_fn.call_args
         assert str(kwargs["filters"]["category"].compile()) == str(
-            (Category.name == params["category"]).compile()
+            (
+                Trivia.category_id == category_id_subquery(params["category"])
+            ).compile()
         )
 
         assert response.json()["data"][0]["question"] == mock_trivia_data[0].question
@@ -167,7 +205,7 @@ class TestRetrieveTrivias:
         mock_db_query_fn = mocker.patch(
             "api.v1.services.trivia.query_for_question_retrieval"
         )
-        mocked_db.scalars().all.return_value = mock_trivia_data
+        mocked_db.execute().all.return_value = projection_rows(mock_trivia_data)
 
         response = client.get(ENDPOINT_URL, params=params)
 
@@ -190,7 +228,7 @@ class TestRetrieveTrivias:
         mock_db_query_fn = mocker.patch(
             "api.v1.services.trivia.query_for_question_retrieval"
         )
-        mocked_db.scalars().all.return_value = mock_trivia_data
+        mocked_db.execute().all.return_value = projection_rows(mock_trivia_data)
 
         response = client.get(ENDPOINT_URL, params=params)
 
@@ -218,7 +256,7 @@ class TestRetrieveTrivias:
         mock_db_query_fn = mocker.patch(
             "api.v1.services.trivia.query_for_question_retrieval"
         )
-        mocked_db.scalars().all.return_value = mock_trivia_data
+        mocked_db.execute().all.return_value = projection_rows(mock_trivia_data)
 
         response = client.get(ENDPOINT_URL, params=params)
 
@@ -248,7 +286,7 @@ class TestRetrieveTrivias:
         mock_db_query_fn = mocker.patch(
             "api.v1.services.trivia.query_for_question_retrieval"
         )
-        mocked_db.scalars().all.return_value = mock_trivia_data
+        mocked_db.execute().all.return_value = projection_rows(mock_trivia_data)
 
         response = client.get(ENDPOINT_URL, params=params)
 
@@ -261,7 +299,9 @@ class TestRetrieveTrivias:
             (Trivia.difficulty == params["difficulty"]).compile()
         )
         assert str(kwargs["filters"]["category"].compile()) == str(
-            (Category.name == params["category"]).compile()
+            (
+                Trivia.category_id == category_id_subquery(params["category"])
+            ).compile()
         )
 
         assert response.json()["data"][0]["question"] == mock_trivia_data[0].question
@@ -280,7 +320,7 @@ class TestRetrieveTrivias:
         mock_db_query_fn = mocker.patch(
             "api.v1.services.trivia.query_for_question_retrieval"
         )
-        mocked_db.scalars().all.return_value = mock_trivia_data
+        mocked_db.execute().all.return_value = projection_rows(mock_trivia_data)
 
         response = client.get(ENDPOINT_URL, params=params)
 
@@ -290,7 +330,9 @@ class TestRetrieveTrivias:
         # Assert equality of binary expressions
         _, kwargs = mock_db_query_fn.call_args
         assert str(kwargs["filters"]["category"].compile()) == str(
-            (Category.name == params["category"]).compile()
+            (
+                Trivia.category_id == category_id_subquery(params["category"])
+            ).compile()
         )
 
         assert len(response.json()["data"]) == len(mock_trivia_data)
@@ -310,7 +352,7 @@ class TestRetrieveTrivias:
         mock_db_query_fn = mocker.patch(
             "api.v1.services.trivia.query_for_question_retrieval"
         )
-        mocked_db.scalars().all.return_value = mock_trivia_data
+        mocked_db.execute().all.return_value = projection_rows(mock_trivia_data)
 
         response = client.get(ENDPOINT_URL, params=params)
 
@@ -343,7 +385,7 @@ class TestRetrieveTrivias:
         mock_db_query_fn = mocker.patch(
             "api.v1.services.trivia.query_for_question_retrieval"
         )
-        mocked_db.scalars().all.return_value = mock_trivia_data
+        mocked_db.execute().all.return_value = projection_rows(mock_trivia_data)
 
         response = client.get(ENDPOINT_URL, params=params)
 
@@ -356,7 +398,9 @@ class TestRetrieveTrivias:
             (Trivia.difficulty == params["difficulty"]).compile()
         )
         assert str(kwargs["filters"]["category"].compile()) == str(
-            (Category.name == params["category"]).compile()
+            (
+                Trivia.category_id == category_id_subquery(params["category"])
+            ).compile()
         )
         assert response.json()["data"][0]["question"] == mock_trivia_data[0].question
         mocked_db.reset_mock()
@@ -383,7 +427,7 @@ class TestRetrieveTrivias:
         mock_db_query_fn = mocker.patch(
             "api.v1.services.trivia.query_for_question_retrieval"
         )
-        mocked_db.scalars().all.return_value = mock_trivia_data
+        mocked_db.execute().all.return_value = projection_rows(mock_trivia_data)
 
         response = client.get(ENDPOINT_URL, params=params)
 
@@ -396,13 +440,40 @@ class TestRetrieveTrivias:
             (Trivia.difficulty == params["difficulty"]).compile()
         )
         assert str(kwargs["filters"]["category"].compile()) == str(
-            (Category.name == params["category"]).compile()
+            (
+                Trivia.category_id == category_id_subquery(params["category"])
+            ).compile()
         )
         assert response.json()["data"][0]["question"] == mock_trivia_data[0].question
         assert len(response.json()["data"]) == len(mock_trivia_data)
 
         mocked_db.reset_mock()
 
+    def test_get_questions_short_circuits_when_unavailable(
+        self, client: TestClient, mocker: MockerFixture, enough_questions
+    ):
+        """Test to verify the retrieval query is skipped when the availability matrix
+        shows there aren't enough questions."""
+
+        params = {"category": "Science", "amount": 5}
+        enough_questions.return_value = False
+
+        mock_db_query_fn = mocker.patch(
+            "api.v1.services.trivia.query_for_question_retrieval"
+        )
+
+        response = client.get(ENDPOINT_URL, params=params)
+
+        assert response.status_code == 200
+        assert response.json()["success"] is False
+        assert response.json()["message"] == "Not enough questions in database"
+        enough_questions.assert_called_once_with(
+            mocked_db, {"category": params["category"]}, params["amount"]
+        )
+        mock_db_query_fn.assert_not_called()
+
+        mocked_db.reset_mock()
+
     def test_get_questions_invalid_category_param(
         self, client: TestClient, mocker: MockerFixture
     ):
@@ -21,6 +21,7 @@ from api.v1.services.trivia import trivia_service, CountryService, CategoryServi
 from api.v1.models.trivia import Trivia, TriviaOption
 from api.v1.models.category import Category
 from api.v1.models.country import Country
+from api.v1.schemas.trivia import RetrieveTriviaForModSchema
 from main import app
 
 ENDPOINT_URL = "/api/v1/trivias/{}"
@@ -47,6 +48,16 @@ def mock_trivia(question="Who"):
     return triv
 
 
+def page_of(trivias: list, next_cursor=None, limit=20) -> dict:
+    return {
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "items": [
+            RetrieveTriviaForModSchema.model_validate(t.to_dict()) for t in trivias
+        ],
+    }
+
+
 mocked_db = MagicMock(spec=Session)
 
 
@@ -81,25 +92,82 @@ class TestRetrieveTrivias:
             mock_trivia("Who is the first?"),
         ]
 
-        mocker.patch.object(trivia_service, "fetch_all", return_value=mock_trivia_data)
+        mock_fetch = mocker.patch.object(
+            trivia_service,
+            "fetch_paginated",
+            return_value=page_of(mock_trivia_data, next_cursor=mock_trivia_data[1].id),
+        )
         response = client.get(ENDPOINT_URL.format(""))
 
         assert response.status_code == 200
-        assert response.json()["data"][0]["question"] == mock_trivia_data[0].question
-        assert (
-            response.json()["data"][1]["difficulty"] == mock_trivia_data[1].difficulty
+        data = response.json()["data"]
+        assert data["items"][0]["question"] == mock_trivia_data[0].question
+        assert data["items"][1]["difficulty"] == mock_trivia_data[1].difficulty
+        assert data["next_cursor"] == mock_trivia_data[1].id
+        mock_fetch.assert_called_once_with(
+            db=mocked_db,
+            limit=20,
+            cursor=None,
+            filters={
+                "category": None,
+                "country": None,
+                "difficulty": None,
+                "created_after": None,
+            },
+        )
+
+    def test_get_all_trivias_filtered(self, client, mocker: MockerFixture):
+        """Test that filters, cursor and limit are passed to the service."""
+
+        cursor = str(uuid7())
+        mock_fetch = mocker.patch.object(
+            trivia_service, "fetch_paginated", return_value=page_of([], limit=5)
+        )
+        response = client.get(
+            ENDPOINT_URL.format(""),
+            params={
+                "category": "Politics",
+                "country": "Ghana",
+                "difficulty": "hard",
+                "created_after": "2024-05-01T00:00:00Z",
+                "cursor": cursor,
+                "limit": 5,
+            },
         )
 
+        assert response.status_code == 200
+        mock_fetch.assert_called_once_with(
+            db=mocked_db,
+            limit=5,
+            cursor=cursor,
+            filters={
+                "category": "Politics",
+                "country": "Ghana",
+                "difficulty": "hard",
+                "created_after": datetime(2024, 5, 1, tzinfo=timezone.utc),
+            },
+        )
+
+    @pytest.mark.parametrize(
+        "params",
+        [{"limit": 0}, {"limit": 101}, {"cursor": "short"}, {"category": "Cooking"}],
+    )
+    def test_get_all_trivias_invalid_params(self, client, params):
+        """Test that invalid listing params are rejected."""
+
+        response = client.get(ENDPOINT_URL.format(""), params=params)
+        assert response.status_code == 422
+
     def test_get_all_trivias_empty(self, client, mocker: MockerFixture):
         """Test to verify response for getting all trivias, even when there are
         none."""
 
-        mock_trivia_data = []
-        mocker.patch.object(trivia_service, "fetch_all", return_value=mock_trivia_data)
+        mocker.patch.object(trivia_service, "fetch_paginated", return_value=page_of([]))
         response = client.get(ENDPOINT_URL.format(""))
 
         assert response.status_code == 200
-        assert response.json().get("data") == []
+        assert response.json()["data"]["items"] == []
+        assert response.json()["data"]["next_cursor"] is None
 
     def test_get_trivia_single(self, client, mocker):
         """Test to successfully fetch a single trivia"""
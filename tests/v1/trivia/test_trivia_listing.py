@@ -0,0 +1,134 @@
+"""Runs the trivia listing and question retrieval against an in-memory SQLite database"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.db.database import Base
+from api.v1.models import Category, Country, Trivia, TriviaOption
+from api.v1.services.trivia import trivia_service
+
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    history, sports = Category(name="History"), Category(name="Sports")
+    ghana, kenya = Country(name="Ghana"), Country(name="Kenya")
+
+    # Created in order, so ids and created_at both increase
+    for i in range(7):
+        trivia = Trivia(
+            question=f"Trivia {i}?",
+            difficulty="easy" if i % 2 else "hard",
+            created_at=BASE_TIME + timedelta(days=i),
+        )
+        trivia.categories = [history if i < 4 else sports]
+        trivia.countries = [ghana] if i % 3 == 0 else [kenya]
+        trivia.options = [
+            TriviaOption(content=f"Option {j}", is_correct=j == 3) for j in range(4)
+        ]
+        session.add(trivia)
+        session.commit()
+
+    yield session
+
+    session.close()
+    engine.dispose()
+
+
+def questions(page: dict) -> list[str]:
+    return [item.question for item in page["items"]]
+
+
+def test_listing_walks_pages_newest_first(db):
+    seen = []
+    cursor = None
+    while True:
+        page = trivia_service.fetch_paginated(db, limit=3, cursor=cursor)
+        seen += questions(page)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+        assert len(page["items"]) == 3
+
+    assert seen == [f"Trivia {i}?" for i in reversed(range(7))]
+
+
+def test_listing_last_full_page_has_no_cursor(db):
+    page = trivia_service.fetch_paginated(db, limit=7)
+
+    assert len(page["items"]) == 7
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.parametrize(
+    "filters, expected",
+    [
+        ({"category": "Sports"}, [6, 5, 4]),
+        ({"country": "Ghana"}, [6, 3, 0]),
+        ({"difficulty": "easy"}, [5, 3, 1]),
+        ({"created_after": BASE_TIME + timedelta(days=4)}, [6, 5]),
+        ({"category": "History", "country": "Kenya", "difficulty": "hard"}, [2]),
+    ],
+)
+def test_listing_filters(db, filters, expected):
+    page = trivia_service.fetch_paginated(db, limit=10, filters=filters)
+
+    assert questions(page) == [f"Trivia {i}?" for i in expected]
+
+
+def test_projection_matches_to_dict(db):
+    page = trivia_service.fetch_paginated(db, limit=10)
+
+    for item in page["items"]:
+        trivia = db.get(Trivia, item.id)
+        expected = trivia.to_dict()
+        assert item.category == expected["category"]
+        assert item.countries == expected["countries"]
+        assert item.correct_option == expected["correct_option"]
+        assert sorted(item.incorrect_options) == sorted(expected["incorrect_options"])
+
+
+@pytest.mark.parametrize(
+    "filters, expected",
+    [
+        ({}, {0, 1, 2, 3, 4, 5, 6}),
+        ({"category": "Sports"}, {4, 5, 6}),
+        ({"difficulty": "easy", "country": "Ghana"}, {3}),
+        ({"category": "History", "country": "Kenya"}, {1, 2}),
+    ],
+)
+def test_retrieve_questions_filters(db, filters, expected):
+    results = trivia_service.retrieve_questions(db, dict(filters), limit=10)
+
+    assert {int(q["question"].split()[1].rstrip("?")) for q in results} == expected
+    for question in results:
+        assert len(question["incorrect_options"]) == 3
+        assert question["correct_option"] == "Option 3"
+
+
+def test_retrieve_questions_includes_trivias_without_countries(db):
+    trivia = Trivia(question="Trivia without country?", difficulty="easy")
+    trivia.categories = [db.query(Category).filter_by(name="Sports").one()]
+    trivia.options = [
+        TriviaOption(content=f"Option {j}", is_correct=j == 3) for j in range(4)
+    ]
+    db.add(trivia)
+    db.commit()
+
+    results = trivia_service.retrieve_questions(
+        db, {"category": "Sports", "country": "Ghana"}, limit=10
+    )
+
+    assert {q["question"] for q in results} == {"Trivia 6?", "Trivia without country?"}
+    assert [q["countries"] for q in results if q["id"] == trivia.id] == [[]]
@@ -0,0 +1,110 @@
+"""Checks TriviaService keeps Trivia.options_json in sync with the options rows,
+against an in-memory SQLite database"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.db.database import Base
+from api.v1.models import Category, Country, Trivia
+from api.v1.schemas.trivia import CreateTriviaSchema, UpdateTriviaSchema
+from api.v1.services.trivia import trivia_service
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([Category(name="History"), Country(name="Ghana")])
+    session.commit()
+
+    yield session
+
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def trivia(db) -> Trivia:
+    return trivia_service.create(
+        db,
+        CreateTriviaSchema(
+            question="Who was Ghana's first president?",
+            incorrect_options=["Mahama", "Rawlings", "Kufuor"],
+            correct_option="Nkrumah",
+            difficulty="easy",
+            category="History",
+            countries=["Ghana"],
+        ),
+    )
+
+
+def stored_options_json(db, trivia_id: str) -> dict:
+    db.expire_all()
+    return db.get(Trivia, trivia_id).options_json
+
+
+def test_create_sets_options_json(db, trivia):
+    assert stored_options_json(db, trivia.id) == {
+        "correct_option": "Nkrumah",
+        "incorrect_options": ["Mahama", "Rawlings", "Kufuor"],
+    }
+
+
+@pytest.mark.parametrize(
+    "update, expected",
+    [
+        (
+            {"correct_option": "Kwame Nkrumah"},
+            {
+                "correct_option": "Kwame Nkrumah",
+                "incorrect_options": ["Mahama", "Rawlings", "Kufuor"],
+            },
+        ),
+        (
+            {"incorrect_options": ["Busia", "Limann", "Acheampong"]},
+            {
+                "correct_option": "Nkrumah",
+                "incorrect_options": ["Busia", "Limann", "Acheampong"],
+            },
+        ),
+    ],
+)
+def test_update_syncs_options_json(db, trivia, update, expected):
+    trivia_service.update(db, UpdateTriviaSchema(**update), trivia.id)
+
+    assert stored_options_json(db, trivia.id) == expected
+
+
+def test_update_without_options_keeps_options_json(db, trivia):
+    before = stored_options_json(db, trivia.id)
+
+    trivia_service.update(db, UpdateTriviaSchema(difficulty="hard"), trivia.id)
+
+    assert stored_options_json(db, trivia.id) == before
+
+
+def test_reads_prefer_options_json(db, trivia):
+    # Only options_json changes, so reads returning it didn't use the rows
+    db.get(Trivia, trivia.id).options_json = {
+        "correct_option": "From JSON",
+        "incorrect_options": ["A", "B", "C"],
+    }
+    db.commit()
+
+    item = trivia_service.fetch_paginated(db, limit=1)["items"][0]
+    assert item.correct_option == "From JSON"
+    assert trivia_service.fetch(db, trivia.id).to_dict()["correct_option"] == "From JSON"
+
+
+def test_reads_fall_back_to_option_rows(db, trivia):
+    db.get(Trivia, trivia.id).options_json = None
+    db.commit()
+
+    item = trivia_service.fetch_paginated(db, limit=1)["items"][0]
+    assert item.correct_option == "Nkrumah"
+    assert sorted(item.incorrect_options) == ["Kufuor", "Mahama", "Rawlings"]
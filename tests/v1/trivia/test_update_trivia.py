@@ -17,7 +17,7 @@ from api.v1.services.moderator import (
     HTTPAuthorizationCredentials,
 )
 from api.db.database import get_db
-from api.v1.services.trivia import trivia_service, CountryService, CategoryService
+from api.v1.services.trivia import trivia_service
 from api.v1.models.trivia import Trivia, TriviaOption
 from api.v1.models.category import Category
 from api.v1.models.country import Country
@@ -87,22 +87,13 @@ class TestUpdateTrivia:
     def test_update_trivia_success(self, client, mocker: MockerFixture):
         """Test to successfully update a trivia"""
 
-        # Mock the user service to return the current user
-
         mock_triv = mock_trivia()
-        mocker.patch.object(trivia_service, "fetch", return_value=mock_triv)
-        mocker.patch.object(
-            CategoryService,
-            "fetch_categories",
-            return_value=[Category(name=test_triv_body_1["category"])],
-        )
-        mocker.patch.object(
-            CountryService,
-            "fetch_countries",
-            return_value=[Country(name=test_triv_body_1["countries"][0])],
+        t_dict = {**mock_triv.to_dict(), **test_triv_body_1}
+        mock_update = mocker.patch.object(
+            trivia_service, "update", return_value=t_dict
         )
 
-        response = client.put(ENDPOINT_URL.format("some-id"), json=test_triv_body_1)
+        response = client.put(ENDPOINT_URL.format(mock_triv.id), json=test_triv_body_1)
 
         assert response.status_code == 200
         assert response.json()["data"]["id"] == mock_triv.id
@@ -112,37 +103,22 @@ class TestUpdateTrivia:
         assert response.json()["data"]["category"] == test_triv_body_1["category"]
         assert response.json()["data"]["countries"] == test_triv_body_1["countries"]
 
-    def test_update_trivia_correct_option_success(self, client, mocker: MockerFixture):
-        """Test to successfully update a trivia"""
-
-        # Mock the user service to return the current user
-
-        mock_triv = mock_trivia()
-        mocker.patch.object(trivia_service, "fetch", return_value=mock_triv)
-        response = client.put(
-            ENDPOINT_URL.format("some-id"), json=test_triv_update_body_2
-        )
-
-        assert response.status_code == 200
-        assert response.json()["data"]["id"] == mock_triv.id
-
-        assert (
-            response.json()["data"]["correct_option"]
-            == test_triv_update_body_2["correct_option"]
-        )
-
-    def test_update_empty_fields(self, client, mocker):
-        """Test for completely empty fields when updating a trivia"""
+        schema = mock_update.call_args.kwargs["schema"]
+        assert schema.model_dump(exclude_unset=True) == test_triv_body_1
+        assert mock_update.call_args.kwargs["id"] == mock_triv.id
 
-        mock_triv = mock_trivia()
+    @pytest.mark.parametrize(
+        "body", [{"question": None}, {"category": None, "difficulty": "easy"}]
+    )
+    def test_update_trivia_explicit_null(self, client, mocker, body):
+        """Test to verify fields can't be set to null"""
+        mock_update = mocker.patch.object(trivia_service, "update")
 
-        mocker.patch.object(trivia_service, "fetch", return_value=mock_triv)
-        response = client.put(ENDPOINT_URL.format("some-id"), json={})
+        response = client.put(ENDPOINT_URL.format("some-id"), json=body)
 
-        assert response.status_code == 200
-
-        assert response.json()["data"]["question"] == mock_triv.question
-        assert response.json()["data"]["id"] == mock_triv.id
+        assert response.status_code == 422
+        assert response.json()["errors"][0]["type"] == "null_field"
+        mock_update.assert_not_called()
 
     # Invalid id
     def test_update_trivia_invalid_id(self, client, mocker):
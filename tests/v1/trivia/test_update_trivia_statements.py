@@ -0,0 +1,213 @@
+"""Checks TriviaService.update only writes what changed, against an in-memory
+SQLite database"""
+
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, select
+from sqlalchemy import update as update_statement
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.db.database import Base
+from api.utils.availability_matrix import availability_matrix
+from api.v1.models import Category, Country, Trivia, TriviaOption
+from api.v1.schemas.trivia import CreateTriviaSchema, UpdateTriviaSchema
+from api.v1.services.trivia import trivia_service
+
+
+class Database:
+    def __init__(self):
+        self.engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.statements = []
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def record_statement(conn, cursor, statement, *args):
+            self.statements.append(statement.split()[0])
+
+    def writes(self) -> list[str]:
+        return [s for s in self.statements if s in ("INSERT", "UPDATE", "DELETE")]
+
+
+@pytest.fixture
+def database():
+    database = Database()
+    database.session.add_all(
+        [
+            Category(name="History"),
+            Category(name="Politics"),
+            Country(name="Ghana"),
+            Country(name="Togo"),
+            Country(name="Benin"),
+        ]
+    )
+    database.session.commit()
+    yield database
+    database.session.close()
+    database.engine.dispose()
+
+
+def create_trivia(db, question: str = "Who was Ghana's first president?") -> Trivia:
+    return trivia_service.create(
+        db,
+        CreateTriviaSchema(
+            question=question,
+            incorrect_options=["Mahama", "Rawlings", "Kufuor"],
+            correct_option="Nkrumah",
+            difficulty="easy",
+            category="History",
+            countries=["Ghana", "Togo"],
+        ),
+    )
+
+
+@pytest.fixture
+def trivia(database) -> Trivia:
+    trivia = create_trivia(database.session)
+    database.statements.clear()
+    return trivia
+
+
+def update(database, trivia_id: str, **changes) -> dict:
+    return trivia_service.update(
+        database.session, UpdateTriviaSchema(**changes), trivia_id
+    )
+
+
+def test_update_question_is_two_statements(database, trivia):
+    trivia_id = trivia.id
+    database.session.execute(
+        update_statement(Trivia)
+        .where(Trivia.id == trivia_id)
+        .values(updated_at=datetime(2020, 1, 1))
+    )
+    database.session.commit()
+    database.statements.clear()
+
+    t_dict = update(database, trivia_id, question="Who led Ghana to independence?")
+
+    assert database.statements == ["SELECT", "UPDATE"]
+    assert t_dict["question"] == "Who led Ghana to independence?"
+    assert t_dict["category"] == "History"
+    assert sorted(t_dict["countries"]) == ["Ghana", "Togo"]
+
+    database.session.expire_all()
+    stored = database.session.get(Trivia, trivia_id)
+    assert stored.question == t_dict["question"]
+    assert t_dict["updated_at"] == stored.updated_at
+    assert stored.updated_at.year > 2020
+
+
+def test_update_empty_fields(database, trivia):
+    """Unset and unchanged fields are kept without writing anything"""
+    t_dict = update(
+        database, trivia.id, question=trivia.question, countries=["Togo", "Ghana"]
+    )
+
+    assert database.statements == ["SELECT"]
+    assert t_dict["question"] == trivia.question
+    assert t_dict["difficulty"] == "easy"
+    assert t_dict["correct_option"] == "Nkrumah"
+    assert t_dict["incorrect_options"] == ["Mahama", "Rawlings", "Kufuor"]
+
+
+def test_update_trivia_correct_option_success(database, trivia):
+    t_dict = update(database, trivia.id, correct_option="Kwame Nkrumah")
+
+    assert database.writes() == ["UPDATE", "UPDATE"]
+    assert t_dict["correct_option"] == "Kwame Nkrumah"
+    assert t_dict["incorrect_options"] == ["Mahama", "Rawlings", "Kufuor"]
+
+    database.session.expire_all()
+    options = database.session.scalars(
+        select(TriviaOption).where(TriviaOption.trivia_id == trivia.id)
+    ).all()
+    assert sorted((o.content, o.is_correct) for o in options) == [
+        ("Kufuor", False),
+        ("Kwame Nkrumah", True),
+        ("Mahama", False),
+        ("Rawlings", False),
+    ]
+    assert database.session.get(Trivia, trivia.id).options_json == {
+        "correct_option": "Kwame Nkrumah",
+        "incorrect_options": ["Mahama", "Rawlings", "Kufuor"],
+    }
+
+
+def test_update_only_writes_changed_options(database, trivia):
+    executemany = []
+    event.listen(
+        database.engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, parameters, context, many: executemany.append(
+            (statement.split()[0], statement.split()[1], len(parameters) if many else 1)
+        ),
+    )
+
+    update(database, trivia.id, incorrect_options=["Mahama", "Busia", "Kufuor"])
+
+    assert ("UPDATE", "trivia_options", 1) in executemany
+
+
+def test_update_category_and_countries(database, trivia):
+    t_dict = update(
+        database, trivia.id, category="Politics", countries=["Togo", "Benin"]
+    )
+
+    assert database.writes() == ["UPDATE", "DELETE", "INSERT"]
+    assert t_dict["category"] == "Politics"
+    assert t_dict["countries"] == ["Togo", "Benin"]
+
+    database.session.expire_all()
+    stored = database.session.get(Trivia, trivia.id)
+    assert stored.category.name == "Politics"
+    assert sorted(c.name for c in stored.countries) == ["Benin", "Togo"]
+
+
+def test_update_to_missing_category(database, trivia):
+    with pytest.raises(HTTPException) as exc:
+        update(database, trivia.id, category="Sports", question="Who won AFCON 1963?")
+
+    assert exc.value.status_code == 400
+    assert database.writes() == []
+    database.session.expire_all()
+    assert database.session.get(Trivia, trivia.id).category.name == "History"
+
+
+def test_update_records_availability_changes(database, trivia, mocker):
+    record_added = mocker.spy(availability_matrix, "record_added")
+    record_removed = mocker.spy(availability_matrix, "record_removed")
+
+    update(database, trivia.id, question="Who led Ghana to independence?")
+    record_added.assert_not_called()
+
+    update(database, trivia.id, difficulty="hard")
+    record_removed.assert_called_once_with("History", "easy", ["Ghana", "Togo"])
+    record_added.assert_called_once_with("History", "hard", ["Ghana", "Togo"])
+
+
+def test_update_to_existing_question(database, trivia):
+    other = create_trivia(database.session, "Who was Togo's first president?")
+
+    with pytest.raises(HTTPException) as exc:
+        update(database, other.id, question=trivia.question)
+
+    assert exc.value.status_code == 400
+    database.session.expire_all()
+    assert (
+        database.session.get(Trivia, other.id).question
+        == "Who was Togo's first president?"
+    )
+
+
+@pytest.mark.parametrize("trivia_id", ["invalid-id", "01920000-0000-7000-8000-000000000000"])
+def test_update_unknown_trivia(database, trivia_id):
+    with pytest.raises(HTTPException) as exc:
+        update(database, trivia_id, question="Anything?")
+
+    assert exc.value.status_code == 404
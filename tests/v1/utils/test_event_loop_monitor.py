@@ -0,0 +1,52 @@
+import asyncio
+import logging
+import time
+
+from api.utils.event_loop_monitor import EventLoopMonitor, event_loop_blocks_total
+
+
+def blocking_call():
+    time.sleep(0.3)
+
+
+async def run_monitored(monitor: EventLoopMonitor, block: bool):
+    monitor.start()
+    await asyncio.sleep(0.05)
+    if block:
+        blocking_call()
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+
+class TestEventLoopMonitor:
+
+    def test_blocking_call_is_logged_with_its_stack(self, caplog):
+        monitor = EventLoopMonitor(threshold=0.1, interval=0.01)
+        blocks_before = event_loop_blocks_total.samples().get(
+            event_loop_blocks_total._key({}), 0
+        )
+
+        with caplog.at_level(logging.WARNING):
+            asyncio.run(run_monitored(monitor, block=True))
+
+        records = [r for r in caplog.records if hasattr(r, "event_loop_block")]
+        assert len(records) == 1
+        assert "blocking_call" in records[0].getMessage()
+        assert "time.sleep(0.3)" in records[0].getMessage()
+        assert records[0].event_loop_block["blocked_ms"] >= 100
+        assert (
+            event_loop_blocks_total.samples()[event_loop_blocks_total._key({})]
+            == blocks_before + 1
+        )
+
+        # The block shows up as the worst lag
+        assert monitor.quantiles()[0.99] >= 0.25
+
+    def test_idle_loop_is_not_reported(self, caplog):
+        monitor = EventLoopMonitor(threshold=0.1, interval=0.01)
+
+        with caplog.at_level(logging.WARNING):
+            asyncio.run(run_monitored(monitor, block=False))
+
+        assert not [r for r in caplog.records if hasattr(r, "event_loop_block")]
+        assert monitor.quantiles()[0.5] < 0.1
@@ -0,0 +1,97 @@
+import json
+import logging
+import queue
+
+from api.utils.logger import (
+    DroppingQueueHandler,
+    JSONFormatter,
+    create_queue_handler,
+    log_records_dropped_total,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def make_record(message="Created new submission", **extra):
+    record = logging.LogRecord(
+        "afrivia.test", logging.INFO, __file__, 1, message, None, None
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+class TestLogger:
+
+    def test_json_formatter_includes_extra_fields(self):
+        entry = json.loads(
+            JSONFormatter().format(
+                make_record(request_timing={"path": "/api/v1/questions", "db_ms": 1.5})
+            )
+        )
+
+        assert entry["message"] == "Created new submission"
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "afrivia.test"
+        assert entry["request_timing"] == {"path": "/api/v1/questions", "db_ms": 1.5}
+        assert "msg" not in entry and "args" not in entry
+
+    def test_records_are_written_by_the_listener(self):
+        target = ListHandler()
+        handler = create_queue_handler(target, max_size=10)
+
+        test_logger = logging.getLogger("afrivia.test.queue")
+        test_logger.propagate = False
+        test_logger.addHandler(handler)
+        try:
+            test_logger.info("Hello %s", "world", extra={"submission_id": "1"})
+        finally:
+            test_logger.removeHandler(handler)
+            handler.listener.stop()
+
+        assert len(target.records) == 1
+        assert target.records[0].getMessage() == "Hello world"
+        assert target.records[0].submission_id == "1"
+
+    def test_exceptions_are_kept_apart_from_the_message(self):
+        target = ListHandler()
+        target.setFormatter(JSONFormatter())
+        handler = create_queue_handler(target, max_size=10)
+
+        test_logger = logging.getLogger("afrivia.test.exception")
+        test_logger.propagate = False
+        test_logger.addHandler(handler)
+        try:
+            try:
+                raise ValueError("Bad option")
+            except ValueError:
+                test_logger.exception("Failed to create %s", "trivia")
+        finally:
+            test_logger.removeHandler(handler)
+            handler.listener.stop()
+
+        entry = json.loads(target.format(target.records[0]))
+        assert entry["message"] == "Failed to create trivia"
+        assert entry["exception"].startswith("Traceback (most recent call last)")
+        assert "ValueError: Bad option" in entry["exception"]
+
+        # Plain formatters still print the traceback after the message
+        text = logging.Formatter("%(message)s").format(target.records[0])
+        assert text.startswith("Failed to create trivia\nTraceback")
+
+    def test_full_queue_drops_records(self):
+        handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+        key = log_records_dropped_total._key({"level": "INFO"})
+        dropped_before = log_records_dropped_total.samples().get(key, 0)
+
+        for _ in range(3):
+            handler.handle(make_record())
+
+        assert handler.queue.qsize() == 1
+        assert log_records_dropped_total.samples()[key] == dropped_before + 2
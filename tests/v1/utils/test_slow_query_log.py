@@ -0,0 +1,92 @@
+import json
+import logging
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from api.utils.slow_query_log import (
+    is_explainable,
+    redact_parameters,
+    register_slow_query_log,
+    slow_query_logger,
+)
+from api.v1.models.base_model import Base
+from api.v1.schemas.submission import CategoryEnum
+from api.v1.services.category import CategoryService
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.entries = []
+
+    def emit(self, record):
+        self.entries.append(json.loads(record.getMessage()))
+
+
+@pytest.fixture
+def handler():
+    handler = ListHandler()
+    yield handler
+    slow_query_logger.removeHandler(handler)
+
+
+@pytest.fixture
+def logged_engine(handler):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    # A zero threshold logs every statement
+    register_slow_query_log(
+        engine, threshold_ms=0, explain_sample_rate=1.0, handler=handler
+    )
+    yield engine
+    engine.dispose()
+
+
+class TestSlowQueryLog:
+
+    def test_entries_include_caller_and_redacted_parameters(
+        self, logged_engine, handler
+    ):
+        db = sessionmaker(bind=logged_engine)()
+        CategoryService.fetch_categories(db, [CategoryEnum.history])
+        db.close()
+
+        entry = handler.entries[-1]
+
+        assert entry["caller"] == (
+            "api.v1.services.category:CategoryService.fetch_categories"
+        )
+        assert entry["statement"].startswith("SELECT")
+        assert "History" not in json.dumps(entry)
+        assert entry["parameters"] == ["<str>"]
+        assert entry["duration_ms"] >= 0
+
+    def test_no_explain_outside_postgres(self, logged_engine, handler):
+        with logged_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        assert handler.entries[-1]["caller"] is None
+        assert "explain" not in handler.entries[-1]
+
+    def test_statements_under_threshold_are_not_logged(self, handler):
+        engine = create_engine("sqlite://")
+        register_slow_query_log(engine, threshold_ms=60_000, handler=handler)
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        assert handler.entries == []
+
+    def test_redact_parameters(self):
+        assert redact_parameters(
+            {"email": "a@b.com", "ids": ("x", 1), "active": True}
+        ) == {"email": "<str>", "ids": ["<str>", "<int>"], "active": "<bool>"}
+
+    def test_is_explainable(self):
+        assert is_explainable("SELECT * FROM trivias")
+        assert is_explainable("  with t as (select 1) select * from t")
+        assert not is_explainable("INSERT INTO trivias VALUES (1)")
+        assert not is_explainable("WITH d AS (DELETE FROM trivias RETURNING id) SELECT 1")
+        assert not is_explainable("")